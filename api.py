@@ -0,0 +1,311 @@
+# api.py
+"""
+AutoSurvey HTTP 서비스 (표준 라이브러리)
+
+    python api.py --port 8000
+
+    POST /analyze   {"text": "..."}                                        → {"user_input"}
+    POST /retrieve  {"user_input": {...}, "k"?, "sparse_weight"?, "dense_weight"?, "fusion"?}
+                                                                           → {"context", "query"}
+    POST /generate  {"user_input": {...}, "context"?}                      → {"survey", "domain", "context", "validation"}
+    POST /feedback  {"user_input": {...}, "survey": "...", "feedback": "..." | [...], "domain"?}
+                                                                           → {"survey"}
+    GET  /health                                                           → 처리 현황
+
+- 검색 인덱스 · 분석기 · 분류기는 시작 시 한 번 로드해 모든 요청이 공유
+- 정규화한 입력과 파라미터가 같은 요청이 동시에 들어오면 한 번만 계산해 결과를 함께 반환
+- 동시 처리 수(Config.API_MAX_CONCURRENCY)를 넘는 요청은 대기열(Config.API_MAX_QUEUE)에서 기다리며,
+  대기열이 차거나 대기 시간(Config.API_QUEUE_TIMEOUT)을 넘기면 503 + Retry-After 응답
+"""
+import json
+import math
+import time
+import argparse
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from rag.config import Config
+from rag.retriever import load_indexes, FUSION_METHODS
+from user_input.user_input_module import UserInputAnalyzer
+from system_orchestration.orchestration import SurveyOrchestration
+from system_orchestration.domain_classifier import DomainClassifier
+from feedback_output.feedback_analyzer import FeedbackAnalyzer
+from feedback_output.survey_validator import SurveyValidator
+from utils.single_flight import SingleFlight, make_key, normalize
+from utils.tracing import span
+from utils.ollama_manager import get_ollama_manager, preload_local_models, local_models_enabled
+
+
+USER_INPUT_KEYS = ("조사목적", "조사대상", "주요측정변수", "요청문항수", "설문요구사항")
+
+
+class BadRequest(ValueError):
+    """요청 형식 오류 (400)"""
+
+
+class Overloaded(RuntimeError):
+    """대기열이 가득 찼거나 대기 시간 초과 (503)"""
+
+
+class AdmissionControl:
+    """동시 처리 수 제한 + 길이 제한 대기열"""
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = threading.Semaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self.admitted = 0       # 처리 중 + 대기 중
+        self.rejected = 0
+
+    @contextmanager
+    def admit(self):
+        with self._lock:
+            if self.admitted >= self.max_concurrency + self.max_queue:
+                self.rejected += 1
+                raise Overloaded("대기열이 가득 찼습니다.")
+            self.admitted += 1
+        try:
+            if not self._slots.acquire(timeout=self.queue_timeout):
+                with self._lock:
+                    self.rejected += 1
+                raise Overloaded(f"{self.queue_timeout:.0f}초 동안 처리 순서가 오지 않았습니다.")
+            try:
+                yield
+            finally:
+                self._slots.release()
+        finally:
+            with self._lock:
+                self.admitted -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "admitted": self.admitted,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "rejected": self.rejected,
+            }
+
+
+def parse_user_input(body: dict) -> dict:
+    """요청 본문의 user_input을 검증하고 파이프라인이 기대하는 키 순서로 정렬"""
+    user_input = body.get("user_input")
+    if not isinstance(user_input, dict):
+        raise BadRequest("user_input(dict)이 필요합니다.")
+    missing = [key for key in USER_INPUT_KEYS if key not in user_input]
+    if missing:
+        raise BadRequest(f"user_input에 다음 항목이 없습니다: {', '.join(missing)}")
+    if not isinstance(user_input["주요측정변수"], list):
+        raise BadRequest("주요측정변수는 리스트여야 합니다.")
+    return {key: user_input[key] for key in USER_INPUT_KEYS}
+
+
+def parse_retrieval_overrides(body: dict) -> dict:
+    """검색 파라미터 덮어쓰기 검증 (k: 양의 정수, 가중치: 0 이상의 숫자, fusion: FUSION_METHODS)"""
+    overrides = {}
+    if "k" in body:
+        k = body["k"]
+        if not isinstance(k, int) or isinstance(k, bool) or k <= 0:
+            raise BadRequest("k는 양의 정수여야 합니다.")
+        overrides["k"] = k
+    for key in ("sparse_weight", "dense_weight"):
+        if key in body:
+            weight = body[key]
+            if not isinstance(weight, (int, float)) or isinstance(weight, bool) or not math.isfinite(weight) or weight < 0:
+                raise BadRequest(f"{key}는 0 이상의 숫자여야 합니다.")
+            overrides[key] = float(weight)
+    if "fusion" in body:
+        if body["fusion"] not in FUSION_METHODS:
+            raise BadRequest(f"fusion은 다음 중 하나여야 합니다: {', '.join(FUSION_METHODS)}")
+        overrides["fusion"] = body["fusion"]
+    return overrides
+
+
+class SurveyService:
+    """요청 간 공유되는 구성 요소 + 작업별 처리"""
+
+    def __init__(self, analysis_model: str = "gpt-5-mini"):
+        self.analyzer = UserInputAnalyzer(str(Config.STOPWORD_PATH), model=analysis_model)
+        self.domain_classifier = DomainClassifier()
+        self.feedback_analyzer = FeedbackAnalyzer()
+        self.survey_validator = SurveyValidator()
+        self.single_flight = SingleFlight()
+        self.admission = AdmissionControl(
+            Config.API_MAX_CONCURRENCY, Config.API_MAX_QUEUE, Config.API_QUEUE_TIMEOUT
+        )
+        self.started_at = time.time()
+
+    def warm_up(self):
+        """검색 인덱스 로드 · 도메인 모델 예열 (첫 요청 지연 방지)"""
+        preload_local_models()
+        load_indexes()
+
+    def _orchestration(self, user_input: dict, domain: str = None) -> SurveyOrchestration:
+        orchestration = SurveyOrchestration(
+            user_input,
+            domain_classifier=self.domain_classifier,
+            feedback_analyzer=self.feedback_analyzer,
+            survey_validator=self.survey_validator,
+            verbose=False,
+        )
+        orchestration.selected_domain = domain
+        return orchestration
+
+    # === 작업별 처리 (본문 검증 → 병합 키 → 계산 함수) ===
+    def analyze(self, body: dict):
+        text = body.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise BadRequest("text가 필요합니다.")
+
+        def run():
+            user_input = self.analyzer(text)
+            return {"user_input": user_input}
+
+        return normalize(text), run
+
+    def retrieve(self, body: dict):
+        user_input = parse_user_input(body)
+        overrides = parse_retrieval_overrides(body)
+
+        def run():
+            orchestration = self._orchestration(user_input)
+            context = orchestration.retrieve(overrides)
+            return {"context": context, "query": orchestration.build_rag_query()}
+
+        return [normalize(user_input), overrides], run
+
+    def generate(self, body: dict):
+        user_input = parse_user_input(body)
+        context = body.get("context")
+
+        def run():
+            orchestration = self._orchestration(user_input)
+            if context is None:
+                orchestration.retrieve()
+            else:
+                orchestration.context = context
+            domain = orchestration.classify()
+            survey = orchestration.generate()
+            return {"survey": survey, "domain": domain, "context": orchestration.context,
+                    "validation": orchestration.last_validation}
+
+        return [normalize(user_input), normalize(context)], run
+
+    def feedback(self, body: dict):
+        user_input = parse_user_input(body)
+        survey, feedback = body.get("survey"), body.get("feedback")
+        if not isinstance(survey, str) or not survey.strip():
+            raise BadRequest("survey가 필요합니다.")
+        if not feedback or not isinstance(feedback, (str, list)):
+            raise BadRequest("feedback(문자열 또는 리스트)이 필요합니다.")
+        domain = body.get("domain")
+
+        def run():
+            orchestration = self._orchestration(user_input, domain)
+            return {"survey": orchestration.process_feedback(survey, feedback)}
+
+        # 설문 본문은 줄바꿈이 의미를 가지므로 정규화하지 않음
+        return [normalize(user_input), survey, normalize(feedback), domain], run
+
+    OPERATIONS = ("analyze", "retrieve", "generate", "feedback")
+
+    def handle(self, operation: str, body: dict) -> tuple[dict, bool]:
+        """(응답, 병합 여부) 반환, 동일한 요청이 처리 중이면 그 결과를 함께 받음"""
+        params, run = getattr(self, operation)(body)
+
+        def admitted():
+            with self.admission.admit(), span(f"api_{operation}"):
+                return run()
+
+        return self.single_flight.do(make_key(operation, params), admitted, name=operation)
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "uptime": round(time.time() - self.started_at, 1),
+            "admission": self.admission.stats(),
+            "in_flight": self.single_flight.in_flight(),
+            "coalescing": self.single_flight.stats(),
+            "local_models": get_ollama_manager().metrics() if local_models_enabled() else {},
+        }
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    service: SurveyService = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, self.service.health())
+        else:
+            self._send_json(404, {"error": f"알 수 없는 경로입니다: {self.path}"})
+
+    def do_POST(self):
+        operation = self.path.strip("/")
+        if operation not in SurveyService.OPERATIONS:
+            self._send_json(404, {"error": f"알 수 없는 경로입니다: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict):
+                raise BadRequest("요청 본문은 JSON 객체여야 합니다.")
+            start = time.perf_counter()
+            result, shared = self.service.handle(operation, body)
+        except (BadRequest, json.JSONDecodeError) as e:
+            self._send_json(400, {"error": str(e)})
+        except Overloaded as e:
+            retry_after = max(1, round(Config.API_QUEUE_TIMEOUT / 2))
+            self._send_json(503, {"error": f"요청이 많아 처리할 수 없습니다. {e}"}, {"Retry-After": str(retry_after)})
+        except Exception as e:
+            print(f"⚠️ /{operation} 처리 실패: {type(e).__name__}: {e}")
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+        else:
+            self._send_json(200, result, {
+                "X-Coalesced": "true" if shared else "false",
+                "X-Elapsed": f"{time.perf_counter() - start:.3f}",
+            })
+
+
+def serve(host: str, port: int, service: SurveyService) -> ThreadingHTTPServer:
+    handler = type("Handler", (ServiceHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AutoSurvey HTTP 서비스")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=Config.API_PORT)
+    parser.add_argument("--analysis-model", default="gpt-5-mini")
+    args = parser.parse_args()
+
+    service = SurveyService(analysis_model=args.analysis_model)
+    print("검색 인덱스 로드 중...")
+    service.warm_up()
+    server = serve(args.host, args.port, service)
+    print(f"✅ AutoSurvey API 실행 중: http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,12 @@ import time
 import streamlit as st
 from user_input.user_input_module import UserInputAnalyzer
 from system_orchestration.orchestration import SurveyOrchestration
-from domain_model.survey_generator import SurveyGenerator
+from rag.speculative import analyze_with_speculation
 from rag.config import Config
-from rag.rag_module import SurveyRAG
+from feedback_output.version_store import SurveyVersionStore, new_session_id
+from utils.tracing import span, tracing_enabled, serve_metrics
+from utils.jobs import get_job_manager
+from utils.ollama_manager import preload_local_models
 
 # 페이지 설정
 st.set_page_config(
@@ -14,14 +17,30 @@ st.set_page_config(
 )
 
 # 세션 상태 초기화
-if 'survey_history' not in st.session_state:
-    st.session_state.survey_history = []
+# 세션 id는 URL(?session=)로 유지해 새로고침 · 재시작 후에도 버전 히스토리를 이어서 사용
+if 'session_id' not in st.session_state:
+    session_id = st.query_params.get("session")
+    if not (session_id and session_id.isalnum()):
+        session_id = new_session_id()
+        st.query_params["session"] = session_id
+    st.session_state.session_id = session_id
+if 'current_version' not in st.session_state:
+    st.session_state.current_version = None
+# 실행 중인 백그라운드 작업 id (URL ?job= 으로도 유지해 새로고침 후에도 이어서 확인)
+if 'job_id' not in st.session_state:
+    st.session_state.job_id = st.query_params.get("job")
+# 작업 완료 후 다음 화면에 표시할 알림 (종류, 메시지)
+if 'job_notice' not in st.session_state:
+    st.session_state.job_notice = None
 if 'current_survey' not in st.session_state:
     st.session_state.current_survey = None
 if 'orchestrator' not in st.session_state:
     st.session_state.orchestrator = None
 if 'user_input' not in st.session_state:
     st.session_state.user_input = None
+# 요구사항 분석 중 시작한 추측 검색
+if 'speculative' not in st.session_state:
+    st.session_state.speculative = None
 if 'step' not in st.session_state:
     st.session_state.step = 1
 if 'survey_version' not in st.session_state:
@@ -31,13 +50,210 @@ if 'rag_context' not in st.session_state:
     st.session_state.rag_context = None
 if 'selected_domain' not in st.session_state:
     st.session_state.selected_domain = None
+# 재생성 전까지 모아둔 피드백
+if 'feedback_queue' not in st.session_state:
+    st.session_state.feedback_queue = []
+# 요청별 단계 소요 시간 (트레이싱 활성화 시)
+if 'trace_breakdowns' not in st.session_state:
+    st.session_state.trace_breakdowns = []
+
+
+def queue_feedback():
+    """입력된 피드백을 대기열에 추가하고 입력창 초기화"""
+    text = st.session_state.get('feedback_input', '').strip()
+    if text:
+        st.session_state.feedback_queue.append(text)
+        st.session_state.feedback_input = ""
     
 
+def record_trace(label: str, root):
+    """요청의 스팬 트리를 단계별 소요 시간 표로 저장"""
+    rows = root.breakdown()
+    if rows:
+        st.session_state.trace_breakdowns.append((label, [
+            {"단계": "　" * row["depth"] + row["name"], **{k: v for k, v in row.items() if k not in ("depth", "name")}}
+            for row in rows
+        ]))
+
+
+@st.cache_resource
+def get_analyzer() -> UserInputAnalyzer:
+    """요구사항 분석기 (앱 시작 시 1회 생성, 형태소 분석기 예열 포함)"""
+    return UserInputAnalyzer(stopword_path="./user_input/stopword.txt")
+
+
+@st.cache_resource
+def start_metrics_server():
+    """Prometheus 지표 HTTP 노출 (AUTOSURVEY_METRICS_PORT 설정 시, 앱 프로세스당 1회)"""
+    if tracing_enabled() and Config.METRICS_PORT:
+        return serve_metrics(Config.METRICS_PORT)
+
+
+@st.cache_resource
+def preload_domain_models():
+    """도메인 모델 예열 (앱 프로세스당 1회, 백그라운드)"""
+    return preload_local_models()
+
+
+@st.cache_resource
+def get_version_store(session_id: str) -> SurveyVersionStore:
+    """세션별 버전 저장소 (세션당 연결 1개)"""
+    return SurveyVersionStore(session_id)
+
+
+def restore_version(version: int):
+    """저장된 버전을 현재 설문지로 복원 (재시작 후라면 저장된 요구사항으로 오케스트레이터 재구성)"""
+    st.session_state.current_survey = version_store.get(version)
+    st.session_state.current_version = version
+    st.session_state.survey_version += 1
+    if st.session_state.orchestrator is None:
+        user_input = version_store.get_meta("user_input")
+        if user_input:
+            st.session_state.user_input = user_input
+            st.session_state.orchestrator = SurveyOrchestration(user_input)
+            st.session_state.rag_context = version_store.get_meta("rag_context")
+            st.session_state.step = 4
+
+
+# ============================================
+# 백그라운드 작업 (검색 · 생성 · 재생성)
+# 작업 스레드에서는 st.session_state에 접근하지 않고 결과만 반환, 반영은 화면 갱신 시 수행
+# ============================================
+def run_retrieval(job, user_input: dict, speculative=None) -> dict:
+    with span("retrieval_request") as root:
+        orchestrator = SurveyOrchestration(user_input, speculative=speculative)
+        job.report(f"유사 설문지 검색 중 (검색 쿼리: {orchestrator.build_rag_query()})")
+        orchestrator.retrieve()
+    return {"orchestrator": orchestrator, "trace": root}
+
+
+def run_generation(job, orchestrator: SurveyOrchestration) -> dict:
+    with span("generation_request") as root:
+        job.report("도메인 분류 중")
+        domain = orchestrator.classify()
+        job.report(f"설문지 생성 중 (도메인: {domain})")
+        survey = orchestrator.generate(on_text=job.stream)
+    return {"domain": domain, "survey": survey, "trace": root}
+
+
+def run_feedback(job, orchestrator: SurveyOrchestration, current_survey: str, pending: list[str]) -> dict:
+    survey = orchestrator.process_feedback(
+        current_survey, pending, on_text=job.stream, on_progress=job.report
+    )
+    return {"survey": survey, "pending": pending, "trace": orchestrator.last_trace}
+
+
+JOB_LABELS = {
+    "retrieval": "참조 설문지 검색",
+    "generation": "설문지 생성",
+    "feedback": "피드백 반영",
+}
+
+
+def start_job(kind: str, fn, *args):
+    job = get_job_manager().submit(kind, lambda job: fn(job, *args))
+    st.session_state.job_id = job.id
+    st.query_params["job"] = job.id
+    st.rerun()
+
+
+def active_job():
+    """이 세션에서 실행 중인(또는 결과 반영 전인) 작업"""
+    if st.session_state.job_id is None:
+        return None
+    job = get_job_manager().get(st.session_state.job_id)
+    if job is None:     # 만료되었거나 앱이 재시작됨
+        clear_job()
+    return job
+
+
+def clear_job():
+    st.session_state.job_id = None
+    if "job" in st.query_params:
+        del st.query_params["job"]
+
+
+def apply_job_result(job):
+    """끝난 작업의 결과를 세션 상태에 반영"""
+    label = JOB_LABELS[job.kind]
+    clear_job()
+    if job.status == "cancelled":
+        st.session_state.job_notice = ("warning", f"⏹️ {label} 작업이 취소되었습니다.")
+        return
+    if job.status == "failed":
+        st.session_state.job_notice = ("error", f"❌ {label} 중 오류 발생: {job.error}")
+        return
+
+    result = job.result
+    if job.kind == "retrieval":
+        orchestrator = result["orchestrator"]
+        st.session_state.orchestrator = orchestrator
+        st.session_state.rag_context = orchestrator.context
+        st.session_state.step = 3
+
+    elif job.kind == "generation":
+        st.session_state.selected_domain = result["domain"]
+        st.session_state.current_survey = result["survey"]
+        st.session_state.survey_version += 1
+        st.session_state.step = 4
+        # 히스토리 추가 (재시작 후 복원용 요구사항 · 검색 결과 포함)
+        st.session_state.current_version = version_store.add(result["survey"], label="초안")
+        version_store.set_meta("user_input", st.session_state.user_input)
+        version_store.set_meta("rag_context", st.session_state.rag_context)
+
+    elif job.kind == "feedback":
+        st.session_state.current_survey = result["survey"]
+        st.session_state.survey_version += 1
+        st.session_state.current_version = version_store.add(
+            result["survey"],
+            label=f"피드백 {len(result['pending'])}건 반영",
+            parent=st.session_state.current_version
+        )
+        st.session_state.feedback_queue = []
+        st.session_state.show_feedback = False
+        label = f"피드백 반영 (v{st.session_state.current_version})"
+
+    record_trace(label, result["trace"])
+    st.session_state.job_notice = ("success", f"✅ {label} 완료! ({job.elapsed:.1f}초 소요)")
+
+
+@st.fragment(run_every=Config.JOB_POLL_INTERVAL)
+def job_monitor():
+    """작업 진행 상황 · 부분 출력 표시 (주기적으로 이 영역만 갱신, 끝나면 전체 화면 갱신)"""
+    job = active_job()
+    if job is None:
+        st.rerun()
+    if job.done:
+        apply_job_result(job)
+        st.rerun()
+
+    status = job.progress or ("대기 중" if job.status == "queued" else "진행 중")
+    st.info(f"⏳ {JOB_LABELS[job.kind]}: {status} ({job.elapsed:.0f}초)")
+    if job.partial:
+        with st.container(height=400):
+            st.text(job.partial)
+    if st.button("⏹️ 작업 취소", key=f"cancel_{job.id}"):
+        job.cancel()
+
+
+get_analyzer()
+start_metrics_server()
+preload_domain_models()
+version_store = get_version_store(st.session_state.session_id)
+current_job = active_job()
+busy = current_job is not None
+
+
 # 헤더
 st.title("📋 AutoSurvey")
 st.markdown("### AI 기반 설문지 자동 생성 시스템")
 st.markdown("---")
 
+if st.session_state.job_notice:
+    kind, message = st.session_state.job_notice
+    getattr(st, kind)(message)
+    st.session_state.job_notice = None
+
 
 # ============================================
 # 사이드바: 버전 히스토리
@@ -45,28 +261,39 @@ st.markdown("---")
 with st.sidebar:
     st.header("📚 버전 히스토리")
     
-    if len(st.session_state.survey_history) == 0:
+    versions = version_store.versions()
+    if not versions:
         st.info("아직 생성된 설문지가 없습니다.")
     else:
-        for idx, (version, survey_text, timestamp) in enumerate(
-            reversed(st.session_state.survey_history)
-        ):
-            with st.expander(f"버전 {version} - {timestamp}"):
-                st.text_area(
-                    "설문지 내용",
-                    survey_text,
-                    height=200,
-                    key=f"history_{idx}",
-                    disabled=True
+        for meta in versions:
+            version = meta["version"]
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(meta["created_at"]))
+            current = " (현재)" if version == st.session_state.current_version else ""
+            with st.expander(f"버전 {version} - {timestamp}{current}"):
+                st.caption(
+                    f"{meta['label']} · {meta['chars']:,}자"
+                    + (f" · 버전 {meta['parent']}에서 수정" if meta['parent'] else "")
                 )
-                if st.button("이 버전으로 복원", key=f"restore_{idx}"):
-                    st.session_state.current_survey = survey_text
+                # 본문은 '내용 보기'를 켠 버전만 복원해 표시
+                if st.toggle("내용 보기", key=f"show_{version}"):
+                    st.text_area(
+                        "설문지 내용",
+                        version_store.get(version),
+                        height=200,
+                        key=f"history_{version}",
+                        disabled=True
+                    )
+                if st.button("이 버전으로 복원", key=f"restore_{version}", disabled=busy):
+                    restore_version(version)
                     st.rerun()
     
     st.markdown("---")
     if st.button("🔄 전체 초기화", type="secondary", use_container_width=True):
+        if current_job is not None:
+            current_job.cancel()
         for key in list(st.session_state.keys()):
             del st.session_state[key]
+        st.query_params.clear()     # 새 세션(빈 히스토리)으로 시작
         st.rerun()
 
 
@@ -114,16 +341,15 @@ user_text = st.text_area(
 
 
 # 생성 버튼
-if st.button("🚀 요구사항 분석하기", type="primary", use_container_width=True):
+if st.button("🚀 요구사항 분석하기", type="primary", use_container_width=True, disabled=busy):
     if not user_text.strip():
         st.error("요구사항을 입력해주세요!")
     else:
-        with st.spinner("📊 요구사항 분석 중..."):
-            analyzer = UserInputAnalyzer(
-                stopword_path="./user_input/stopword.txt",
-            )
-            st.session_state.user_input = analyzer(user_text)
+        with st.spinner("📊 요구사항 분석 중..."), span("analysis_request") as root:
+            analyzer = get_analyzer()
+            st.session_state.user_input, st.session_state.speculative = analyze_with_speculation(analyzer, user_text)
             st.session_state.step = 2
+        record_trace("요구사항 분석", root)
             
         st.success("✅ 요구사항 분석 완료!")
         st.rerun()
@@ -139,37 +365,11 @@ if st.session_state.step >= 2 and st.session_state.rag_context is None:
     st.markdown("---")
     st.header("2️⃣ 참조 설문지 검색")
     
-    if st.button("🔍 참조 설문지 검색 시작", type="primary", use_container_width=True):
-        with st.spinner("🔎 유사 설문지 검색 중..."):
-            # Orchestrator 초기화
-            orchestrator = SurveyOrchestration(st.session_state.user_input)
-            
-            # RAG만 실행 (설문지 생성 전)
-            rag_params = orchestrator.adjust_rag_params()
-            rag_input = orchestrator.build_rag_query()
-            
-            # RAG 진행 상황 표시
-            st.info(f"**검색 쿼리**: {rag_input}")
-            
-
-            
-            survey_rag = SurveyRAG(
-                model_name=Config.MODEL_NAME,
-                sparse_weight=rag_params['sparse_weight'],
-                dense_weight=rag_params['dense_weight'],
-                k=rag_params['k']
-            )
-            
-            context = survey_rag(rag_input)
-            
-            # 결과 저장
-            st.session_state.rag_context = context
-            st.session_state.orchestrator = orchestrator
-            orchestrator.context = context  # orchestrator에도 저장
-            st.session_state.step = 3
-            
-        st.success("✅ 참조 설문지 검색 완료!")
-        st.rerun()
+    if busy and current_job.kind == "retrieval":
+        job_monitor()
+    elif st.button("🔍 참조 설문지 검색 시작", type="primary", use_container_width=True, disabled=busy):
+        # RAG만 실행 (설문지 생성 전), 결과는 작업 완료 시 반영
+        start_job("retrieval", run_retrieval, st.session_state.user_input, st.session_state.speculative)
 
 
 # RAG 결과 표시
@@ -198,35 +398,11 @@ if st.session_state.step >= 3 and st.session_state.current_survey is None:
     st.markdown("---")
     st.header("3️⃣ 설문지 생성")
     
-    if st.button("✨ 설문지 생성 진행", type="primary", use_container_width=True):
-        with st.spinner("✨ AI 설문지 생성 중..."):
-            t_start = time.time()
-            
-            # 도메인 분류
-            orchestrator = st.session_state.orchestrator
-            orchestrator.selected_domain = orchestrator.domain_classifier(
-                st.session_state.user_input,
-                st.session_state.rag_context
-            )
-            st.session_state.selected_domain = orchestrator.selected_domain
-
-            # 설문지 생성
-            generator = SurveyGenerator(model_name='gpt-5')
-            survey = generator(st.session_state.user_input, st.session_state.rag_context)
-            
-            t_elapsed = time.time() - t_start
-            
-            # 상태 저장
-            st.session_state.current_survey = survey
-            st.session_state.survey_version += 1
-            st.session_state.step = 4
-            
-            # 히스토리 추가
-            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-            st.session_state.survey_history.append((1, survey, timestamp))
-            
-        st.success(f"✅ 설문지 생성 완료! ({t_elapsed:.1f}초 소요)")
-        st.rerun()
+    if busy and current_job.kind == "generation":
+        job_monitor()
+    elif st.button("✨ 설문지 생성 진행", type="primary", use_container_width=True, disabled=busy):
+        # 도메인 분류 + 설문지 생성 (생성 중인 내용은 부분 출력으로 표시)
+        start_job("generation", run_generation, st.session_state.orchestrator)
 
 
 # ============================================
@@ -283,45 +459,57 @@ if st.session_state.get('show_feedback', False) or st.session_state.step >= 5:
             key="feedback_input"
         )
         
-        col1, col2 = st.columns([1, 4])
+        # 대기 중인 피드백 표시
+        if st.session_state.feedback_queue:
+            st.markdown(f"**대기 중인 피드백 ({len(st.session_state.feedback_queue)}건)** — 재생성 시 한 번에 반영됩니다.")
+            for i, item in enumerate(st.session_state.feedback_queue, 1):
+                st.markdown(f"{i}. {item}")
+        
+        col1, col2, col3 = st.columns([1, 1, 3])
         with col1:
-            if st.button("🔄 재생성", type="primary", use_container_width=True):
-                if not feedback_text.strip():
+            st.button("➕ 피드백 추가", on_click=queue_feedback, use_container_width=True)
+        
+        with col2:
+            if st.button("🔄 재생성", type="primary", use_container_width=True, disabled=busy):
+                # 대기열 + 현재 입력창의 피드백을 한 번에 처리
+                pending = list(st.session_state.feedback_queue)
+                if feedback_text.strip():
+                    pending.append(feedback_text.strip())
+                
+                if not pending:
                     st.error("피드백을 입력해주세요!")
                 else:
-                    with st.spinner("🔍 피드백 분석 및 재생성 중..."):
-                        try:
-                            modified_survey = st.session_state.orchestrator.process_feedback(
-                                st.session_state.current_survey,
-                                feedback_text
-                            )
-                            
-                            st.session_state.current_survey = modified_survey
-                            st.session_state.survey_version += 1
-                            
-                            version = len(st.session_state.survey_history) + 1
-                            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-                            st.session_state.survey_history.append(
-                                (version, modified_survey, timestamp)
-                            )
-                            
-                            st.session_state.show_feedback = False
-                            st.success("✅ 설문지가 수정되었습니다!")
-                            st.rerun()
-                            
-                        except Exception as e:
-                            st.error(f"❌ 오류 발생: {str(e)}")
+                    # 피드백 분석 + 재생성 (결과는 작업 완료 시 반영)
+                    start_job(
+                        "feedback", run_feedback,
+                        st.session_state.orchestrator, st.session_state.current_survey, pending
+                    )
         
-        with col2:
-            if st.button("❌ 피드백 취소", use_container_width=True):
+        with col3:
+            if st.button("❌ 피드백 취소", use_container_width=True, disabled=busy):
+                st.session_state.feedback_queue = []
                 st.session_state.show_feedback = False
                 st.rerun()
+
+        if busy and current_job.kind == "feedback":
+            job_monitor()
     
     else:
         st.success("설문지 작성이 완료되었습니다!")
         st.info("사이드바에서 이전 버전을 확인하거나, 새로운 설문지를 생성할 수 있습니다.")
 
 
+# ============================================
+# 요청별 단계 소요 시간 (AUTOSURVEY_TRACING=on)
+# ============================================
+if tracing_enabled() and st.session_state.trace_breakdowns:
+    st.markdown("---")
+    with st.expander("⏱️ 요청별 단계 소요 시간"):
+        for label, rows in reversed(st.session_state.trace_breakdowns):
+            st.markdown(f"**{label}**")
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+
+
 # ============================================
 # 푸터
 # ============================================
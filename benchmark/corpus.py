@@ -0,0 +1,121 @@
+# benchmark/corpus.py
+"""
+벤치마크용 합성 설문 코퍼스 생성기
+
+실제 설문지 PDF와 비슷한 구조(조사 개요 → SQ 인구통계 문항 → Q 본 문항 + 보기)의
+한국어 텍스트를 시드 고정으로 생성
+"""
+import random
+from pathlib import Path
+from langchain_core.documents import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+
+DOMAIN_TOPICS = {
+    "공공·사회": ["행정 서비스", "지역 안전", "대중교통", "주거 환경", "민원 처리", "소방 장비", "복지 정책"],
+    "교육": ["온라인 강의", "교수 피드백", "진로 지도", "학교 시설", "교육 과정", "학습 동기", "평가 방식"],
+    "산업·경제": ["고객 서비스", "제품 품질", "브랜드 인지도", "구매 의향", "근무 환경", "물가 인식", "창업 지원"],
+    "의료·보건·복지": ["진료 만족도", "의료진 소통", "조직 문화", "건강 관리", "대기 시간", "돌봄 서비스", "정신 건강"],
+}
+
+RESPONDENTS = ["대학생", "직장인", "소방공무원", "의료진", "지역 주민", "고객", "학부모", "교사"]
+
+DEMOGRAPHICS = [
+    ("귀하의 성별은 무엇입니까?", ["남성", "여성"]),
+    ("귀하의 연령대는 어떻게 되십니까?", ["20대", "30대", "40대", "50대", "60대 이상"]),
+    ("귀하의 거주 지역은 어디입니까?", ["서울", "경기·인천", "충청", "영남", "호남", "강원·제주"]),
+    ("귀하의 근무 경력은 얼마나 되십니까?", ["1년 미만", "1~5년", "5~10년", "10년 이상"]),
+    ("귀하의 최종 학력은 무엇입니까?", ["고졸 이하", "대학 재학", "대졸", "대학원 이상"]),
+    ("귀하의 월평균 가구 소득은 어느 정도입니까?", ["200만원 미만", "200~400만원", "400~600만원", "600만원 이상"]),
+]
+
+STEMS = [
+    "{topic}에 대해 전반적으로 얼마나 만족하십니까?",
+    "{topic}의 개선이 얼마나 필요하다고 생각하십니까?",
+    "최근 1년간 {topic}을(를) 이용한 경험이 얼마나 자주 있으셨습니까?",
+    "{topic}과(와) 관련하여 가장 중요하다고 생각하는 요소는 무엇입니까?",
+    "{topic}에 대한 정보를 주로 어디에서 얻으십니까?",
+    "향후 {topic}을(를) 계속 이용할 의향이 있으십니까?",
+    "{topic}의 수준은 다른 기관과 비교했을 때 어떻다고 생각하십니까?",
+]
+
+LIKERT = ["매우 불만족", "불만족", "보통이다", "만족", "매우 만족"]
+AGREEMENT = ["전혀 그렇지 않다", "그렇지 않다", "보통이다", "그렇다", "매우 그렇다"]
+CHOICES = ["인터넷 검색", "지인 추천", "기관 홈페이지", "방송·신문", "SNS", "기타"]
+
+CIRCLED = "①②③④⑤⑥⑦⑧⑨⑩"
+
+
+def _options(options: list[str]) -> str:
+    return "\n".join(f"{CIRCLED[i]} {option}" for i, option in enumerate(options))
+
+
+def synthetic_survey(rng: random.Random, domain: str, num_sq: int = 4, num_q: int = 15) -> str:
+    """설문지 한 부 분량의 텍스트 생성"""
+    topics = DOMAIN_TOPICS[domain]
+    main_topic = rng.choice(topics)
+    respondent = rng.choice(RESPONDENTS)
+
+    lines = [
+        f"{respondent} 대상 {main_topic} 실태조사",
+        "",
+        "조사 개요",
+        f"- 목적: {respondent}의 {main_topic} 인식과 {rng.choice(topics)} 현황을 파악하여 정책 개선 방향을 도출",
+        f"- 대상: 전국 {respondent} {rng.randrange(300, 2000, 100)}명",
+        f"- 방법: {rng.choice(['온라인 설문', '대면 면접', '전화 조사'])}",
+        "",
+        "응답자 특성",
+    ]
+    for i, (stem, options) in enumerate(rng.sample(DEMOGRAPHICS, min(num_sq, len(DEMOGRAPHICS))), 1):
+        lines += [f"SQ{i}. {stem}", _options(options), ""]
+
+    lines.append("본 문항")
+    for i in range(1, num_q + 1):
+        stem = rng.choice(STEMS).format(topic=rng.choice(topics))
+        if "만족" in stem:
+            options = LIKERT
+        elif "어디에서" in stem or "무엇입니까" in stem:
+            options = rng.sample(CHOICES, 4)
+        else:
+            options = AGREEMENT
+        lines += [f"Q{i}. {stem}", _options(options), ""]
+
+    return "\n".join(lines)
+
+
+def synthetic_documents(num_surveys: int, seed: int = 0, chunk_size: int = 1000, chunk_overlap: int = 200) -> list[Document]:
+    """SurveyLoader.load_all()과 같은 메타데이터·청크 크기의 Document 목록"""
+    rng = random.Random(seed)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    domains = list(DOMAIN_TOPICS)
+
+    docs = []
+    for i in range(num_surveys):
+        domain = domains[i % len(domains)]
+        text = synthetic_survey(rng, domain, num_sq=rng.randint(3, 6), num_q=rng.randint(10, 40))
+        meta = {"file_name": f"synthetic_{i:05d}", "domain": domain, "num_pages": 1}
+        docs.extend(splitter.split_documents([Document(page_content=text, metadata=meta)]))
+    return docs
+
+
+def write_pdfs(out_dir, num_surveys: int, seed: int = 0) -> Path:
+    """SurveyLoader가 읽을 수 있도록 <out_dir>/<도메인>/<파일>.pdf 구조로 합성 PDF 저장"""
+    import pymupdf
+
+    rng = random.Random(seed)
+    out_dir = Path(out_dir)
+    domains = list(DOMAIN_TOPICS)
+
+    for i in range(num_surveys):
+        domain = domains[i % len(domains)]
+        text = synthetic_survey(rng, domain, num_sq=rng.randint(3, 6), num_q=rng.randint(10, 40))
+        (out_dir / domain).mkdir(parents=True, exist_ok=True)
+
+        pdf = pymupdf.open()
+        lines = text.splitlines()
+        for start in range(0, len(lines), 50):    # 페이지당 50줄
+            page = pdf.new_page()
+            page.insert_text((40, 50), "\n".join(lines[start:start + 50]), fontname="korea", fontsize=9)
+        pdf.save(out_dir / domain / f"synthetic_{i:05d}.pdf")
+        pdf.close()
+    return out_dir
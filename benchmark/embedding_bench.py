@@ -0,0 +1,110 @@
+# benchmark/embedding_bench.py
+"""
+임베딩 차원 · 저장 정밀도별 재현율 손실 대비 메모리 · 검색 지연 비교 (API 호출 없음)
+
+    python -m benchmark.embedding_bench --synthetic 2000                  # 합성 코퍼스 + 대역 임베딩
+    python -m benchmark.embedding_bench --index                           # 기존 FAISS 인덱스의 벡터 사용
+
+- 차원 축소는 저장된 전체 벡터를 잘라 재정규화 (text-embedding-3의 dimensions 파라미터와 같은 결과)
+- 질의: 인덱스 청크 벡터 표본, 정답: 전체 차원 float32 정확 검색의 상위 k개 이웃 (자기 자신 제외)
+- recall@k: 정답 이웃 중 각 설정의 상위 k개에 포함된 비율
+- 메모리: 직렬화한 인덱스 크기, 지연: 질의 1건씩 검색한 p50/p95
+"""
+import json
+import time
+import argparse
+import numpy as np
+from rag.config import Config
+from rag.embedding_index import PRECISIONS, build_index, truncate, index_bytes
+
+
+def source_vectors(args) -> np.ndarray:
+    if args.index:
+        from rag.retriever import load_indexes
+        store, _ = load_indexes()
+        return store.index.reconstruct_n(0, store.index.ntotal)
+
+    from benchmark.corpus import synthetic_documents
+    from benchmark.fakes import FakeEmbeddings
+    docs = synthetic_documents(args.synthetic, seed=args.seed)
+    return np.asarray(FakeEmbeddings(dim=args.base_dim).embed_documents([d.page_content for d in docs]), dtype=np.float32)
+
+
+def neighbors(index, queries: np.ndarray, query_ids: np.ndarray, k: int) -> tuple[list[list[int]], list[float]]:
+    """질의별 상위 k개 이웃(자기 자신 제외)과 검색 시간(초)"""
+    results, times = [], []
+    for vector, self_id in zip(queries, query_ids):
+        start = time.perf_counter()
+        _, ids = index.search(vector[None, :], k + 1)
+        times.append(time.perf_counter() - start)
+        results.append([i for i in ids[0] if i != self_id and i >= 0][:k])
+    return results, times
+
+
+def run(vectors: np.ndarray, dims: list[int], precisions: list[str], num_queries: int, k: int, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    query_ids = rng.choice(len(vectors), size=min(num_queries, len(vectors)), replace=False)
+    base_dim = vectors.shape[1]
+
+    full = truncate(vectors, base_dim)
+    truth, _ = neighbors(build_index(full, "float32"), full[query_ids], query_ids, k)
+    baseline_bytes = None
+
+    results = []
+    for dim in sorted(dims, reverse=True):
+        if dim > base_dim:
+            continue
+        reduced = truncate(vectors, dim)
+        for precision in precisions:
+            index = build_index(reduced, precision)
+            found, times = neighbors(index, reduced[query_ids], query_ids, k)
+            recall = np.mean([len(set(t) & set(f)) / max(1, len(t)) for t, f in zip(truth, found)])
+            size = index_bytes(index)
+            baseline_bytes = baseline_bytes or (size if (dim, precision) == (base_dim, "float32") else None)
+            results.append({
+                "dimensions": dim,
+                "precision": precision,
+                f"recall@{k}": float(recall),
+                "index_bytes": size,
+                "latency_p50_us": float(np.percentile(times, 50) * 1e6),
+                "latency_p95_us": float(np.percentile(times, 95) * 1e6),
+            })
+
+    for r in results:
+        r["reduction"] = baseline_bytes / r["index_bytes"] if baseline_bytes else None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 차원 · 저장 정밀도 비교")
+    parser.add_argument("--index", action="store_true", help="기존 FAISS 인덱스 벡터 사용 (기본: 합성 코퍼스)")
+    parser.add_argument("--synthetic", type=int, default=1000, help="합성 코퍼스 설문 수")
+    parser.add_argument("--base-dim", type=int, default=1536, help="대역 임베딩 차원")
+    parser.add_argument("--dims", nargs="+", type=int, default=[256, 512, 1024, 1536])
+    parser.add_argument("--precisions", nargs="+", choices=list(PRECISIONS), default=list(PRECISIONS))
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    vectors = source_vectors(args)
+    print(f"벡터 {len(vectors)}개 ({vectors.shape[1]}차원), 질의 {min(args.queries, len(vectors))}개, "
+          f"기준: {vectors.shape[1]}차원 float32 정확 검색")
+
+    results = run(vectors, args.dims, args.precisions, args.queries, args.k, args.seed)
+    for r in results:
+        print(
+            f"[{r['dimensions']:>5}차원 {r['precision']:>7}] recall@{args.k} {r[f'recall@{args.k}']:.3f} | "
+            f"{r['index_bytes'] / 1e6:7.2f}MB (1/{r['reduction']:.1f}) | "
+            f"p50 {r['latency_p50_us']:7.1f}µs p95 {r['latency_p95_us']:7.1f}µs"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": {**vars(args), "embedding_model": Config.EMBEDDING_MODEL}, "results": results},
+                      f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# benchmark/fakes.py
+"""
+API 호출 없이 파이프라인을 실행하기 위한 채팅/임베딩 모델 대역
+
+- FakeChatModel: 프롬프트 해시로 시드를 고정한 합성 설문 텍스트를 반환
+  (첫 토큰 지연 + 출력 토큰 속도로 응답 시간 모사, usage_metadata 포함)
+- FakeEmbeddings: 단어별 해시 시드 벡터의 합을 정규화 (같은 단어를 공유하면 유사도 상승)
+- fake_models(): 파이프라인 모듈의 ChatOpenAI / ChatOllama / OpenAIEmbeddings를 대역으로 교체
+"""
+import time
+import random
+import asyncio
+import hashlib
+from functools import lru_cache
+from contextlib import ExitStack, contextmanager
+from unittest import mock
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from utils.llm_cache import LLMCache
+from benchmark.corpus import DOMAIN_TOPICS, synthetic_survey
+
+
+def _seed(text: str) -> int:
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:16], 16)
+
+
+class FakeChatModel(BaseChatModel):
+    """결정적 응답 채팅 모델 (같은 프롬프트 → 같은 응답)"""
+
+    model_name: str = "fake-chat"
+    temperature: float | None = None
+    latency: float = 0.0            # 첫 토큰까지 지연(초)
+    tokens_per_sec: float = 0.0     # 출력 속도, 0이면 출력 시간 없음
+    output_tokens: int = 400        # 응답 길이(어절 수를 토큰 수로 간주)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _respond(self, messages) -> tuple[AIMessage, float]:
+        prompt = LLMCache.render_prompt(messages)
+        rng = random.Random(_seed(prompt))
+        domain = rng.choice(list(DOMAIN_TOPICS))
+        words = synthetic_survey(rng, domain, num_q=40).split(" ")[:self.output_tokens]
+        content = " ".join(words)
+
+        input_tokens = len(prompt) // 2
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": len(words),
+                "total_tokens": input_tokens + len(words),
+            },
+        )
+        delay = self.latency + (len(words) / self.tokens_per_sec if self.tokens_per_sec else 0.0)
+        return message, delay
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message, delay = self._respond(messages)
+        if delay:
+            time.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message, delay = self._respond(messages)
+        if delay:
+            await asyncio.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class FakeEmbeddings(Embeddings):
+    """해시 시드 기반 결정적 임베딩"""
+
+    def __init__(self, dim: int = 1536, latency: float = 0.0, model: str = "fake-embedding"):
+        self.dim = dim
+        self.latency = latency
+        self.model = model
+
+    @lru_cache(maxsize=200_000)
+    def _word_vector(self, word: str) -> np.ndarray:
+        return np.random.default_rng(_seed(word)).standard_normal(self.dim).astype(np.float32)
+
+    def _embed(self, text: str) -> list[float]:
+        words = text.split() or [""]
+        vector = np.sum([self._word_vector(w) for w in words], axis=0)
+        return (vector / max(np.linalg.norm(vector), 1e-12)).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._embed(text)
+
+
+# 대역으로 교체할 (모듈, 속성) 목록
+CHAT_TARGETS = [
+    ("rag.rag_module", "ChatOpenAI"),
+    ("system_orchestration.domain_classifier", "ChatOpenAI"),
+    ("domain_model.survey_generator", "ChatOpenAI"),
+    ("domain_model.survey_generator", "ChatOllama"),
+    ("domain_model.survey_regenerator", "ChatOpenAI"),
+    ("domain_model.survey_regenerator", "ChatOllama"),
+    ("feedback_output.feedback_analyzer", "ChatOpenAI"),
+    ("feedback_output.survey_validator", "ChatOpenAI"),
+]
+EMBEDDING_TARGETS = [
+    ("rag.embedding_index", "OpenAIEmbeddings"),    # 검색 · 인덱스 구축 · 도메인 분류 공통 (make_embeddings)
+]
+
+
+@contextmanager
+def fake_models(latency: float = 0.0, tokens_per_sec: float = 0.0, output_tokens: int = 400, embedding_dim: int = 1536):
+    """파이프라인이 생성하는 모든 채팅/임베딩 모델을 대역으로 교체"""
+
+    def chat_factory(model=None, model_name=None, temperature=None, **kwargs):
+        return FakeChatModel(
+            model_name=f"fake-{model or model_name}",
+            temperature=temperature,
+            latency=latency,
+            tokens_per_sec=tokens_per_sec,
+            output_tokens=output_tokens,
+        )
+
+    def embedding_factory(model=None, dimensions=None, **kwargs):
+        return FakeEmbeddings(dim=dimensions or embedding_dim, model=f"fake-{model}")
+
+    with ExitStack() as stack:
+        for module, attr in CHAT_TARGETS:
+            stack.enter_context(mock.patch(f"{module}.{attr}", chat_factory))
+        for module, attr in EMBEDDING_TARGETS:
+            stack.enter_context(mock.patch(f"{module}.{attr}", embedding_factory))
+        yield
@@ -0,0 +1,602 @@
+# benchmark/mock_server.py
+"""
+OpenAI · Ollama 호환 로컬 대역 서버 (부하 · 지연 테스트용, 표준 라이브러리만 사용)
+
+    python -m benchmark.mock_server --port 8765 --latency 0.8 --latency-dist lognormal \\
+        --tokens-per-sec 80 --rpm 120 --tpm 200000 --error-429 0.05 --error-500 0.01 --seed 0
+
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=mock OLLAMA_HOST=http://127.0.0.1:8765 \\
+        python -m system_orchestration.batch_runner briefs.jsonl
+
+엔드포인트
+- POST /v1/chat/completions (stream=true 시 SSE)
+- POST /v1/responses
+- POST /v1/embeddings (encoding_format float/base64, 해시 기반 결정적 벡터)
+- POST /api/chat (Ollama, 기본 NDJSON 스트리밍)
+- POST /api/generate (Ollama, 프롬프트 없이 호출하면 모델 로드만 수행)
+- GET  /api/ps (Ollama, 로드된 모델과 만료 시각)
+- GET  /stats (엔드포인트 · 상태 코드별 요청 수, 최대 동시 요청 수, Ollama 모델별 최대 동시 요청 수 · 로드 횟수)
+
+Ollama 모델은 로드되지 않은 상태에서 요청을 받으면 --load-latency 만큼 로드 지연을 적용하고,
+요청의 keep_alive(기본 5분, 0이면 즉시 해제, 음수면 계속 유지) 동안 로드 상태를 유지
+
+응답 내용은 프롬프트 해시로 결정되며, 파이프라인 각 단계(요구사항 추출 JSON, 피드백 분석 JSON,
+도메인 분류, 설문 생성)가 파싱할 수 있는 형식으로 반환
+"""
+import re
+import json
+import time
+import uuid
+import base64
+import random
+import argparse
+import threading
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from benchmark.corpus import DOMAIN_TOPICS, RESPONDENTS, DEMOGRAPHICS, LIKERT, synthetic_survey
+from benchmark.fakes import FakeEmbeddings, _seed
+
+
+class MockSettings:
+    """지연 분포 · 출력 속도 · 서버 측 한도 · 오류 주입 설정"""
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        latency_dist: str = "fixed",
+        latency_sigma: float = 0.5,
+        tokens_per_sec: float = 0.0,
+        output_tokens: int = 400,
+        rpm: int = 0,
+        tpm: int = 0,
+        error_429: float = 0.0,
+        error_500: float = 0.0,
+        load_latency: float = 0.0,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            latency: 첫 토큰까지 지연(초), lognormal이면 중앙값
+            latency_dist: fixed / uniform(0 ~ 2×latency) / lognormal(sigma=latency_sigma)
+            tokens_per_sec: 출력 속도 (0이면 출력 시간 없음)
+            rpm, tpm: 모델별 분당 요청 · 토큰 한도 (0이면 제한 없음, 초과 시 429 + Retry-After)
+            error_429, error_500: 요청마다 주입할 오류 확률
+            load_latency: Ollama 모델이 로드되지 않은 상태에서 받은 요청의 로드 지연(초)
+        """
+        self.latency = latency
+        self.latency_dist = latency_dist
+        self.latency_sigma = latency_sigma
+        self.tokens_per_sec = tokens_per_sec
+        self.output_tokens = output_tokens
+        self.rpm = rpm
+        self.tpm = tpm
+        self.error_429 = error_429
+        self.error_500 = error_500
+        self.load_latency = load_latency
+        self.seed = seed
+
+
+def parse_keep_alive(value) -> float:
+    """Ollama keep_alive (초 단위 숫자 또는 "30s" / "5m" / "1h") → 초, 음수면 무기한"""
+    if value is None:
+        return 300.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip()
+    units = {"s": 1, "m": 60, "h": 3600}
+    if value[-1:] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 2)
+
+
+def render_messages(messages) -> str:
+    """chat/responses/ollama 메시지 목록을 하나의 문자열로"""
+    if isinstance(messages, str):
+        return messages
+    parts = []
+    for message in messages or []:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        parts.append(f"{message.get('role', '')}: {content}")
+    return "\n".join(parts)
+
+
+def respond(prompt: str, output_tokens: int) -> str:
+    """파이프라인 단계를 프롬프트로 판별해 파싱 가능한 결정적 응답 생성"""
+    rng = random.Random(_seed(prompt))
+    domain = rng.choice(list(DOMAIN_TOPICS))
+    topics = DOMAIN_TOPICS[domain]
+
+    if '"edits"' in prompt:
+        return json.dumps({"edits": [{
+            "feedback_type": "문항 수정",
+            "target_question": "Q1",
+            "modification": f"Q1 문항의 {rng.choice(topics)} 관련 표현을 구체화",
+            "priority": "중간",
+        }]}, ensure_ascii=False)
+
+    if '"조사목적"' in prompt:
+        return json.dumps({
+            "조사목적": f"{rng.choice(topics)} 인식 파악",
+            "조사대상": rng.choice(RESPONDENTS),
+            "주요측정변수": rng.sample(topics, 3),
+            "요청문항수": f"{rng.choice([10, 20, 30])}문항",
+            "설문요구사항": "5점 척도 사용",
+        }, ensure_ascii=False)
+
+    if '"key_domains"' in prompt:
+        survey = synthetic_survey(rng, domain, num_q=6)
+        return json.dumps({
+            "purpose": f"{rng.choice(RESPONDENTS)}의 {rng.choice(topics)} 인식 파악",
+            "structure": "응답자 특성 SQ1~SQ4, 본 문항 Q1~Q6",
+            "key_domains": rng.sample(topics, 3),
+            "extra_domains": [],
+            "response_formats": ["5점 척도", "객관식"],
+            "questions": [block for block in survey.split("\n\n") if block.startswith(("SQ", "Q"))][:5],
+        }, ensure_ascii=False)
+
+    if '"patches"' in prompt:
+        # 설문지 부분 보완: 작업 목록의 "보기 작성: Q5" · "척도 재작성: Q5" · "문항 추가: Q 2개"만큼 작성
+        patches = []
+        for task, target in re.findall(r"- (보기 작성|척도 재작성): (S?Q\d+)", prompt):
+            patches.append({"target": target, "section": target.rstrip("0123456789"),
+                            "question": "", "options": LIKERT})
+        for section, count in re.findall(r"- 문항 추가: (S?Q) (\d+)개", prompt):
+            for _ in range(int(count)):
+                stem, options = rng.choice(DEMOGRAPHICS) if section == "SQ" else \
+                    (f"{rng.choice(topics)}에 대해 얼마나 만족하십니까?", LIKERT)
+                patches.append({"target": "", "section": section, "question": stem, "options": options})
+        return json.dumps({"patches": patches}, ensure_ascii=False)
+
+    if "[공공·사회 / 교육" in prompt:
+        return domain
+
+    words = synthetic_survey(rng, domain, num_q=40).split(" ")
+    return " ".join(words[:output_tokens])
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, settings: MockSettings):
+        super().__init__(address, MockHandler)
+        self.settings = settings
+        self.rng = random.Random(settings.seed)
+        self.lock = threading.Lock()
+        self.windows = {}           # 모델 → deque[(시각, 토큰)] (최근 60초)
+        self.stats = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # Ollama 모델 상태
+        self.loaded = {}            # 모델 → 만료 시각(epoch 초)
+        self.model_locks = {}       # 모델별 로드 직렬화
+        self.model_in_flight = Counter()
+        self.model_max_in_flight = Counter()
+        self.model_loads = Counter()
+
+    def ensure_loaded(self, model: str, keep_alive) -> float:
+        """모델이 로드되어 있지 않으면 로드 지연 적용, keep_alive로 만료 시각 갱신 후 로드 시간(초) 반환"""
+        with self.lock:
+            lock = self.model_locks.setdefault(model, threading.Lock())
+        with lock:
+            now = time.time()
+            with self.lock:
+                cold = self.loaded.get(model, 0) <= now
+            load_seconds = self.settings.load_latency if cold else 0.0
+            if load_seconds:
+                time.sleep(load_seconds)
+            seconds = parse_keep_alive(keep_alive)
+            with self.lock:
+                if cold:
+                    self.model_loads[model] += 1
+                if seconds == 0:
+                    self.loaded.pop(model, None)
+                else:
+                    self.loaded[model] = float("inf") if seconds < 0 else time.time() + seconds
+        return load_seconds
+
+    def sample_latency(self) -> float:
+        s = self.settings
+        with self.lock:
+            if s.latency_dist == "uniform":
+                return self.rng.uniform(0, 2 * s.latency)
+            if s.latency_dist == "lognormal":
+                return s.latency * float(np.exp(self.rng.gauss(0, s.latency_sigma)))
+            return s.latency
+
+    def injected_error(self) -> int | None:
+        with self.lock:
+            r = self.rng.random()
+        if r < self.settings.error_429:
+            return 429
+        if r < self.settings.error_429 + self.settings.error_500:
+            return 500
+        return None
+
+    def admit(self, model: str, tokens: int) -> float | None:
+        """서버 측 rpm/tpm 한도 확인, 초과 시 재시도까지 대기 시간(초) 반환"""
+        s = self.settings
+        if not s.rpm and not s.tpm:
+            return None
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.setdefault(model, deque())
+            while window and now - window[0][0] >= 60:
+                window.popleft()
+            used = sum(t for _, t in window)
+            if (s.rpm and len(window) + 1 > s.rpm) or (s.tpm and used + tokens > s.tpm):
+                return max(0.05, 60 - (now - window[0][0])) if window else 1.0
+            window.append((now, tokens))
+        return None
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: MockServer
+
+    def log_message(self, *args):
+        pass
+
+    # === 공통 ===
+    def _send_json(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+        with self.server.lock:
+            self.server.stats[f"{self.path} {status}"] += 1
+
+    def _send_error(self, status: int, message: str, retry_after: float = None):
+        headers = {}
+        if retry_after is not None:
+            headers = {"retry-after-ms": str(int(retry_after * 1000)), "retry-after": str(max(1, round(retry_after)))}
+        error_type = "rate_limit_error" if status == 429 else "server_error"
+        self._send_json(status, {"error": {"message": message, "type": error_type, "code": error_type}}, headers)
+
+    def _start_stream(self, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        with self.server.lock:
+            self.server.stats[f"{self.path} 200"] += 1
+
+    def _pieces(self, text: str):
+        """출력 속도에 맞춰 어절 단위로 내보냄"""
+        words = text.split(" ")
+        delay = 1 / self.server.settings.tokens_per_sec if self.server.settings.tokens_per_sec else 0.0
+        for i, word in enumerate(words):
+            if delay:
+                time.sleep(delay)
+            yield word if i == 0 else " " + word
+
+    def _generation_delay(self, output_tokens: int) -> float:
+        tps = self.server.settings.tokens_per_sec
+        return output_tokens / tps if tps else 0.0
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.server.lock:
+                body = {
+                    "requests": dict(self.server.stats),
+                    "max_in_flight": self.server.max_in_flight,
+                    "model_max_in_flight": dict(self.server.model_max_in_flight),
+                    "model_loads": dict(self.server.model_loads),
+                }
+            self._send_json(200, body)
+        elif self.path == "/api/ps":
+            self._ollama_ps()
+        else:
+            self._send_error(404, f"unknown path {self.path}")
+
+    def do_POST(self):
+        routes = {
+            "/v1/chat/completions": self._chat_completions,
+            "/v1/responses": self._responses,
+            "/v1/embeddings": self._embeddings,
+            "/api/chat": self._ollama_chat,
+            "/api/generate": self._ollama_generate,
+        }
+        handler = routes.get(self.path.split("?")[0])
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if handler is None:
+            self._send_error(404, f"unknown path {self.path}")
+            return
+
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        try:
+            handler(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass    # 클라이언트가 요청을 취소함 (hedged 디스패치 등)
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _admit(self, model: str, prompt_tokens: int, output_tokens: int) -> bool:
+        """오류 주입 · 한도 확인 후 첫 토큰 지연까지 적용, 거절 시 False"""
+        error = self.server.injected_error()
+        if error == 429:
+            self._send_error(429, "Rate limit reached (injected)", retry_after=1.0)
+            return False
+        if error == 500:
+            self._send_error(500, "Internal server error (injected)")
+            return False
+
+        wait = self.server.admit(model, prompt_tokens + output_tokens)
+        if wait is not None:
+            self._send_error(429, f"Rate limit reached for {model}", retry_after=wait)
+            return False
+
+        time.sleep(self.server.sample_latency())
+        return True
+
+    # === OpenAI ===
+    def _chat_completions(self, body: dict):
+        model = body.get("model", "mock")
+        prompt = render_messages(body.get("messages"))
+        text = respond(prompt, self.server.settings.output_tokens)
+        prompt_tokens, completion_tokens = _count_tokens(prompt), len(text.split(" "))
+        if not self._admit(model, prompt_tokens, completion_tokens):
+            return
+
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            time.sleep(self._generation_delay(completion_tokens))
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        self._start_stream("text/event-stream")
+
+        def event(delta: dict, finish_reason=None, **extra):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else [],
+                **extra,
+            }
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        event({"role": "assistant", "content": ""})
+        for piece in self._pieces(text):
+            event({"content": piece})
+        event({}, finish_reason="stop")
+        if (body.get("stream_options") or {}).get("include_usage"):
+            event(None, usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _responses(self, body: dict):
+        model = body.get("model", "mock")
+        prompt = render_messages(body.get("input"))
+        text = respond(prompt, min(self.server.settings.output_tokens, body.get("max_output_tokens") or 10**9))
+        input_tokens, output_tokens = _count_tokens(prompt), len(text.split(" "))
+        if not self._admit(model, input_tokens, output_tokens):
+            return
+
+        time.sleep(self._generation_delay(output_tokens))
+        self._send_json(200, {
+            "id": f"resp_{uuid.uuid4().hex[:12]}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": model,
+            "status": "completed",
+            "output": [{
+                "type": "message",
+                "id": f"msg_{uuid.uuid4().hex[:12]}",
+                "status": "completed",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }],
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+            "usage": {
+                "input_tokens": input_tokens,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens": output_tokens,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": input_tokens + output_tokens,
+            },
+        })
+
+    def _embeddings(self, body: dict):
+        model = body.get("model", "mock-embedding")
+        inputs = body.get("input")
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        # 토큰 배열 입력(langchain 기본 동작)은 토큰 id 문자열로 해시
+        texts = [t if isinstance(t, str) else " ".join(map(str, t)) for t in inputs]
+        tokens = sum(_count_tokens(t) for t in texts)
+        if not self._admit(model, tokens, 0):
+            return
+
+        embedder = _embedder(body.get("dimensions") or 1536)
+        data = []
+        for i, text in enumerate(texts):
+            vector = embedder.embed_query(text)
+            if body.get("encoding_format") == "base64":
+                vector = base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+            data.append({"object": "embedding", "index": i, "embedding": vector})
+
+        self._send_json(200, {
+            "object": "list",
+            "data": data,
+            "model": model,
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+    # === Ollama ===
+    def _ollama_ps(self):
+        now = time.time()
+        with self.server.lock:
+            loaded = {model: expires for model, expires in self.server.loaded.items() if expires > now}
+        models = []
+        for model, expires in loaded.items():
+            expires_at = "2999-01-01T00:00:00Z" if expires == float("inf") else \
+                time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(expires))
+            models.append({
+                "name": f"{model}:latest", "model": f"{model}:latest", "digest": _seed(model).to_bytes(8, "big").hex(),
+                "size": 0, "size_vram": 0, "expires_at": expires_at, "details": {},
+            })
+        self._send_json(200, {"models": models})
+
+    def _ollama_generate(self, body: dict):
+        """프롬프트가 없으면 모델 로드(· keep_alive 갱신)만 수행, 있으면 한 번에 응답"""
+        model = body.get("model", "mock")
+        start = time.perf_counter()
+        load_seconds = self.server.ensure_loaded(model, body.get("keep_alive"))
+        prompt = body.get("prompt") or ""
+        text = respond(prompt, self.server.settings.output_tokens) if prompt else ""
+        if prompt and not self._admit(model, _count_tokens(prompt), len(text.split(" "))):
+            return
+        self._send_json(200, {
+            "model": model,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "response": text,
+            "done": True,
+            "done_reason": "load" if not prompt else "stop",
+            "total_duration": int((time.perf_counter() - start) * 1e9),
+            "load_duration": int(load_seconds * 1e9),
+        })
+
+    def _ollama_chat(self, body: dict):
+        model = body.get("model", "mock")
+        prompt = render_messages(body.get("messages"))
+        text = respond(prompt, self.server.settings.output_tokens)
+        prompt_tokens, eval_count = _count_tokens(prompt), len(text.split(" "))
+        start = time.perf_counter()
+        with self.server.lock:
+            self.server.model_in_flight[model] += 1
+            self.server.model_max_in_flight[model] = max(
+                self.server.model_max_in_flight[model], self.server.model_in_flight[model]
+            )
+        try:
+            load_seconds = self.server.ensure_loaded(model, body.get("keep_alive"))
+            if not self._admit(model, prompt_tokens, eval_count):
+                return
+            self._ollama_reply(body, model, text, prompt_tokens, eval_count, start, load_seconds)
+        finally:
+            with self.server.lock:
+                self.server.model_in_flight[model] -= 1
+
+    def _ollama_reply(self, body: dict, model: str, text: str, prompt_tokens: int, eval_count: int,
+                      start: float, load_seconds: float):
+
+        def message(content: str, done: bool, **extra) -> dict:
+            return {
+                "model": model,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "message": {"role": "assistant", "content": content},
+                "done": done,
+                **extra,
+            }
+
+        def final() -> dict:
+            total_ns = int((time.perf_counter() - start) * 1e9)
+            return message("", True, done_reason="stop", total_duration=total_ns, load_duration=int(load_seconds * 1e9),
+                           prompt_eval_count=prompt_tokens, prompt_eval_duration=0,
+                           eval_count=eval_count, eval_duration=total_ns)
+
+        if body.get("stream") is False:
+            time.sleep(self._generation_delay(eval_count))
+            result = final()
+            result["message"]["content"] = text
+            self._send_json(200, result)
+            return
+
+        self._start_stream("application/x-ndjson")
+        for piece in self._pieces(text):
+            self.wfile.write((json.dumps(message(piece, False), ensure_ascii=False) + "\n").encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write((json.dumps(final(), ensure_ascii=False) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+
+_embedders = {}
+
+
+def _embedder(dim: int) -> FakeEmbeddings:
+    if dim not in _embedders:
+        _embedders[dim] = FakeEmbeddings(dim=dim)
+    return _embedders[dim]
+
+
+def start_mock_server(settings: MockSettings = None, host: str = "127.0.0.1", port: int = 0) -> MockServer:
+    """백그라운드 스레드에서 서버 시작 (port=0이면 빈 포트 사용, server.server_port로 확인)"""
+    server = MockServer((host, port), settings or MockSettings())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI · Ollama 호환 로컬 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="첫 토큰까지 지연(초)")
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default="fixed")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0)
+    parser.add_argument("--output-tokens", type=int, default=400)
+    parser.add_argument("--rpm", type=int, default=0)
+    parser.add_argument("--tpm", type=int, default=0)
+    parser.add_argument("--error-429", type=float, default=0.0)
+    parser.add_argument("--error-500", type=float, default=0.0)
+    parser.add_argument("--load-latency", type=float, default=0.0, help="Ollama 모델 로드 지연(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    settings = MockSettings(
+        latency=args.latency,
+        latency_dist=args.latency_dist,
+        latency_sigma=args.latency_sigma,
+        tokens_per_sec=args.tokens_per_sec,
+        output_tokens=args.output_tokens,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        error_429=args.error_429,
+        error_500=args.error_500,
+        load_latency=args.load_latency,
+        seed=args.seed,
+    )
+    server = MockServer((args.host, args.port), settings)
+    print(f"대역 서버 실행 중: http://{args.host}:{server.server_port} (OpenAI: /v1, Ollama: /api)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# benchmark/run_benchmarks.py
+"""
+오프라인 성능 벤치마크 (API 호출 없음)
+
+    python -m benchmark.run_benchmarks --sizes 50 200 1000
+    python -m benchmark.run_benchmarks --compare benchmark/results/abc1234.json benchmark/results/def5678.json
+
+측정 항목
+- loader: 합성 PDF에 대한 SurveyLoader 처리량
+- index_build: 코퍼스 크기별 FAISS(대역 임베딩) · BM25 구축 시간
+- retrieval: 코퍼스 크기별 FAISS / BM25 / 앙상블 검색 지연 (p50/p95)
+- prompt: SurveyRAG.format_docs + 프롬프트 구성 비용 (k별)
+- orchestration: 지연 0인 대역 모델로 실행한 SurveyOrchestration 단계별 오버헤드
+
+결과는 benchmark/results/<git sha>.json 으로 저장해 커밋 간 비교
+"""
+import io
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+from pathlib import Path
+from unittest import mock
+from contextlib import ExitStack, contextmanager, redirect_stdout
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_community.retrievers import BM25Retriever
+from langchain.retrievers.ensemble import EnsembleRetriever
+from rag.loader import SurveyLoader
+from rag.rag_module import SurveyRAG
+from system_orchestration.orchestration import SurveyOrchestration
+from system_orchestration.centroid_classifier import CentroidDomainClassifier
+from utils.tokenizer import get_tokenizer
+from benchmark.corpus import DOMAIN_TOPICS, RESPONDENTS, synthetic_documents, write_pdfs
+from benchmark.fakes import FakeEmbeddings, fake_models
+from benchmark.tokenizer_bench import sample_queries
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+REGRESSION_THRESHOLD = 0.10     # 10% 이상 나빠지면 표시
+
+
+def _timed(fn, repeats: int) -> dict:
+    """fn을 repeats회 실행한 지연 분포(ms)"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": float(np.percentile(times, 50)), "p95_ms": float(np.percentile(times, 95))}
+
+
+def git_revision() -> str:
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"]).returncode != 0
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def bench_loader(num_surveys: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        write_pdfs(tmp, num_surveys)
+        start = time.perf_counter()
+        docs = SurveyLoader(tmp).load_all()
+        elapsed = time.perf_counter() - start
+    return {
+        "surveys": num_surveys,
+        "chunks": len(docs),
+        "seconds": elapsed,
+        "surveys_per_sec": num_surveys / elapsed,
+        "chunks_per_sec": len(docs) / elapsed,
+    }
+
+
+def build_indexes(docs, tokenizer: str, dim: int):
+    """(faiss_store, bm25, 구축 시간)"""
+    embeddings = FakeEmbeddings(dim=dim)
+
+    start = time.perf_counter()
+    store = FAISS.from_documents(docs, embeddings)
+    faiss_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bm25 = BM25Retriever.from_documents(docs, preprocess_func=get_tokenizer(tokenizer))
+    bm25_seconds = time.perf_counter() - start
+
+    return store, bm25, {"chunks": len(docs), "faiss_seconds": faiss_seconds, "bm25_seconds": bm25_seconds}
+
+
+def bench_retrieval(store, bm25, queries: list[str], k: int = 3) -> dict:
+    faiss_retriever = store.as_retriever(search_kwargs={"k": k})
+    bm25_retriever = bm25.model_copy(update={"k": k})
+    ensemble = EnsembleRetriever(retrievers=[bm25_retriever, faiss_retriever], weights=[0.3, 0.7])
+
+    result = {}
+    for name, retriever in [("faiss", faiss_retriever), ("bm25", bm25_retriever), ("ensemble", ensemble)]:
+        it = iter(queries * 2)
+        result[name] = _timed(lambda: retriever.invoke(next(it)), len(queries))
+    return result
+
+
+def synthetic_user_inputs(n: int, seed: int = 0) -> list[dict]:
+    """LLMExtractor 출력 형식의 구조화된 요구사항"""
+    rng = random.Random(seed)
+    user_inputs = []
+    for _ in range(n):
+        topics = DOMAIN_TOPICS[rng.choice(list(DOMAIN_TOPICS))]
+        respondent = rng.choice(RESPONDENTS)
+        user_inputs.append({
+            "조사목적": f"{respondent}의 {rng.choice(topics)} 인식과 개선 요구 파악",
+            "조사대상": respondent,
+            "주요측정변수": rng.sample(topics, rng.randint(2, 6)),
+            "요청문항수": f"{rng.choice([10, 20, 30, 50, 70])}문항",
+            "설문요구사항": "5점 척도 사용",
+        })
+    return user_inputs
+
+
+@contextmanager
+def patched_pipeline(store, bm25):
+    """대역 모델 + 합성 인덱스(공유 인덱스 로더 교체) + LLM 캐시 비활성화"""
+    classifier = CentroidDomainClassifier.fit_from_vector_store(store)
+    with ExitStack() as stack:
+        stack.enter_context(fake_models(embedding_dim=store.index.d))
+        stack.enter_context(mock.patch("rag.retriever.load_indexes", lambda: (store, bm25)))
+        stack.enter_context(mock.patch(
+            "system_orchestration.domain_classifier.CentroidDomainClassifier.load", lambda path: classifier,
+        ))
+        stack.enter_context(mock.patch("utils.llm_call.get_llm_cache", lambda: None))
+        yield
+
+
+def bench_prompt(store, bm25, queries: list[str], repeats: int) -> dict:
+    result = {}
+    with patched_pipeline(store, bm25):
+        for k in (1, 3, 5):
+            rag = SurveyRAG(model_name="gpt-5-mini", k=k)
+            docs = rag.retriever.invoke(queries[0])
+            result[f"k{k}"] = {
+                "format_docs": _timed(lambda: rag.format_docs(docs), repeats),
+                "format_messages": _timed(
+                    lambda: rag.prompt.format_messages(question=queries[0], context=rag.format_docs(docs)),
+                    repeats,
+                ),
+                "context_chars": len(rag.format_docs(docs)),
+            }
+    return result
+
+
+def bench_orchestration(store, bm25, repeats: int) -> dict:
+    stages = {"retrieve": [], "classify": [], "generate": [], "total": []}
+    with patched_pipeline(store, bm25), redirect_stdout(io.StringIO()):
+        for user_input in synthetic_user_inputs(repeats):
+            orchestration = SurveyOrchestration(user_input, verbose=False)
+            total_start = time.perf_counter()
+            for stage in ("retrieve", "classify", "generate"):
+                start = time.perf_counter()
+                getattr(orchestration, stage)()
+                stages[stage].append((time.perf_counter() - start) * 1000)
+            stages["total"].append((time.perf_counter() - total_start) * 1000)
+
+    return {
+        stage: {"p50_ms": float(np.percentile(times, 50)), "p95_ms": float(np.percentile(times, 95))}
+        for stage, times in stages.items()
+    }
+
+
+def run(args) -> dict:
+    results = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "params": vars(args),
+        "index_build": {},
+        "retrieval": {},
+    }
+
+    if args.loader_surveys:
+        print(f"[loader] 합성 PDF {args.loader_surveys}부")
+        results["loader"] = bench_loader(args.loader_surveys)
+
+    largest = None
+    for size in args.sizes:
+        docs = synthetic_documents(size)
+        print(f"[index/retrieval] 설문 {size}부 (청크 {len(docs)}개)")
+        store, bm25, build = build_indexes(docs, args.tokenizer, args.dim)
+        queries = [q for q, _ in sample_queries(docs, args.queries)]
+        results["index_build"][str(size)] = build
+        results["retrieval"][str(size)] = bench_retrieval(store, bm25, queries)
+        largest = (store, bm25, queries)
+
+    store, bm25, queries = largest
+    print("[prompt] format_docs / 프롬프트 구성")
+    results["prompt"] = bench_prompt(store, bm25, queries, args.repeats)
+    print("[orchestration] 대역 모델 파이프라인 오버헤드")
+    results["orchestration"] = bench_orchestration(store, bm25, args.orchestration_runs)
+    return results
+
+
+def _flatten(d: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in d.items():
+        name = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(base_path, new_path) -> list[str]:
+    """두 결과 파일의 지표 비교 (지연은 낮을수록, 처리량은 높을수록 좋음)"""
+    base = json.loads(Path(base_path).read_text(encoding="utf-8"))
+    new = json.loads(Path(new_path).read_text(encoding="utf-8"))
+    base_flat = _flatten({k: v for k, v in base.items() if k != "params"})
+    new_flat = _flatten({k: v for k, v in new.items() if k != "params"})
+
+    lines = [f"{base['revision']} → {new['revision']}"]
+    for name in sorted(base_flat.keys() & new_flat.keys()):
+        old, cur = base_flat[name], new_flat[name]
+        if not old:
+            continue
+        change = (cur - old) / old
+        if name.endswith("_per_sec"):
+            worse = change < -REGRESSION_THRESHOLD
+        elif name.endswith(("_ms", "seconds")):
+            worse = change > REGRESSION_THRESHOLD
+        else:
+            continue
+        flag = " ⚠️" if worse else ""
+        lines.append(f"  {name:<55} {old:>12.3f} → {cur:>12.3f} ({change:+.1%}){flag}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 성능 벤치마크")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[50, 200, 1000], help="코퍼스 크기(설문 부수)")
+    parser.add_argument("--loader-surveys", type=int, default=50, help="로더 측정용 합성 PDF 수 (0이면 생략)")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--orchestration-runs", type=int, default=30)
+    parser.add_argument("--tokenizer", default="ngram", help="BM25 토크나이저 (okt는 JVM 필요)")
+    parser.add_argument("--dim", type=int, default=1536, help="대역 임베딩 차원")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본값: benchmark/results/<git sha>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="두 결과 파일 비교")
+    args = parser.parse_args()
+
+    if args.compare:
+        print("\n".join(compare(*args.compare)))
+        return
+
+    results = run(args)
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{results['revision']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
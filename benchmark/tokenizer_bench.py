@@ -0,0 +1,105 @@
+# benchmark/tokenizer_bench.py
+"""
+토크나이저 백엔드 비교 벤치마크 (처리 속도 · BM25 검색 재현율)
+
+    python -m benchmark.tokenizer_bench --backends okt ngram dict --queries 200
+
+- 처리 속도: 코퍼스 전체 청크를 토큰화한 tokens/s
+- 재현율: 청크에서 뽑은 설문 문항 문장을 질의로 사용해, BM25 상위 k개 청크 안에
+          원래 설문지(file_name)가 포함되는 비율 (recall@k) 및 MRR
+"""
+import re
+import json
+import time
+import random
+import argparse
+import numpy as np
+from rank_bm25 import BM25Okapi
+from rag.config import Config
+from rag.loader import SurveyLoader
+from utils.tokenizer import get_tokenizer, TOKENIZERS
+
+
+QUESTION_LINE = re.compile(r"^\s*(?:SQ|Q|문)?\s*\d{1,2}\s*[.)]\s*(\S.{10,})$", re.MULTILINE)
+
+
+def sample_queries(docs, n: int, seed: int = 0) -> list[tuple[str, str]]:
+    """(문항 문장, 정답 설문지 file_name) 쌍 추출"""
+    pairs = []
+    for doc in docs:
+        for match in QUESTION_LINE.finditer(doc.page_content):
+            pairs.append((match.group(1).strip(), doc.metadata["file_name"]))
+
+    random.Random(seed).shuffle(pairs)
+    return pairs[:n]
+
+
+def evaluate(backend: str, docs, queries, ks=(1, 3, 5, 10)) -> dict:
+    tokenizer = get_tokenizer(backend)
+    tokenizer.warmup()
+    texts = [doc.page_content for doc in docs]
+    file_names = [doc.metadata["file_name"] for doc in docs]
+
+    start = time.perf_counter()
+    corpus = [tokenizer.tokenize(t) for t in texts]
+    elapsed = time.perf_counter() - start
+    num_tokens = sum(len(tokens) for tokens in corpus)
+
+    bm25 = BM25Okapi(corpus)
+
+    hits = {k: 0 for k in ks}
+    reciprocal_ranks = []
+    query_time = 0.0
+    for query, relevant in queries:
+        q_start = time.perf_counter()
+        scores = bm25.get_scores(tokenizer.tokenize(query))
+        ranked = np.argsort(-scores)[:max(ks)]
+        query_time += time.perf_counter() - q_start
+
+        ranked_files = [file_names[i] for i in ranked]
+        for k in ks:
+            hits[k] += relevant in ranked_files[:k]
+        reciprocal_ranks.append(
+            1 / (ranked_files.index(relevant) + 1) if relevant in ranked_files else 0.0
+        )
+
+    n = max(1, len(queries))
+    return {
+        "backend": backend,
+        "tokens": num_tokens,
+        "tokens_per_sec": num_tokens / elapsed if elapsed else 0.0,
+        "avg_tokens_per_chunk": num_tokens / max(1, len(corpus)),
+        "avg_query_ms": query_time / n * 1000,
+        **{f"recall@{k}": hits[k] / n for k in ks},
+        "mrr": sum(reciprocal_ranks) / n,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="토크나이저 백엔드 비교")
+    parser.add_argument("--backends", nargs="+", default=list(TOKENIZERS))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    docs = SurveyLoader(Config.PDF_ROOT).load_all()
+    queries = sample_queries(docs, args.queries)
+    print(f"청크 {len(docs)}개, 질의 {len(queries)}개")
+
+    results = []
+    for backend in args.backends:
+        result = evaluate(backend, docs, queries)
+        results.append(result)
+        print(
+            f"[{backend:>5}] {result['tokens_per_sec']:>10,.0f} tokens/s | "
+            f"recall@1 {result['recall@1']:.3f} | recall@5 {result['recall@5']:.3f} | "
+            f"MRR {result['mrr']:.3f} | 질의 {result['avg_query_ms']:.2f}ms"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
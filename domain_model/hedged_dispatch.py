@@ -0,0 +1,181 @@
+# domain_model/hedged_dispatch.py
+import time
+import bisect
+import asyncio
+import threading
+from collections import defaultdict
+from rag.config import Config
+from utils.llm_call import ainvoke_chat, astream_chat, model_name_of
+
+
+DISPATCH_MODES = ("static", "fallback", "hedged")
+
+
+class LatencyHistogram:
+    """
+    백엔드(모델)별 응답 지연시간 히스토그램
+    로그 간격 버킷에 누적하고, 분위수는 버킷 상한값으로 근사
+    """
+
+    # 0.25초 ~ 약 10분, 버킷마다 1.25배
+    BOUNDS = [0.25 * 1.25 ** i for i in range(36)]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.total = 0
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+            self.total += 1
+
+    def quantile(self, q: float) -> float | None:
+        with self._lock:
+            if self.total == 0:
+                return None
+            target = q * self.total
+            seen = 0
+            for i, count in enumerate(self.counts):
+                seen += count
+                if seen >= target:
+                    return self.BOUNDS[min(i, len(self.BOUNDS) - 1)]
+        return self.BOUNDS[-1]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.total,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+_histograms = defaultdict(LatencyHistogram)
+_histograms_lock = threading.Lock()
+
+
+def latency_histogram(model: str) -> LatencyHistogram:
+    """프로세스 공용 백엔드별 히스토그램"""
+    with _histograms_lock:
+        return _histograms[model]
+
+
+def latency_report() -> dict:
+    with _histograms_lock:
+        models = list(_histograms)
+    return {model: latency_histogram(model).summary() for model in models}
+
+
+class HedgedDispatcher:
+    """
+    지연시간 기반 디스패처 (OpenAI ↔ Ollama 도메인 모델)
+
+    - static   : 주 모델만 호출 (기존 동작)
+    - fallback : 주 모델이 p95 지연을 넘기거나 실패하면 취소하고 보조 모델로 전환
+    - hedged   : 주 모델이 p95 지연을 넘기면 보조 모델에도 요청을 보내 먼저 끝난 응답을 사용
+                 (진 쪽 요청은 취소)
+    모든 모드에서 단계별 deadline(초)을 넘기면 진행 중인 요청을 취소하고 TimeoutError 발생
+    on_text가 주어지면 주 모델 응답을 스트리밍하고, 최종 채택된 응답으로 한 번 더 호출
+    """
+
+    def __init__(self, stage: str, primary, secondary=None, mode: str = "static", deadline: float = None):
+        if mode not in DISPATCH_MODES:
+            raise ValueError(f"지원하지 않는 디스패치 모드입니다: {mode}")
+
+        self.stage = stage
+        self.primary = primary
+        self.secondary = secondary
+        self.mode = mode if secondary is not None else "static"
+        self.deadline = deadline
+
+    def hedge_delay(self) -> float:
+        """주 모델 히스토그램의 p95 (표본이 적으면 기본값)"""
+        histogram = latency_histogram(model_name_of(self.primary))
+        if histogram.total < Config.HEDGE_MIN_SAMPLES:
+            return Config.HEDGE_DEFAULT_DELAY
+        return histogram.quantile(0.95)
+
+    async def _timed(self, llm, prompt, on_text=None) -> str:
+        """응답 + 지연 기록 (캐시 적중은 실제 API 지연이 아니므로 기록하지 않음)"""
+        start = time.monotonic()
+        called = []
+        try:
+            if on_text is None:
+                response = await ainvoke_chat(self.stage, llm, prompt, on_call=lambda: called.append(True))
+            else:
+                response = await astream_chat(self.stage, llm, prompt, on_text, on_call=lambda: called.append(True))
+        except asyncio.CancelledError:
+            # 취소된 요청도 "최소 이만큼 걸렸다"는 하한값으로 기록 (느린 응답이 누락되지 않도록)
+            if called:
+                latency_histogram(model_name_of(llm)).record(time.monotonic() - start)
+            raise
+        if called:
+            latency_histogram(model_name_of(llm)).record(time.monotonic() - start)
+        return response
+
+    def _remaining(self, started: float) -> float | None:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - (time.monotonic() - started))
+
+    @staticmethod
+    def _raise_interrupt(done):
+        """작업 취소(JobCancelled) 등 Exception이 아닌 오류는 보조 모델로 넘기지 않고 바로 전파"""
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, Exception):
+                raise error
+
+    async def adispatch(self, prompt, on_text=None) -> str:
+        response = await self._adispatch(prompt, on_text)
+        if on_text is not None:
+            on_text(response)
+        return response
+
+    async def _adispatch(self, prompt, on_text=None) -> str:
+        started = time.monotonic()
+        primary = asyncio.create_task(self._timed(self.primary, prompt, on_text))
+        tasks = {primary}
+        launched = [primary]
+
+        try:
+            if self.mode != "static":
+                delay = self.hedge_delay()
+                remaining = self._remaining(started)
+                if remaining is not None:
+                    delay = min(delay, remaining)
+
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                self._raise_interrupt(done)
+                if not done or primary.exception() is not None:
+                    if self.mode == "fallback" or done:
+                        primary.cancel()
+                        tasks.discard(primary)
+                    secondary = asyncio.create_task(self._timed(self.secondary, prompt))
+                    tasks.add(secondary)
+                    launched.append(secondary)
+                    print(f"[{self.stage}] {delay:.1f}초 내 응답 없음/실패 → {model_name_of(self.secondary)} 요청 ({self.mode})")
+
+            # 먼저 성공한 응답 사용, 실패한 요청은 남은 요청을 계속 기다림
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, timeout=self._remaining(started), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise TimeoutError(f"[{self.stage}] 제한 시간({self.deadline}초) 초과")
+                self._raise_interrupt(done)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # 진 쪽(또는 제한 시간 초과) 요청 취소
+            for task in launched:
+                task.cancel()
+            await asyncio.gather(*launched, return_exceptions=True)
+
+    def __call__(self, prompt, on_text=None) -> str:
+        return asyncio.run(self.adispatch(prompt, on_text))
@@ -1,8 +1,11 @@
 # survey_generator.py
 from langchain_openai import ChatOpenAI
 from langchain_ollama import ChatOllama
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from rag.config import Config
+from utils.ollama_manager import get_ollama_manager
+from utils.llm_call import invoke_chat, stream_chat
+from domain_model.hedged_dispatch import HedgedDispatcher
 
 class SurveyGenerator:
     """
@@ -10,43 +13,29 @@ class SurveyGenerator:
     설문지 초안을 자동 생성하는 클래스.
     """
 
-    def __init__(self, model_name, temperature=0.5):
-        
-        # 일반 모델
-        if model_name == 'gpt-5':
-            self.model = ChatOpenAI(model=model_name, temperature=temperature)
-        
-        # 도메인 파인튜닝 모델 
-        else:
-            self.model = ChatOllama(model=model_name, temperature=temperature)
+    def __init__(self, model_name, temperature=0.5, dispatch="static", fallback_model=None, deadline=None):
+        """
+        Args:
+            model_name: 주 모델 ('gpt-5' 또는 도메인 파인튜닝 모델명)
+            temperature: 샘플링 온도
+            dispatch: 'static' | 'fallback' | 'hedged' (HedgedDispatcher 참고)
+            fallback_model: 지연/실패 시 사용할 보조 모델명
+            deadline: 단계 제한 시간(초)
+        """
+        self.model = self._build_model(model_name, temperature)
+        fallback = self._build_model(fallback_model, temperature) if fallback_model else None
+        self.dispatcher = HedgedDispatcher(
+            "generator", self.model, fallback, mode=dispatch, deadline=deadline
+        )
         
-        self.parser = StrOutputParser()
-        self.prompt = PromptTemplate.from_template(
-            """
+        # 프롬프트 캐싱을 위해 고정 지침/예시(system)를 앞에, 요청별 내용(human)을 뒤에 배치
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", """
             너는 사회조사 전문가이자 설문지 설계 전문가야.
-            아래의 사용자 요구사항과 참조 설문지를 기반으로,
+            사용자 요구사항과 참조 설문지를 기반으로,
             새로운 설문지를 작성하되 다음 조건을 반드시 지켜야 해.
             참조 설문지는 없을 수도 있음.
 
-            ## [사용자 요구사항]
-            조사 목적:
-            {purpose}
-
-            조사 대상:
-            {target}
-
-            주요 측정 변수:
-            {variables}
-
-            요청 문항 수:
-            {num_questions}
-
-            설문 요구사항:
-            {special}
-
-            ## [참조 설문지]
-            {context}
-
             ## [작성 지침]
             1. 설문지는 반드시 두 부분으로 구성해야 한다:
                 (1) **응답자 특성 문항(SQ)** — 인구통계 및 배경 관련 문항.
@@ -56,7 +45,7 @@ class SurveyGenerator:
             3. 응답 형식은 5점 척도형(전혀 그렇지 않다~매우 그렇다), 객관식, 다중응답, 또는 주관식 형태로 구성.
             4. 문항 번호는 SQ1~SQn, Q1~Qn 형식으로 표기하고, 각 문항 아래에 보기(①~⑤ 등)를 제시한다.
             5. 하위 영역이 있다면 적절한 소제목을 붙인다.
-            6. 요청된 문항 수({num_questions})를 기준으로 전체 문항 수를 조정한다.
+            6. 사용자 요구사항의 요청 문항 수를 기준으로 전체 문항 수를 조정한다.
             7. 출력 시 다음 형식을 따를 것:
 
             예시 형식:
@@ -86,18 +75,49 @@ class SurveyGenerator:
             - ③ 조직의 분위기를 흐리는 특정 인물들
             - ④ 개방성·자율성을 용납하지 않는 조직 분위기
             - ⑤ 기타
+            """),
+            ("human", """
+            ## [참조 설문지]
+            {context}
 
-            """
-        )
+            ## [사용자 요구사항]
+            조사 목적:
+            {purpose}
+
+            조사 대상:
+            {target}
+
+            주요 측정 변수:
+            {variables}
 
+            요청 문항 수:
+            {num_questions}
 
-    def _build_prompt(self, user_input: dict, context: str = "None") -> str:
+            설문 요구사항:
+            {special}
+            """),
+        ])
+
+
+    @staticmethod
+    def _build_model(model_name, temperature):
+        # 일반 모델
+        if model_name == 'gpt-5':
+            return ChatOpenAI(model=model_name, temperature=temperature, max_retries=0)
+        
+        # 도메인 파인튜닝 모델 
+        return ChatOllama(
+            model=model_name, temperature=temperature, base_url=Config.OLLAMA_BASE_URL,
+            keep_alive=get_ollama_manager().keep_alive(model_name),
+        )
+
+    def _build_prompt(self, user_input: dict, context: str = "None") -> list:
         """
-        사용자 요구사항 딕셔너리와 참조 문서(context)를 프롬프트에 채워 넣음
+        사용자 요구사항 딕셔너리와 참조 문서(context)를 프롬프트 메시지에 채워 넣음
         """
         values = list(user_input.values())
 
-        prompt = self.prompt.format(
+        prompt = self.prompt.format_messages(
                     purpose=values[0],
                     target=values[1],
                     variables=", ".join(values[2]),
@@ -107,12 +127,19 @@ class SurveyGenerator:
             
         return prompt
 
-    def __call__(self, user_input: dict, context: str = "None") -> str:
+    def __call__(self, user_input: dict, context: str = "None", on_text=None) -> str:
         """
         LLM을 통해 설문지를 생성하고 문자열 형태로 반환.
+        on_text가 주어지면 생성 중인 부분 출력(지금까지의 전체 텍스트)을 전달
         """
-        prompt_text = self._build_prompt(user_input, context)
-        response = (self.model | self.parser).invoke(prompt_text)
+        messages = self._build_prompt(user_input, context)
+        if self.dispatcher.mode == "static" and self.dispatcher.deadline is None:
+            if on_text is None:
+                response = invoke_chat("generator", self.model, messages)
+            else:
+                response = stream_chat("generator", self.model, messages, on_text)
+        else:
+            response = self.dispatcher(messages, on_text=on_text)
         return response
 
 
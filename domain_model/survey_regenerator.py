@@ -2,41 +2,42 @@
 
 from langchain_openai import ChatOpenAI
 from langchain_community.chat_models import ChatOllama
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from rag.config import Config
+from utils.ollama_manager import get_ollama_manager
+from utils.llm_call import invoke_chat, stream_chat
+from domain_model.hedged_dispatch import HedgedDispatcher
 
 class SurveyRegenerator:
     """
     피드백을 반영하여 설문지를 재생성하는 클래스
     """
 
-    def __init__(self, model_name, temperature=0.5):
-        
-        # 일반 모델
-        if model_name == 'gpt-5':
-            self.model = ChatOpenAI(model=model_name, temperature=temperature)
-        
-        # 도메인 파인튜닝 모델 
-        else:
-            self.model = ChatOllama(model=model_name, temperature=temperature)
+    def __init__(self, model_name, temperature=0.5, dispatch="static", fallback_model=None, deadline=None):
+        """
+        Args:
+            model_name: 주 모델 ('gpt-5' 또는 도메인 파인튜닝 모델명)
+            temperature: 샘플링 온도
+            dispatch: 'static' | 'fallback' | 'hedged' (HedgedDispatcher 참고)
+            fallback_model: 지연/실패 시 사용할 보조 모델명
+            deadline: 단계 제한 시간(초)
+        """
+        self.model = self._build_model(model_name, temperature)
+        fallback = self._build_model(fallback_model, temperature) if fallback_model else None
+        self.dispatcher = HedgedDispatcher(
+            "regenerator", self.model, fallback, mode=dispatch, deadline=deadline
+        )
         
-        self.parser = StrOutputParser()
-        self.prompt = PromptTemplate.from_template(
-            """
+        # 프롬프트 캐싱을 위해 고정 지침(system)을 앞에, 설문지/피드백(human)을 뒤에 배치
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", """
             너는 사회조사 전문가이자 설문지 설계 전문가야.
-            아래의 기존 설문지와 사용자 피드백을 기반으로 설문지를 수정해야 해.
-
-            ## [기존 생성된 설문지]
-            {previous_survey}
-
-            ## [사용자 피드백]
-            피드백 유형: {feedback_type}
-            대상 문항: {target_question}
-            수정 요청 내용:
-            {modification}
+            주어진 기존 설문지와 사용자 피드백을 기반으로 설문지를 수정해야 해.
 
             ## [수정 지침]
             1. 사용자 피드백을 **정확히** 반영하여 설문지를 수정한다.
+               - 수정 요청이 여러 개이면 나열된 순서대로 **모두** 반영한다.
+               - 대상 문항 번호는 모두 **기존 설문지 기준**이며, 번호 재정렬은 모든 수정을 반영한 뒤 마지막에 한 번만 수행한다.
             
             2. 피드백 유형에 따라 적절히 처리:
                - **문항 수정**: 해당 문항의 내용이나 보기를 수정
@@ -63,38 +64,84 @@ class SurveyRegenerator:
             - ② ...
 
             6. **수정된 설문지 전체**를 출력한다.
-            """
+            """),
+            ("human", """
+            ## [기존 생성된 설문지]
+            {previous_survey}
+
+            ## [사용자 피드백]
+            {edits}
+            """),
+        ])
+
+    def _format_edits(self, edits: list[dict]) -> str:
+        """
+        수정 요청 목록을 프롬프트용 텍스트로 변환
+        """
+        blocks = []
+        for i, edit in enumerate(edits, 1):
+            blocks.append(
+                f"[수정 {i}]\n"
+                f"피드백 유형: {edit.get('feedback_type', '수정')}\n"
+                f"대상 문항: {edit.get('target_question', '전체')}\n"
+                f"수정 요청 내용: {edit.get('modification', '')}"
+            )
+        return "\n\n".join(blocks)
+
+    @staticmethod
+    def _build_model(model_name, temperature):
+        # 일반 모델
+        if model_name == 'gpt-5':
+            return ChatOpenAI(model=model_name, temperature=temperature, max_retries=0)
+        
+        # 도메인 파인튜닝 모델 
+        return ChatOllama(
+            model=model_name, temperature=temperature, base_url=Config.OLLAMA_BASE_URL,
+            keep_alive=get_ollama_manager().keep_alive(model_name),
         )
 
-    def _build_prompt(self, previous_survey: str, structured_feedback: dict) -> str:
+    def _build_prompt(self, previous_survey: str, structured_feedback: dict | list[dict]) -> list:
         """
         피드백 재생성용 프롬프트 구성
         """
-        prompt = self.prompt.format(
+        # 단일 피드백(dict)도 수정 요청 1건으로 처리
+        if isinstance(structured_feedback, dict):
+            structured_feedback = [structured_feedback]
+
+        prompt = self.prompt.format_messages(
             previous_survey=previous_survey,
-            feedback_type=structured_feedback.get('feedback_type', '수정'),
-            target_question=structured_feedback.get('target_question', '전체'),
-            modification=structured_feedback.get('modification', '')
+            edits=self._format_edits(structured_feedback)
         )
         
         return prompt
 
-    def __call__(self, previous_survey: str, structured_feedback: dict) -> str:
+    def __call__(self, previous_survey: str, structured_feedback: dict | list[dict], on_text=None) -> str:
         """
-        피드백을 반영한 설문지 재생성
+        피드백을 반영한 설문지 재생성 (여러 수정 요청도 한 번의 호출로 반영)
         
         Args:
             previous_survey: 기존 생성된 설문지 전체 텍스트
-            structured_feedback: 구조화된 피드백
-                {
-                    'feedback_type': '문항 수정' | '문항 추가' | '문항 삭제' | ...,
-                    'target_question': 'Q3' | 'SQ1' | '전체',
-                    'modification': '구체적인 수정 내용'
-                }
+            structured_feedback: 구조화된 피드백 (또는 그 리스트, 반영 순서대로)
+                [
+                    {
+                        'feedback_type': '문항 수정' | '문항 추가' | '문항 삭제' | ...,
+                        'target_question': 'Q3' | 'SQ1' | '전체',
+                        'modification': '구체적인 수정 내용'
+                    },
+                    ...
+                ]
+        
+            on_text: 생성 중인 부분 출력(지금까지의 전체 텍스트)을 받을 함수
         
         Returns:
             수정된 설문지 전체 텍스트
         """
-        prompt_text = self._build_prompt(previous_survey, structured_feedback)
-        response = (self.model | self.parser).invoke(prompt_text)
+        messages = self._build_prompt(previous_survey, structured_feedback)
+        if self.dispatcher.mode == "static" and self.dispatcher.deadline is None:
+            if on_text is None:
+                response = invoke_chat("regenerator", self.model, messages)
+            else:
+                response = stream_chat("regenerator", self.model, messages, on_text)
+        else:
+            response = self.dispatcher(messages, on_text=on_text)
         return response
\ No newline at end of file
@@ -1,10 +1,15 @@
 # feedback_output/feedback_analyzer.py
 
 from langchain_openai import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.exceptions import OutputParserException
 from pydantic import BaseModel, Field
-from typing import Literal
+from typing import List, Literal
+from rag.config import Config
+from utils.llm_call import invoke_chat
+from utils.tracing import current_span
+from feedback_output.survey_validator import parse_survey, items_of, survey_index, QUESTION_REF
 
 class StructuredFeedback(BaseModel):
     """구조화된 피드백 스키마"""
@@ -31,28 +36,43 @@ class StructuredFeedback(BaseModel):
     )
 
 
+class FeedbackPlan(BaseModel):
+    """한 번의 재생성으로 반영할 수정 요청 목록"""
+    edits: List[StructuredFeedback] = Field(
+        description="피드백에 포함된 개별 수정 요청 목록 (사용자가 언급한 순서대로)"
+    )
+    needs_full_survey: bool = Field(
+        default=False,
+        description="문항 목차만으로 대상 문항이나 수정 내용을 확정할 수 없어 전체 설문지가 필요하면 true"
+    )
+
+
 class FeedbackAnalyzer:
     """
-    사용자의 자연어 피드백을 구조화된 형태로 변환
+    사용자의 자연어 피드백을 구조화된 수정 요청 목록으로 변환
+    설문지 전체 대신 문항 목차(번호 · 응답 형식 · 문항 앞부분)를 먼저 보내고,
+    목차만으로 대상을 확정할 수 없을 때만 전체 설문지로 다시 분석 (Config.FEEDBACK_SURVEY_CONTEXT)
     """
     
     def __init__(self, model_name="gpt-5-mini"):
-        self.llm = ChatOpenAI(model=model_name, temperature=0)
-        self.parser = JsonOutputParser(pydantic_object=StructuredFeedback)
+        self.llm = ChatOpenAI(model=model_name, temperature=0, max_retries=0)
+        self.parser = JsonOutputParser(pydantic_object=FeedbackPlan)
         
-        self.prompt = PromptTemplate.from_template(
-            """
+        # 프롬프트 캐싱을 위해 고정 지침/출력 형식(system)을 앞에, 설문지/피드백(human)을 뒤에 배치
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", """
             너는 설문지 피드백 분석 전문가야.
-            사용자가 입력한 피드백을 분석하여 구조화된 형태로 변환해야 해.
-
-            ## [현재 설문지]
-            {current_survey}
-
-            ## [사용자 피드백]
-            {user_feedback}
+            주어진 현재 설문지와 사용자가 입력한 피드백을 분석하여 구조화된 수정 요청 목록으로 변환해야 해.
+            피드백 하나에 여러 수정 요청이 섞여 있을 수 있으므로, 각각을 별도의 항목으로 분리해야 해.
+            현재 설문지는 전체 원문 대신 문항 목차("문항 번호 | 응답 형식 | 문항 앞부분")로 주어질 수 있어.
 
             ## [분석 지침]
-            1. 피드백 유형을 다음 중 하나로 분류:
+            1. 피드백에 포함된 수정 요청을 모두 찾아 사용자가 언급한 순서대로 나열:
+               - 예: "Q3 삭제하고 Q5는 7점 척도로, 그리고 연령 문항 추가" → 수정 요청 3개
+               - 번호가 붙은 여러 건의 피드백이 주어지면 번호 순서를 유지
+               - 대상 문항 번호는 모두 **현재 설문지 기준** 번호로 표기
+
+            2. 각 수정 요청의 피드백 유형을 다음 중 하나로 분류:
                - **문항 수정**: 특정 문항의 내용이나 보기를 수정
                - **문항 추가**: 새로운 문항을 추가
                - **문항 삭제**: 기존 문항을 삭제
@@ -60,71 +80,153 @@ class FeedbackAnalyzer:
                - **순서 조정**: 문항 순서 변경
                - **전체 재구성**: 설문지 전체 구조 변경
 
-            2. 대상 문항을 명확히 식별:
+            3. 대상 문항을 명확히 식별:
                - 특정 문항 번호(Q1, Q2, SQ1 등)
                - 문항 번호가 명시되지 않았으면 내용으로 추론
                - 전체 설문지 관련이면 "전체"
 
-            3. 수정 요청 내용을 명확하고 구체적으로 요약
+            4. 수정 요청 내용을 명확하고 구체적으로 요약
 
-            4. 우선순위 판단:
+            5. 우선순위 판단:
                - 높음: 설문의 핵심을 바꾸는 중요한 변경
                - 중간: 일반적인 수정 요청
                - 낮음: 사소한 표현 수정
 
+            6. 문항 목차만 주어졌을 때, 피드백이 보기 내용이나 잘린 문항 뒷부분을 가리켜
+               대상 문항이나 수정 내용을 확정할 수 없으면 needs_full_survey를 true로 설정 (그 외에는 false)
+
             {format_instructions}
 
             ## [출력 예시]
             {{
-                "feedback_type": "형식 변경",
-                "target_question": "Q3",
-                "modification": "Q3 문항의 응답 형식을 5점 척도에서 7점 척도로 변경",
-                "priority": "중간"
+                "edits": [
+                    {{
+                        "feedback_type": "문항 삭제",
+                        "target_question": "Q3",
+                        "modification": "Q3 문항을 삭제",
+                        "priority": "중간"
+                    }},
+                    {{
+                        "feedback_type": "형식 변경",
+                        "target_question": "Q5",
+                        "modification": "Q5 문항의 응답 형식을 5점 척도에서 7점 척도로 변경",
+                        "priority": "중간"
+                    }}
+                ],
+                "needs_full_survey": false
             }}
-            """
-        )
+            """),
+            ("human", """
+            ## [{survey_label}]
+            {current_survey}
+
+            ## [사용자 피드백]
+            {user_feedback}
+            """),
+        ]).partial(format_instructions=self.parser.get_format_instructions())
 
-    def __call__(self, current_survey: str, user_feedback: str) -> dict:
+    def __call__(self, current_survey: str, user_feedback: str | list[str]) -> list[dict]:
         """
         피드백 구조화
         
         Args:
             current_survey: 현재 설문지 전체 텍스트
             user_feedback: 사용자가 입력한 자연어 피드백
+                (여러 건을 모아둔 경우 리스트로 전달하면 한 번에 분석)
         
         Returns:
-            구조화된 피드백 딕셔너리
-            {
-                'feedback_type': str,
-                'target_question': str,
-                'modification': str,
-                'priority': str
-            }
+            구조화된 수정 요청 리스트 (반영 순서대로)
+            [
+                {
+                    'feedback_type': str,
+                    'target_question': str,
+                    'modification': str,
+                    'priority': str
+                },
+                ...
+            ]
         """
-        
-        # 프롬프트 구성
-        format_instructions = self.parser.get_format_instructions()
-        
-        prompt_text = self.prompt.format(
+        feedback_items = self._as_items(user_feedback)
+
+        # 1차: 문항 목차로 분석 (문항을 찾지 못한 설문지는 바로 전체 설문지로 분석)
+        segments = parse_survey(current_survey)
+        if Config.FEEDBACK_SURVEY_CONTEXT == "index" and items_of(segments):
+            result = self._analyze("현재 설문지 문항 목차", survey_index(segments), feedback_items)
+            if result is not None and not self._needs_full_survey(result, segments):
+                current_span().set(survey_context="index")
+                return result['edits']
+
+        # 2차: 전체 설문지로 분석
+        current_span().set(survey_context="full")
+        result = self._analyze("현재 설문지", current_survey, feedback_items)
+        if result is not None:
+            return result['edits']
+        return self._default_edits(feedback_items)
+
+    def _analyze(self, survey_label: str, current_survey: str, feedback_items: list[str]) -> dict | None:
+        """LLM 분석 1회 (응답 해석 · 스키마 검증 실패 시 None)"""
+        messages = self.prompt.format_messages(
+            survey_label=survey_label,
             current_survey=current_survey,
-            user_feedback=user_feedback,
-            format_instructions=format_instructions
+            user_feedback=self._join_items(feedback_items),
         )
-        
-        # LLM 호출 및 파싱
+
+        # LLM 호출 (API 오류는 재시도 후에도 실패하면 그대로 전달)
+        response = invoke_chat("feedback_analyzer", self.llm, messages)
+
+        # 파싱 (응답 해석 실패만 기본값으로 대체)
         try:
-            result = (self.llm | self.parser).invoke(prompt_text)
-            return result
-        except Exception as e:
+            result = self.parser.parse(response)
+            if not isinstance(result, dict):
+                result = {'edits': result}
+            # 스키마 검증 (키 누락 · 잘못된 유형은 ValidationError(ValueError)로 기본값 처리)
+            plan = FeedbackPlan.model_validate(result)
+            if not plan.edits:
+                raise ValueError("수정 요청이 추출되지 않았습니다.")
+            return plan.model_dump()
+        except (OutputParserException, ValueError) as e:
             print(f"⚠️ 피드백 구조화 실패: {e}")
-            # 기본값 반환
-            return {
+            return None
+
+    @staticmethod
+    def _needs_full_survey(result: dict, segments: list) -> bool:
+        """분석 결과가 전체 설문지를 요청했거나 목차에 없는 문항 번호를 가리키는지"""
+        if result.get('needs_full_survey'):
+            return True
+        known = {f"{item['section']}{item['number']}" for item in items_of(segments)}
+        return any(
+            f"{section}{number}" not in known
+            for edit in result['edits']
+            if edit.get('feedback_type') != '문항 추가'
+            for section, number in QUESTION_REF.findall(str(edit.get('target_question', '')))
+        )
+
+    @staticmethod
+    def _default_edits(feedback_items: list[str]) -> list[dict]:
+        """기본값 (입력된 피드백 1건당 수정 요청 1건)"""
+        return [
+            {
                 'feedback_type': '문항 수정',
                 'target_question': '전체',
-                'modification': user_feedback,
+                'modification': item,
                 'priority': '중간'
             }
+            for item in feedback_items
+        ]
+
+    @staticmethod
+    def _as_items(user_feedback: str | list[str]) -> list[str]:
+        """단일 피드백 / 대기열 피드백을 리스트 형태로 통일"""
+        if isinstance(user_feedback, str):
+            user_feedback = [user_feedback]
+        return [item.strip() for item in user_feedback if item and item.strip()]
 
+    @staticmethod
+    def _join_items(feedback_items: list[str]) -> str:
+        """여러 건의 피드백을 번호를 붙여 하나의 입력으로 결합"""
+        if len(feedback_items) == 1:
+            return feedback_items[0]
+        return "\n".join(f"{i}. {item}" for i, item in enumerate(feedback_items, 1))
 
 if __name__ == "__main__":
     # 테스트
@@ -156,15 +258,18 @@ if __name__ == "__main__":
         "조직문화 평가 문항을 3개 더 추가해주세요",
         "Q2를 삭제해주세요",
         "SQ1 다음에 연령 문항을 추가해주세요",
-        "전체적으로 더 구체적인 문항으로 재작성해주세요"
+        "전체적으로 더 구체적인 문항으로 재작성해주세요",
+        "Q2 삭제하고 Q1은 7점 척도로, 그리고 연령 문항 추가"
     ]
     
     for feedback in test_cases:
         print("\n" + "="*60)
         print(f"피드백: {feedback}")
         print("-"*60)
-        result = analyzer(test_survey, feedback)
-        print(f"유형: {result['feedback_type']}")
-        print(f"대상: {result['target_question']}")
-        print(f"수정내용: {result['modification']}")
-        print(f"우선순위: {result['priority']}")
\ No newline at end of file
+        edits = analyzer(test_survey, feedback)
+        for i, result in enumerate(edits, 1):
+            print(f"[수정 {i}]")
+            print(f"유형: {result['feedback_type']}")
+            print(f"대상: {result['target_question']}")
+            print(f"수정내용: {result['modification']}")
+            print(f"우선순위: {result['priority']}")
\ No newline at end of file
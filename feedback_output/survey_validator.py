@@ -0,0 +1,442 @@
+# feedback_output/survey_validator.py
+"""
+생성된 설문지 검증 · 부분 보완 (전체 재생성 대신)
+
+- 검증 (LLM 호출 없음): SQ/Q 구역 존재, Q 문항 수 대 요청 문항 수, 보기 누락, 번호 중복 · 누락, 보기 번호 형식, 척도 구성
+- 로컬 수정: 문항 번호 재정렬(문항 안의 번호 참조 포함), 보기 번호 · 형식 정리, 중복 보기 제거
+- 부분 보완: 로컬로 고칠 수 없는 부분(부족한 문항, 누락된 보기, 잘못된 척도, 없는 구역)만 모아
+  한 번의 LLM 요청으로 생성해 제자리에 끼워 넣음
+"""
+import re
+from functools import cached_property
+from typing import List, Literal
+from pydantic import BaseModel, Field
+from langchain_openai import ChatOpenAI
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.exceptions import OutputParserException
+from rag.config import Config
+from utils.llm_call import invoke_chat
+
+
+CIRCLED = "①②③④⑤⑥⑦⑧⑨⑩⑪⑫⑬⑭⑮⑯⑰⑱⑲⑳"
+SECTION_TITLES = {"SQ": "### 응답자 특성 문항", "Q": "### 본 문항"}
+
+ITEM_LINE = re.compile(r"^\s*(?:[-*]\s*)?(SQ|Q)\s*(\d{1,3})\s*[.)．:]\s*(.*)$")
+OPTION_LINE = re.compile(r"^\s*(?:[-*]\s*)?(?:([①-⑳])|\(?(\d{1,2})[.)])\s*(.+)$")
+BULLET_LINE = re.compile(r"^\s*[-*]\s+(.+)$")
+QUESTION_REF = re.compile(r"(?<![A-Za-z])(SQ|Q)(\d{1,3})(?!\d)")
+
+OPEN_ENDED = re.compile(r"주관식|자유롭게|서술|기술해|적어\s*주|작성해\s*주|_{3,}")
+SCALE_WORDS = ("그렇다", "그렇지 않다", "만족", "불만족", "동의", "중요", "보통", "좋다", "나쁘다")
+NEUTRAL_WORDS = ("보통", "그저 그렇다", "중간")
+DEFAULT_SQ_COUNT = 4        # SQ 구역이 없을 때 보완 요청할 응답자 특성 문항 수
+
+
+# === 파싱 · 출력 ===
+def parse_survey(text: str) -> list:
+    """
+    설문지 텍스트 → 구간 목록 (문항 밖의 줄은 문자열 그대로, 문항은 dict)
+    문항: {"section": "SQ"/"Q", "number", "stem", "notes", "options", "markers"}
+    """
+    segments, item = [], None
+    for raw in text.splitlines():
+        line = raw.replace("**", "").rstrip()
+        match = ITEM_LINE.match(line)
+        if match:
+            item = {
+                "section": match.group(1),
+                "number": int(match.group(2)),
+                "stem": match.group(3).strip(),
+                "notes": [],
+                "options": [],
+                "markers": [],
+            }
+            segments.append(item)
+            continue
+
+        if item is not None and line.lstrip().startswith("#"):
+            item = None
+        if item is None:
+            segments.append(raw.rstrip())
+            continue
+        if not line.strip():
+            continue    # 문항 안의 빈 줄은 출력 시 다시 정리
+
+        option = OPTION_LINE.match(line)
+        bullet = BULLET_LINE.match(line)
+        if option:
+            item["markers"].append(option.group(1) or option.group(2))
+            item["options"].append(option.group(3).strip())
+        elif bullet and not OPEN_ENDED.search(line):
+            item["markers"].append(None)
+            item["options"].append(bullet.group(1).strip())
+        else:
+            item["notes"].append(line.strip())
+    return segments
+
+
+def strip_marker(option: str) -> str:
+    """보기 앞의 번호 · 글머리표 제거"""
+    match = OPTION_LINE.match(option) or BULLET_LINE.match(option)
+    return (match.group(match.lastindex) if match else option).strip()
+
+
+def render_survey(segments: list) -> str:
+    """구간 목록 → 설문지 텍스트 (문항은 생성 프롬프트의 형식으로 통일)"""
+    lines = []
+    for segment in segments:
+        if isinstance(segment, str):
+            lines.append(segment)
+            continue
+        lines.append(f"{segment['section']}{segment['number']}. {segment['stem']}")
+        lines += segment["notes"]
+        lines += [f"- {CIRCLED[i] if i < len(CIRCLED) else f'({i + 1})'} {option}" for i, option in enumerate(segment["options"])]
+        lines.append("")
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip() + "\n"
+
+
+def items_of(segments: list, section: str = None) -> list[dict]:
+    return [s for s in segments if isinstance(s, dict) and (section is None or s["section"] == section)]
+
+
+def response_type(item: dict) -> str:
+    if is_open_ended(item) and not item["options"]:
+        return "주관식"
+    if not item["options"]:
+        return "보기 없음"
+    if is_scale(item):
+        return f"{len(item['options'])}점 척도"
+    return f"객관식 {len(item['options'])}개"
+
+
+def survey_index(segments: list, stem_chars: int = None) -> str:
+    """
+    문항 목차 (피드백 분석용): 구역 제목 + 문항마다 "번호 | 응답 형식 | 문항 앞부분" 한 줄
+    보기 · 안내문 · 구역 밖 문장은 제외
+    """
+    stem_chars = stem_chars or Config.FEEDBACK_INDEX_STEM_CHARS
+    lines = []
+    for segment in segments:
+        if isinstance(segment, str):
+            if segment.lstrip().startswith("#"):
+                lines.append(segment.strip())
+            continue
+        stem = segment["stem"]
+        if len(stem) > stem_chars:
+            stem = stem[:stem_chars].rstrip() + "…"
+        lines.append(f"{segment['section']}{segment['number']} | {response_type(segment)} | {stem}")
+    return "\n".join(lines)
+
+
+# === 검증 ===
+def requested_range(user_input: dict) -> tuple[int, int] | None:
+    """요청문항수 → (최소, 최대) ('10문항' → (10, 10), '10~15문항' → (10, 15), 언급 없으면 None)"""
+    if not user_input:
+        return None
+    values = list(user_input.values())
+    numbers = [int(n) for n in re.findall(r"\d+", str(values[3] if len(values) > 3 else ""))]
+    return (min(numbers), max(numbers)) if numbers else None
+
+
+def is_open_ended(item: dict) -> bool:
+    return bool(OPEN_ENDED.search(" ".join([item["stem"], *item["notes"]])))
+
+
+def is_scale(item: dict) -> bool:
+    options = item["options"]
+    scale_like = sum(any(word in option for word in SCALE_WORDS) for option in options)
+    return len(options) >= 2 and scale_like >= 0.6 * len(options)
+
+
+def scale_problem(item: dict) -> str | None:
+    """척도형 보기의 구성 문제 (없으면 None)"""
+    options = item["options"]
+    if len(options) < 3:
+        return f"{len(options)}점 척도"
+    neutral = [i for i, option in enumerate(options) if any(word in option for word in NEUTRAL_WORDS)]
+    if neutral:
+        if len(options) % 2 == 0:
+            return f"중립 보기가 있는 {len(options)}점(짝수) 척도"
+        if neutral != [len(options) // 2]:
+            return "중립 보기가 가운데에 있지 않음"
+    return None
+
+
+def marker_problem(item: dict) -> bool:
+    """보기 번호가 없거나 ①부터 연속되지 않거나 형식이 섞여 있는지"""
+    markers = item["markers"]
+    circled = [CIRCLED[i] for i in range(min(len(markers), len(CIRCLED)))]
+    numbered = [str(i + 1) for i in range(len(markers))]
+    return markers != circled and markers != numbered
+
+
+def numbering_problems(items: list[dict]) -> tuple[list, bool]:
+    """(중복 번호 목록, 1부터 연속되지 않는지)"""
+    numbers = [item["number"] for item in items]
+    duplicates = sorted({n for n in numbers if numbers.count(n) > 1})
+    return duplicates, numbers != list(range(1, len(numbers) + 1))
+
+
+def validate_segments(segments: list, requested: tuple[int, int] | None = None) -> list[dict]:
+    """
+    검증 결과 목록 [{"code", "target", "message", "fixable"}]
+    fixable: 로컬로 고칠 수 있는지 (False면 부분 보완 요청 대상)
+    """
+    issues = []
+
+    def issue(code, target, message, fixable):
+        issues.append({"code": code, "target": target, "message": message, "fixable": fixable})
+
+    for section in ("SQ", "Q"):
+        items = items_of(segments, section)
+        if not items:
+            issue("missing_section", section, f"{section} 문항이 없습니다.", False)
+            continue
+        duplicates, out_of_order = numbering_problems(items)
+        if duplicates:
+            issue("duplicate_number", section, f"중복된 번호: {', '.join(f'{section}{n}' for n in duplicates)}", True)
+        elif out_of_order:
+            issue("numbering_gap", section, f"{section} 번호가 1부터 연속되지 않습니다.", True)
+
+    if requested is not None:
+        count = len(items_of(segments, "Q"))
+        low, high = requested
+        if count < low:
+            issue("too_few_questions", "Q", f"Q 문항 {count}개 (요청 {low}개 이상)", False)
+        elif count > high:
+            # 삭제할 문항을 임의로 고르지 않고 보고만 함
+            issue("too_many_questions", "Q", f"Q 문항 {count}개 (요청 {high}개 이하)", False)
+
+    for item in items_of(segments):
+        target = f"{item['section']}{item['number']}"
+        if not item["options"]:
+            if not is_open_ended(item):
+                issue("missing_options", target, f"{target} 보기가 없습니다.", False)
+            continue
+        if len(set(item["options"])) < len(item["options"]):
+            issue("duplicate_options", target, f"{target} 중복된 보기가 있습니다.", True)
+        if is_scale(item):
+            problem = scale_problem(item)
+            if problem:
+                issue("malformed_scale", target, f"{target} 척도 구성 오류: {problem}", False)
+        if marker_problem(item):
+            issue("option_format", target, f"{target} 보기 번호가 ①부터 연속되지 않습니다.", True)
+    return issues
+
+
+# === 로컬 수정 ===
+def renumber(segments: list) -> dict:
+    """구역별 번호를 1부터 다시 매기고 문항 안의 번호 참조도 갱신, {이전 번호: 새 번호} 반환 (중복 번호는 참조 갱신 제외)"""
+    mapping = {}
+    for section in ("SQ", "Q"):
+        items = items_of(segments, section)
+        numbers = [item["number"] for item in items]
+        for new, item in enumerate(items, 1):
+            if numbers.count(item["number"]) == 1:
+                mapping[f"{section}{item['number']}"] = f"{section}{new}"
+            item["number"] = new
+
+    def replace(match):
+        return mapping.get(f"{match.group(1)}{match.group(2)}", match.group(0))
+
+    for item in items_of(segments):
+        item["stem"] = QUESTION_REF.sub(replace, item["stem"])
+        item["notes"] = [QUESTION_REF.sub(replace, note) for note in item["notes"]]
+    return mapping
+
+
+def repair_locally(segments: list, issues: list[dict]):
+    """번호 · 보기 형식 · 중복 보기 정리 (보기 번호 형식은 출력 시 ①~로 통일)"""
+    codes = {i["code"] for i in issues}
+    if "duplicate_options" in codes:
+        for item in items_of(segments):
+            item["options"] = list(dict.fromkeys(item["options"]))
+    if codes & {"duplicate_number", "numbering_gap"}:
+        renumber(segments)
+    for item in items_of(segments):
+        item["markers"] = [CIRCLED[i] if i < len(CIRCLED) else str(i + 1) for i in range(len(item["options"]))]
+
+
+def uncovered_variables(segments: list, user_input: dict) -> list[str]:
+    """Q 문항에 아직 다뤄지지 않은 주요 측정 변수 (모두 다뤄졌으면 전체 변수)"""
+    values = list((user_input or {}).values())
+    variables = [str(v) for v in values[2]] if len(values) > 2 and isinstance(values[2], list) else []
+    stems = " ".join(item["stem"] for item in items_of(segments, "Q"))
+    missing = [v for v in variables if not any(word in stems for word in re.findall(r"[가-힣A-Za-z]{2,}", v))]
+    return missing or variables
+
+
+# === 부분 보완 ===
+class PatchItem(BaseModel):
+    """부분 보완 결과 한 건"""
+    target: str = Field(description="보기를 새로 작성한 기존 문항 번호 (예: Q5), 새 문항이면 빈 문자열")
+    section: Literal["SQ", "Q"] = Field(description="문항 구역")
+    question: str = Field(description="문항 내용 (번호 제외)")
+    options: List[str] = Field(default_factory=list, description="보기 목록 (번호 제외, 주관식이면 빈 목록)")
+
+
+class SurveyPatch(BaseModel):
+    patches: List[PatchItem] = Field(description="작업 목록 순서대로 작성한 문항")
+
+
+class SurveyValidator:
+    """생성된 설문지 검증 → 로컬 수정 → 부족한 부분만 LLM으로 보완"""
+
+    def __init__(self, model_name: str = None):
+        self.model_name = model_name or Config.REPAIR_MODEL
+        self.parser = JsonOutputParser(pydantic_object=SurveyPatch)
+
+        # 프롬프트 캐싱을 위해 고정 지침/출력 형식(system)을 앞에, 요구사항/작업 목록(human)을 뒤에 배치
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", """
+            너는 사회조사 전문가이자 설문지 설계 전문가야.
+            이미 작성된 설문지에서 부족한 부분만 작성해야 해. 설문지 전체를 다시 쓰지 마.
+
+            ## [작성 지침]
+            1. 작업 목록의 작업만 순서대로 수행한다.
+               - "보기 작성": 해당 문항(target)의 보기만 작성 (문항 내용은 그대로 옮김)
+               - "척도 재작성": 해당 문항(target)의 보기를 5점 척도(중립 보기는 가운데)로 다시 작성
+               - "문항 추가": 지정된 구역에 지정된 수만큼 새 문항 작성 (target은 빈 문자열)
+            2. 새 문항은 기존 문항과 중복되지 않게 하고, 주제가 주어지면 그 주제를 다룬다.
+            3. 응답자 특성 문항(SQ)은 인구통계 및 배경 문항, 본 문항(Q)은 조사 목적과 측정 변수 관련 문항이다.
+            4. 보기에는 번호(①, 1. 등)를 붙이지 않는다.
+
+            {format_instructions}
+            """),
+            ("human", """
+            ## [사용자 요구사항]
+            {requirements}
+
+            ## [기존 문항]
+            {existing}
+
+            ## [작업 목록]
+            {tasks}
+            """),
+        ]).partial(format_instructions=self.parser.get_format_instructions())
+
+    @cached_property
+    def llm(self) -> ChatOpenAI:
+        """보완 모델 (보완 요청이 처음 필요할 때 생성, report/off 모드에서는 만들지 않음)"""
+        return ChatOpenAI(model=self.model_name, temperature=0, max_retries=0)
+
+    @staticmethod
+    def completion_tasks(segments: list, issues: list[dict], user_input: dict) -> list[str]:
+        """로컬로 고칠 수 없는 문제 → 작업 목록 (보기 작성 · 척도 재작성 · 문항 추가)"""
+        tasks = []
+        for i in issues:
+            if i["code"] == "missing_options":
+                tasks.append(f"보기 작성: {i['target']}")
+            elif i["code"] == "malformed_scale":
+                tasks.append(f"척도 재작성: {i['target']}")
+            elif i["code"] == "missing_section" and i["target"] == "SQ":
+                tasks.append(f"문항 추가: SQ {DEFAULT_SQ_COUNT}개 (주제: 응답자 특성)")
+
+        requested = requested_range(user_input)
+        if requested is not None:
+            shortage = requested[0] - len(items_of(segments, "Q"))
+            if shortage > 0:
+                topics = ", ".join(uncovered_variables(segments, user_input)) or "조사 목적"
+                tasks.append(f"문항 추가: Q {shortage}개 (주제: {topics})")
+        return tasks
+
+    def complete(self, segments: list, tasks: list[str], user_input: dict) -> int:
+        """
+        작업 목록을 한 번의 요청으로 생성해 반영, 반영한 문항 수 반환
+        요청 · 응답 해석에 실패하면 0 (이미 생성된 설문지는 로컬 수정본으로 유지)
+        """
+        requirements = "\n".join(f"{key}: {value}" for key, value in (user_input or {}).items())
+        existing = "\n".join(f"{item['section']}{item['number']}. {item['stem']}" for item in items_of(segments))
+        messages = self.prompt.format_messages(
+            requirements=requirements,
+            existing=existing or "(없음)",
+            tasks="\n".join(f"- {task}" for task in tasks),
+        )
+        try:
+            response = invoke_chat("survey_repair", self.llm, messages)
+        except Exception as e:
+            print(f"⚠️ 부분 보완 요청 실패, 로컬 수정본 유지: {type(e).__name__}: {e}")
+            return 0
+        try:
+            patches = SurveyPatch.model_validate(self.parser.parse(response)).patches
+        except (OutputParserException, ValueError) as e:
+            print(f"⚠️ 부분 보완 응답 해석 실패: {e}")
+            return 0
+        return self.apply(segments, patches)
+
+    @staticmethod
+    def apply(segments: list, patches: list[PatchItem]) -> int:
+        """기존 문항의 보기는 교체, 새 문항은 해당 구역 끝에 추가 (구역이 없으면 제목과 함께 생성)"""
+        by_target = {f"{item['section']}{item['number']}": item for item in items_of(segments)}
+        applied = 0
+        for patch in patches:
+            options = [strip_marker(option) for option in patch.options if strip_marker(option)]
+            item = by_target.get(patch.target.replace(" ", "").upper())
+            if item is not None:
+                if options:
+                    item["options"] = options
+                    applied += 1
+                continue
+            if not patch.question.strip():
+                continue
+
+            new = {"section": patch.section, "number": 0, "stem": patch.question.strip(), "notes": [], "options": options, "markers": []}
+            section_items = items_of(segments, patch.section)
+            if section_items:
+                segments.insert(segments.index(section_items[-1]) + 1, new)
+            elif patch.section == "SQ":
+                first_q = next((i for i, s in enumerate(segments) if isinstance(s, dict)), len(segments))
+                # 본 문항 제목이 있으면 그 앞에 삽입
+                while first_q > 0 and isinstance(segments[first_q - 1], str) and \
+                        (not segments[first_q - 1].strip() or segments[first_q - 1].lstrip().startswith("#")):
+                    first_q -= 1
+                segments[first_q:first_q] = [SECTION_TITLES["SQ"], new, ""]
+            else:
+                segments += ["", SECTION_TITLES["Q"], new]
+            applied += 1
+        return applied
+
+    def __call__(self, survey: str, user_input: dict = None, complete: bool = True) -> tuple[str, dict]:
+        """
+        검증 후 수정한 설문지와 보고서 반환
+
+        Args:
+            survey: 생성된 설문지 텍스트
+            user_input: 구조화된 요구사항 (요청 문항 수 · 측정 변수 확인용, 없으면 문항 수는 검사하지 않음)
+            complete: 로컬로 고칠 수 없는 부분을 LLM으로 보완할지 여부
+
+        Returns:
+            (설문지, {"issues": 처음 발견된 문제, "remaining": 수정 후 남은 문제, "completed": 보완한 문항 수,
+                     "sq_count", "q_count", "changed"})
+        """
+        segments = parse_survey(survey)
+        requested = requested_range(user_input)
+        issues = validate_segments(segments, requested)
+
+        def report(text: str, remaining: list, completed: int = 0) -> tuple[str, dict]:
+            return text, {
+                "issues": issues,
+                "remaining": remaining,
+                "completed": completed,
+                "sq_count": len(items_of(segments, "SQ")),
+                "q_count": len(items_of(segments, "Q")),
+                "changed": text != survey,
+            }
+
+        # 문제가 없으면 원문 유지, 문항을 하나도 찾지 못한 응답은 보완하지 않고 보고만 함
+        if not issues or not items_of(segments):
+            return report(survey, issues)
+
+        repair_locally(segments, issues)
+        completed = 0
+        # 번호를 다시 매긴 뒤의 번호로 작업 대상 지정
+        tasks = self.completion_tasks(segments, validate_segments(segments, requested), user_input) if complete else []
+        if tasks:
+            completed = self.complete(segments, tasks, user_input)
+            if completed:
+                renumber(segments)
+                repair_locally(segments, [])
+
+        repaired = render_survey(segments)
+        return report(repaired, validate_segments(parse_survey(repaired), requested), completed)
@@ -0,0 +1,185 @@
+# feedback_output/version_store.py
+"""
+설문지 버전 히스토리 저장소 (세션별 SQLite)
+
+- 첫 버전과 일정 간격(Config.VERSION_SNAPSHOT_INTERVAL)마다 전체 텍스트 저장,
+  나머지는 부모 버전 대비 줄 단위 diff만 저장
+- 목록 조회는 메타데이터만 읽고, 본문은 요청 시 가장 가까운 전체 스냅샷부터 diff를 적용해 복원
+"""
+import json
+import time
+import uuid
+import sqlite3
+import difflib
+import threading
+from pathlib import Path
+from functools import lru_cache
+from rag.config import Config
+
+
+def make_delta(parent: str, text: str) -> list:
+    """
+    parent → text 줄 단위 diff
+    [[시작, 끝], ...] 는 부모의 줄 범위 복사, [줄, ...] 문자열 목록은 새 줄 삽입
+    """
+    a, b = parent.splitlines(keepends=True), text.splitlines(keepends=True)
+    ops = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:   # replace / insert (delete는 복사하지 않는 것으로 표현)
+            ops.append(b[j1:j2])
+    return ops
+
+
+def apply_delta(parent: str, ops: list) -> str:
+    lines = parent.splitlines(keepends=True)
+    out = []
+    for op in ops:
+        if op and isinstance(op[0], int):
+            out.extend(lines[op[0]:op[1]])
+        else:
+            out.extend(op)
+    return "".join(out)
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class SurveyVersionStore:
+    """세션 하나의 설문지 버전 기록"""
+
+    def __init__(self, session_id: str, root: str = None, snapshot_interval: int = None):
+        """
+        Args:
+            session_id: 세션 식별자 (파일명으로 사용)
+            root: 저장 디렉토리 (기본값: Config.VERSION_DB_DIR)
+            snapshot_interval: 연속 diff가 이 수에 이르면 전체 스냅샷 저장
+        """
+        if not session_id.isalnum():
+            raise ValueError(f"세션 id는 영문자/숫자만 사용할 수 있습니다: {session_id}")
+        self.session_id = session_id
+        self.snapshot_interval = snapshot_interval or Config.VERSION_SNAPSHOT_INTERVAL
+
+        self.path = Path(root or Config.VERSION_DB_DIR) / f"{session_id}.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS versions (
+                version INTEGER PRIMARY KEY,
+                parent INTEGER,
+                kind TEXT,          -- full / delta
+                depth INTEGER,      -- 가장 가까운 전체 스냅샷까지 diff 수
+                payload TEXT,
+                label TEXT,
+                chars INTEGER,
+                created_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+        )
+        self._conn.commit()
+
+        # 복원한 본문 (버전은 수정되지 않으므로 무효화 불필요)
+        self.get = lru_cache(maxsize=8)(self._get)
+
+    def add(self, text: str, label: str = "", parent: int = None) -> int:
+        """
+        새 버전 저장 후 버전 번호 반환
+
+        Args:
+            label: 버전 설명 (예: "초안", "피드백 반영")
+            parent: 기반 버전 (기본값: 최신 버전, 복원한 버전에서 수정한 경우 해당 버전)
+        """
+        if parent is None:
+            parent = self.latest()
+
+        kind, depth, payload = "full", 0, text
+        if parent is not None:
+            parent_depth = self._row(parent)[1]
+            if parent_depth + 1 < self.snapshot_interval:
+                delta = json.dumps(make_delta(self.get(parent), text), ensure_ascii=False)
+                # 변경이 커서 diff가 더 크면 전체 저장
+                if len(delta) < len(text):
+                    kind, depth, payload = "delta", parent_depth + 1, delta
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO versions (parent, kind, depth, payload, label, chars, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (parent, kind, depth, payload, label, len(text), time.time()),
+            )
+            self._conn.commit()
+        return cursor.lastrowid
+
+    def _row(self, version: int) -> tuple:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT kind, depth, parent, payload FROM versions WHERE version = ?", (version,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"버전 {version}이 없습니다.")
+        return row
+
+    def _get(self, version: int) -> str:
+        """버전 본문 복원 (전체 스냅샷까지 거슬러 올라간 뒤 diff 순서대로 적용)"""
+        chain = []
+        kind, _, parent, payload = self._row(version)
+        while kind == "delta":
+            chain.append(json.loads(payload))
+            kind, _, parent, payload = self._row(parent)
+
+        text = payload
+        for ops in reversed(chain):
+            text = apply_delta(text, ops)
+        return text
+
+    def latest(self) -> int | None:
+        with self._lock:
+            return self._conn.execute("SELECT MAX(version) FROM versions").fetchone()[0]
+
+    def versions(self) -> list[dict]:
+        """버전 메타데이터 목록 (최신순, 본문 제외)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT version, parent, kind, label, chars, created_at FROM versions ORDER BY version DESC"
+            ).fetchall()
+        return [
+            {"version": v, "parent": p, "kind": k, "label": label, "chars": chars, "created_at": created_at}
+            for v, p, k, label, chars, created_at in rows
+        ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM versions").fetchone()[0]
+
+    def set_meta(self, key: str, value):
+        """세션 복원에 필요한 부가 정보 (예: 분석된 요구사항) 저장"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, json.dumps(value, ensure_ascii=False))
+            )
+            self._conn.commit()
+
+    def get_meta(self, key: str, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def storage_report(self) -> dict:
+        """전체 텍스트 합 대비 실제 저장 크기"""
+        with self._lock:
+            count, stored, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0), COALESCE(SUM(chars), 0) FROM versions"
+            ).fetchone()
+        return {"versions": count, "stored_chars": stored, "full_text_chars": total}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,16 +1,25 @@
 from user_input.user_input_module import UserInputAnalyzer
 from system_orchestration.orchestration import SurveyOrchestration
+from rag.speculative import analyze_with_speculation
+from utils.llm_cache import get_llm_cache
+from utils.rate_limiter import get_rate_limiter
+from utils.ollama_manager import get_ollama_manager, preload_local_models, local_models_enabled
+from domain_model.hedged_dispatch import latency_report
+from utils.llm_call import usage_report
+from utils.tracing import tracing_enabled, format_breakdown
 import time 
 
 # 1. 유저 요구사항 분석 
 
 t1 = time.time()
+preload_local_models()   # 도메인 모델 백그라운드 예열 (generation dispatch가 static이 아닐 때)
 analyzer = UserInputAnalyzer(stopword_path="./user_input/stopword.txt", model="gpt-5")
 text = "병원의 조직문화 개선을 위한 설문을 하려고합니다 대상은 병원에 근무하는 의료진 및 직원들 입니다. 10문항으로 설문지를 구성해주세요"
 
 print('사용자 요구사항 분석 및 출력 진행...')
 print(f'사용자 요구사항: \n{text}')
-user_input = analyzer(text)
+# 키워드 추출 직후 원문으로 참조 설문 검색을 미리 시작 (LLM 구조화와 겹침)
+user_input, speculative = analyze_with_speculation(analyzer, text)
 
 print("분석 결과:")
 print(user_input)
@@ -19,22 +28,29 @@ print(f'{time.time() - t1:.1f}초 소요')
 
 # 2. 시스템 오케스트레이션 
 t2 = time.time()
-so = SurveyOrchestration(user_input)
+so = SurveyOrchestration(user_input, speculative=speculative)
 current_survey = so()
 
 print('\n 생성 완료:')
 print(current_survey)
 print(f'{time.time() - t2:.1f}초 소요\n')
+if tracing_enabled():
+    print(format_breakdown(so.last_trace))
 
 # 3. 피드백 루프
 max_iterations = 5
 iteration = 1
+pending_feedback = []   # 재생성 전까지 모아둔 피드백
 
 while iteration <= max_iterations:
     print("\n" + "="*60)
     print(f"버전 {iteration} - 피드백 입력")
     print("="*60)
-    print("명령어: 승인, 또는 피드백 입력")
+    print("명령어: 승인, 적용(모아둔 피드백 반영), 또는 피드백 입력")
+    if pending_feedback:
+        print(f"대기 중인 피드백 {len(pending_feedback)}건:")
+        for i, item in enumerate(pending_feedback, 1):
+            print(f"  {i}. {item}")
     
     user_input_text = input("\n입력: ").strip()
     
@@ -46,17 +62,29 @@ while iteration <= max_iterations:
         print(current_survey)
         break
     
-    else:
-        # 피드백 처리
+    elif user_input_text == '적용':
+        if not pending_feedback:
+            print("대기 중인 피드백이 없습니다.")
+            continue
+        
+        # 모아둔 피드백을 한 번에 처리
         current_survey = so.process_feedback(
             current_survey,
-            user_input_text
+            pending_feedback
         )
+        pending_feedback = []
         
         print("\n 수정 완료:")
         print(current_survey)
+        if tracing_enabled():
+            print(format_breakdown(so.last_trace))
         
         iteration += 1
+    
+    elif user_input_text:
+        # 피드백 대기열에 추가
+        pending_feedback.append(user_input_text)
+        print(f"피드백이 추가되었습니다. ('적용' 입력 시 {len(pending_feedback)}건을 한 번에 반영)")
 
 if iteration > max_iterations:
     print("\n 최대 반복 횟수 도달")
@@ -64,3 +92,16 @@ if iteration > max_iterations:
     print("최종 설문지")
     print("="*60)
     print(current_survey)
+
+# 캐시 사용 시 단계별 적중 현황 출력
+cache = get_llm_cache()
+if cache is not None:
+    print("\n" + cache.report())
+
+print("\n" + usage_report())
+print("\n" + get_rate_limiter().report())
+
+for model, summary in latency_report().items():
+    print(f"  - {model} 지연시간: {summary}")
+if local_models_enabled():
+    print(get_ollama_manager().report())
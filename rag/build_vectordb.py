@@ -3,6 +3,11 @@
 from rag.config import Config
 from rag.loader import SurveyLoader
 from rag.embedder import SurveyEmbedder
+from rag.summarizer import SurveySummarizer
+from utils.tokenizer import build_noun_dictionary
+from user_input.text_mining import TextMiningProcessor
+from user_input.idf_table import build_idf_table
+from system_orchestration.centroid_classifier import CentroidDomainClassifier
 
 
 
@@ -11,13 +16,29 @@ PDF_ROOT = Config().PDF_ROOT
 MODEL_NAME = Config().EMBEDDING_MODEL
 FAISS_DB = Config().FAISS_DB
 BM_DB = Config().BM_DB
+CHUNK_DB = Config().CHUNK_DB
 
 if __name__ == "__main__":
     # === 문서 로드 ===
     loader = SurveyLoader(PDF_ROOT)
     docs = loader.load_all()
 
+    # === 명사 사전 (dict 토크나이저용) ===
+    build_noun_dictionary([doc.page_content for doc in docs])
+
+    # === 키워드 추출용 코퍼스 IDF 테이블 ===
+    build_idf_table(docs, TextMiningProcessor(), Config.STOPWORD_PATH, Config.IDF_DB)
+
     # === 임베딩 및 BM25 구축 ===
-    embedder = SurveyEmbedder(MODEL_NAME, FAISS_DB, BM_DB)
-    embedder.build_vector_db(docs)      # FAISS 저장
-    embedder.build_bm25_index(docs)     # BM25 저장
\ No newline at end of file
+    embedder = SurveyEmbedder(MODEL_NAME, FAISS_DB, BM_DB, CHUNK_DB)
+    chunk_store = embedder.build_chunk_store(docs)     # 청크 원문 저장 (두 인덱스 공용)
+    vector_store = embedder.build_vector_db(docs, chunk_store=chunk_store)      # FAISS 저장
+    embedder.build_bm25_index(docs, chunk_store=chunk_store)     # BM25 저장
+
+    # === 참조 설문지 요약 (새로 추가되거나 바뀐 설문지만) ===
+    SurveySummarizer()(chunk_store)
+
+    # === 도메인 중심 벡터 (임베딩 기반 도메인 분류용) ===
+    classifier = CentroidDomainClassifier.fit_from_vector_store(vector_store)
+    path = classifier.save(FAISS_DB)
+    print(f"도메인 중심 벡터 저장 완료: {path} ({', '.join(classifier.labels)})")
\ No newline at end of file
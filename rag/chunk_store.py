@@ -0,0 +1,240 @@
+# rag/chunk_store.py
+"""
+청크 원문 저장소 (FAISS docstore · BM25 문서 목록 공용)
+
+- 설문지별 원문을 하나의 UTF-8 blob(chunk_text.bin)으로 이어 붙이고, 청크는 (문서 번호, 시작, 끝) 바이트 오프셋 배열로 저장
+  (청크 간 겹치는 구간은 한 번만 저장)
+- 메타데이터(file_name, domain 등)는 설문지별로 한 번만 저장
+- 로드 시 blob · 오프셋 배열을 메모리 매핑하고, 검색된 청크만 그때 Document로 복원
+- 피클에는 저장소 경로만 기록되므로 FAISS(index.pkl) · BM25(bm25.pkl)가 같은 저장소를 공유
+
+    python -m rag.chunk_store      # 기존 인덱스(청크별 Document 피클)를 청크 저장소 방식으로 변환
+"""
+import os
+import json
+import mmap
+import pickle
+from pathlib import Path
+from functools import lru_cache
+import numpy as np
+from langchain_core.documents import Document
+from langchain_community.docstore.base import Docstore
+from rag.config import Config
+
+
+class ChunkStore(Docstore):
+    """
+    청크 id(= FAISS 인덱스 순서 = BM25 문서 순서)로 Document를 복원하는 읽기 전용 저장소
+    FAISS docstore(search)와 BM25Retriever.docs(len · 인덱싱) 양쪽으로 사용
+    """
+
+    TEXT_FILE = "chunk_text.bin"
+    SPANS_FILE = "chunk_spans.npy"
+    META_FILE = "chunk_docs.json"
+
+    def __init__(self, text, spans: np.ndarray, docs: list[dict], path: Path = None):
+        self.text = text            # bytes 또는 mmap
+        self.spans = spans          # (청크 수, 3) int64: 문서 번호, 시작, 끝 (바이트)
+        self.docs = docs            # 문서 번호별 메타데이터
+        self.path = path
+
+    # === 구축 ===
+    @classmethod
+    def build(cls, chunks: list[Document], max_overlap: int = 400) -> "ChunkStore":
+        """
+        로더가 만든 청크 목록(설문지별로 연속)으로 저장소 구성
+        메타데이터가 같은 연속 청크를 한 문서로 묶고, 앞 청크 끝과 겹치는 접두사는 다시 저장하지 않음
+        """
+        blob, spans, docs = bytearray(), [], []
+        i = 0
+        while i < len(chunks):
+            meta = chunks[i].metadata
+            j = i
+            while j < len(chunks) and chunks[j].metadata == meta:
+                j += 1
+
+            text, char_spans = "", []
+            for chunk in chunks[i:j]:
+                content = chunk.page_content
+                overlap = cls._overlap(text, content, max_overlap)
+                if not overlap and text:
+                    text += "\n"
+                start = len(text) - overlap
+                text += content[overlap:]
+                char_spans.append((start, start + len(content)))
+
+            base = len(blob)
+            byte_offset = cls._byte_offsets(text, {pos for span in char_spans for pos in span})
+            spans += [(len(docs), base + byte_offset[s], base + byte_offset[e]) for s, e in char_spans]
+            blob += text.encode("utf-8")
+            docs.append(dict(meta))
+            i = j
+
+        return cls(bytes(blob), np.array(spans, dtype=np.int64).reshape(-1, 3), docs)
+
+    @staticmethod
+    def _overlap(text: str, content: str, max_overlap: int) -> int:
+        """text 끝과 일치하는 content의 가장 긴 접두사 길이"""
+        for size in range(min(len(text), len(content), max_overlap), 0, -1):
+            if text.endswith(content[:size]):
+                return size
+        return 0
+
+    @staticmethod
+    def _byte_offsets(text: str, positions: set[int]) -> dict[int, int]:
+        """문자 위치 → UTF-8 바이트 위치"""
+        offsets, prev, byte_pos = {}, 0, 0
+        for pos in sorted(positions):
+            byte_pos += len(text[prev:pos].encode("utf-8"))
+            offsets[pos] = byte_pos
+            prev = pos
+        return offsets
+
+    # === 저장 · 로드 ===
+    def save(self, dir_path) -> Path:
+        """
+        임시 파일에 쓴 뒤 교체 (다른 프로세스가 매핑 중인 기존 파일을 덮어쓰지 않음)
+        """
+        dir_path = Path(dir_path)
+        dir_path.mkdir(parents=True, exist_ok=True)
+        with open(dir_path / f"{self.TEXT_FILE}.tmp", "wb") as f:
+            f.write(self.text)
+        with open(dir_path / f"{self.SPANS_FILE}.tmp", "wb") as f:
+            np.save(f, np.asarray(self.spans))
+        with open(dir_path / f"{self.META_FILE}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"num_chunks": len(self), "docs": self.docs}, f, ensure_ascii=False)
+        for name in (self.TEXT_FILE, self.SPANS_FILE, self.META_FILE):
+            os.replace(dir_path / f"{name}.tmp", dir_path / name)
+
+        self.path = dir_path.resolve()
+        open_chunk_store.cache_clear()
+        return dir_path
+
+    @classmethod
+    def load(cls, dir_path) -> "ChunkStore":
+        dir_path = Path(dir_path)
+        if not (dir_path / cls.META_FILE).exists():
+            raise FileNotFoundError(f"청크 저장소가 없습니다: {dir_path}")
+        with open(dir_path / cls.META_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(dir_path / cls.TEXT_FILE, "rb") as f:
+            # 빈 파일은 매핑할 수 없음
+            text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        spans = np.load(dir_path / cls.SPANS_FILE, mmap_mode="r")
+        return cls(text, spans, meta["docs"], dir_path.resolve())
+
+    def __reduce__(self):
+        if self.path is None:
+            raise pickle.PicklingError("저장하지 않은 청크 저장소는 피클할 수 없습니다. save()를 먼저 호출하세요.")
+        return open_chunk_store, (str(self.path),)
+
+    # === 조회 ===
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __getitem__(self, i) -> Document:
+        doc_id, start, end = self.spans[int(i)]
+        return Document(
+            page_content=self.text[start:end].decode("utf-8"),
+            metadata=dict(self.docs[doc_id]),
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def documents(self):
+        """설문지별 (메타데이터, 원문) — 첫 청크 시작부터 마지막 청크 끝까지"""
+        doc_ids = np.asarray(self.spans[:, 0])
+        for doc_id, meta in enumerate(self.docs):
+            rows = np.flatnonzero(doc_ids == doc_id)
+            if len(rows) == 0:
+                continue
+            start, end = int(self.spans[rows, 1].min()), int(self.spans[rows, 2].max())
+            yield dict(meta), self.text[start:end].decode("utf-8")
+
+    def search(self, search: str) -> Document | str:
+        """FAISS docstore 인터페이스 (id는 청크 번호 문자열)"""
+        try:
+            return self[int(search)]
+        except (ValueError, IndexError):
+            return f"ID {search} not found."
+
+    def size_report(self) -> dict:
+        return {
+            "chunks": len(self),
+            "documents": len(self.docs),
+            "text_bytes": len(self.text),
+            "span_bytes": int(self.spans.nbytes),
+        }
+
+
+@lru_cache(maxsize=None)
+def open_chunk_store(path: str) -> ChunkStore:
+    """
+    경로별로 한 번만 매핑해 FAISS · BM25 피클이 같은 저장소를 공유
+    (인덱스 디렉토리를 옮겨 저장된 경로가 없으면 Config.CHUNK_DB 사용)
+    """
+    if not Path(path).exists():
+        path = str(Config.CHUNK_DB)
+    return ChunkStore.load(path)
+
+
+# === 인덱스 연결 ===
+def attach_to_faiss(vector_store, store: ChunkStore):
+    """FAISS 저장소의 docstore를 청크 저장소로 교체 (FAISS 벡터 순서 = 청크 순서)"""
+    if vector_store.index.ntotal != len(store):
+        raise ValueError(f"FAISS 벡터 수({vector_store.index.ntotal})와 청크 수({len(store)})가 다릅니다.")
+    vector_store.docstore = store
+    vector_store.index_to_docstore_id = {i: str(i) for i in range(len(store))}
+    return vector_store
+
+
+def attach_to_bm25(bm25, store: ChunkStore):
+    """BM25 검색기의 문서 목록을 청크 저장소로 교체한 복사본 (BM25 점수 행 순서 = 청크 순서)"""
+    if bm25.vectorizer.corpus_size != len(store):
+        raise ValueError(f"BM25 문서 수({bm25.vectorizer.corpus_size})와 청크 수({len(store)})가 다릅니다.")
+    return bm25.model_copy(update={"docs": store})
+
+
+def _file_size(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.iterdir() if p.is_file())
+    return path.stat().st_size if path.exists() else 0
+
+
+def main():
+    """기존 인덱스 변환: FAISS docstore 순서로 청크 저장소 구축 후 두 피클을 다시 저장"""
+    from rag.retriever import load_indexes
+
+    vector_store, bm25 = load_indexes()
+    if isinstance(vector_store.docstore, ChunkStore):
+        print("이미 청크 저장소를 사용하는 인덱스입니다.")
+        return
+
+    index_pkl, bm25_pkl = Config.FAISS_DB / "index.pkl", Config.BM_DB / "bm25.pkl"
+    before = _file_size(index_pkl) + _file_size(bm25_pkl)
+
+    chunks = [
+        vector_store.docstore.search(vector_store.index_to_docstore_id[i])
+        for i in range(vector_store.index.ntotal)
+    ]
+    if [doc.page_content for doc in bm25.docs] != [doc.page_content for doc in chunks]:
+        raise ValueError("BM25 문서 순서가 FAISS 벡터 순서와 다릅니다. 인덱스를 다시 구축하세요.")
+
+    store = ChunkStore.build(chunks)
+    store.save(Config.CHUNK_DB)
+    store = open_chunk_store(str(store.path))
+
+    attach_to_faiss(vector_store, store).save_local(str(Config.FAISS_DB))
+    with open(bm25_pkl, "wb") as f:
+        pickle.dump(attach_to_bm25(bm25, store), f)
+
+    after = _file_size(index_pkl) + _file_size(bm25_pkl) + _file_size(Config.CHUNK_DB)
+    report = store.size_report()
+    print(f"✅ 청크 {report['chunks']}개 (설문지 {report['documents']}개) 변환 완료: {Config.CHUNK_DB}")
+    print(f"   피클 + 원문 크기: {before / 1e6:.1f}MB → {after / 1e6:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 # rag/config.py
+import os
+import json
 from pathlib import Path
 
 class Config:
@@ -6,5 +8,124 @@ class Config:
     PDF_ROOT: Path = Path("./data/설문지/PDF").resolve()
     FAISS_DB: Path = Path("./rag/vector_store/faiss").resolve()
     BM_DB: Path = Path("./rag/vector_store/bm").resolve()
+    CHUNK_DB: Path = Path("./rag/vector_store/chunks").resolve()   # 청크 원문 (FAISS · BM25 공용)
     EMBEDDING_MODEL: str = "text-embedding-3-small" 
-    MODEL_NAME: str = "gpt-5-mini"
\ No newline at end of file
+    # 인덱스 구축 시 임베딩 차원 (256/512/1024/1536) · 저장 정밀도 (float32/float16/int8), 검색 시에는 인덱스 메타데이터를 따름
+    EMBEDDING_DIMENSIONS: int = int(os.getenv("AUTOSURVEY_EMBEDDING_DIMENSIONS", 1536))
+    EMBEDDING_PRECISION: str = os.getenv("AUTOSURVEY_EMBEDDING_PRECISION", "float32")
+    MODEL_NAME: str = "gpt-5-mini"
+    OLLAMA_BASE_URL: str = os.getenv("OLLAMA_HOST", "http://localhost:11434")   # 로컬 대역 서버로 전환 시 변경
+
+    # === Ollama 도메인 모델 (모델별 keep_alive / parallel / preload 덮어쓰기) ===
+    OLLAMA_MODELS: dict = json.loads(os.getenv("AUTOSURVEY_OLLAMA_MODELS", "null")) or {
+        "AutoSurvey-Public": {},
+        "AutoSurvey-Edu": {},
+        "AutoSurvey-Industry": {},
+        "AutoSurvey-Health": {},
+    }
+    OLLAMA_KEEP_ALIVE: str = os.getenv("AUTOSURVEY_OLLAMA_KEEP_ALIVE", "30m")   # 마지막 요청 후 메모리 유지 시간
+    OLLAMA_PARALLEL: int = int(os.getenv("OLLAMA_NUM_PARALLEL", 1))   # 모델별 동시 요청 수 (서버 병렬 처리 수와 맞춤)
+    OLLAMA_PRELOAD: str = os.getenv("AUTOSURVEY_OLLAMA_PRELOAD", "auto")   # on / off / auto (static 디스패치가 아닐 때만)
+    OLLAMA_LOAD_TIMEOUT: float = 300.0  # 예열 요청 제한 시간(초)
+    OLLAMA_SLOT_POLL: float = 0.02      # 비동기 요청의 슬롯 확인 간격(초)
+
+    # === LLM 응답 캐시 (off / on / record / replay) ===
+    LLM_CACHE_MODE: str = os.getenv("AUTOSURVEY_LLM_CACHE", "off")
+    LLM_CACHE_PATH: Path = Path(os.getenv("AUTOSURVEY_LLM_CACHE_PATH", "./.cache/llm_cache.sqlite")).resolve()
+    LLM_CACHE_TTL: int = int(os.getenv("AUTOSURVEY_LLM_CACHE_TTL", 7 * 24 * 3600))  # 초, 0이면 만료 없음
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTOSURVEY_LLM_CACHE_MAX_ENTRIES", 5000))
+
+    # === OpenAI 호출 속도 제한 (모델별 requests/min, tokens/min) ===
+    RATE_LIMITS: dict = json.loads(os.getenv("AUTOSURVEY_RATE_LIMITS", "null")) or {
+        "gpt-5": {"rpm": 500, "tpm": 500_000},
+        "gpt-5-mini": {"rpm": 500, "tpm": 500_000},
+        "text-embedding-3-small": {"rpm": 3_000, "tpm": 1_000_000},
+    }
+    RATE_LIMIT_OUTPUT_TOKENS: int = 1024   # 토큰 예약 시 가정하는 출력 토큰 수
+    RETRY_MAX_ATTEMPTS: int = int(os.getenv("AUTOSURVEY_RETRY_MAX_ATTEMPTS", 6))
+    RETRY_BASE_DELAY: float = 1.0          # 초
+    RETRY_MAX_DELAY: float = 60.0          # 초
+
+    # === 단계별 트레이싱 · 지표 (off / on) ===
+    TRACING: str = os.getenv("AUTOSURVEY_TRACING", "off")
+    TRACE_PATH: Path = Path(os.getenv("AUTOSURVEY_TRACE_PATH", "./.cache/traces.jsonl")).resolve()
+    METRICS_PATH: Path = Path(os.getenv("AUTOSURVEY_METRICS_PATH", "./.cache/metrics.prom")).resolve()
+    METRICS_PORT: int = int(os.getenv("AUTOSURVEY_METRICS_PORT", 0))    # 0이면 HTTP 노출 안 함
+
+    # === 검색 파라미터 (rag.eval_retrieval 평가 결과, 없으면 기본 규칙 사용) ===
+    RAG_PARAMS_PATH: Path = Path(os.getenv("AUTOSURVEY_RAG_PARAMS", "./rag/vector_store/rag_params.json")).resolve()
+    DEFAULT_RAG_PARAMS: dict = {
+        "default": {"fusion": "rrf", "sparse_weight": 0.3, "dense_weight": 0.7, "k": 1},
+        # 순서대로 적용 (조건을 모두 만족하면 덮어쓰기)
+        "rules": [
+            {"min_questions": 50, "k": 2},
+            {"min_questions": 70, "k": 3},
+            {"min_variables": 6, "sparse_weight": 0.2, "dense_weight": 0.8},
+        ],
+    }
+
+    # === 설문지 버전 히스토리 (세션별 SQLite) ===
+    VERSION_DB_DIR: Path = Path(os.getenv("AUTOSURVEY_VERSION_DB_DIR", "./.cache/versions")).resolve()
+    VERSION_SNAPSHOT_INTERVAL: int = 5  # 연속 diff가 이 수에 이르면 전체 텍스트 저장
+
+    # === Streamlit 백그라운드 작업 (검색 · 생성 · 재생성) ===
+    JOB_WORKERS: int = int(os.getenv("AUTOSURVEY_JOB_WORKERS", 8))   # 앱 프로세스 공용 작업 스레드 수
+    JOB_TTL: float = 3600.0         # 끝난 작업 보관 시간(초)
+    JOB_POLL_INTERVAL: float = 0.5  # 진행 상황 갱신 주기(초)
+
+    # === HTTP 서비스 (api.py) ===
+    API_PORT: int = int(os.getenv("AUTOSURVEY_API_PORT", 8000))
+    API_MAX_CONCURRENCY: int = int(os.getenv("AUTOSURVEY_API_MAX_CONCURRENCY", 8))  # 동시 처리 요청 수
+    API_MAX_QUEUE: int = int(os.getenv("AUTOSURVEY_API_MAX_QUEUE", 32))              # 대기 가능한 요청 수
+    API_QUEUE_TIMEOUT: float = 30.0     # 대기열 최대 대기 시간(초), 넘으면 503
+
+    # === 생성 단계 디스패치 (static / fallback / hedged) ===
+    GENERATION_DISPATCH: str = os.getenv("AUTOSURVEY_GENERATION_DISPATCH", "static")
+    STAGE_DEADLINES: dict = {       # 단계별 제한 시간(초), None이면 제한 없음 (static은 기존 동기 호출 유지)
+        "generator": None,
+        "regenerator": None,
+    }
+    HEDGE_MIN_SAMPLES: int = 20     # p95 계산에 필요한 최소 표본 수
+    HEDGE_DEFAULT_DELAY: float = 60.0   # 표본이 부족할 때 보조 모델 요청까지 대기(초)
+
+    # === 생성 결과 검증 (repair: 로컬 수정 + 부족한 부분만 LLM 보완 / report: 검증만 / off) ===
+    SURVEY_VALIDATION: str = os.getenv("AUTOSURVEY_SURVEY_VALIDATION", "repair")
+    REPAIR_MODEL: str = "gpt-5-mini"
+
+    # === 피드백 분석 (index: 문항 목차만 전달, 대상이 모호할 때만 전체 설문 / full: 항상 전체 설문) ===
+    FEEDBACK_SURVEY_CONTEXT: str = os.getenv("AUTOSURVEY_FEEDBACK_SURVEY_CONTEXT", "index")
+    FEEDBACK_INDEX_STEM_CHARS: int = 30     # 목차에 넣을 문항 앞부분 글자 수
+
+    # === 도메인 분류 ===
+    DOMAIN_MIN_CONFIDENCE: float = 0.6  # 임베딩 분류 신뢰도가 이보다 낮으면 LLM 분류
+
+    # === 토크나이저 (키워드 추출 · BM25 공용: okt / ngram / dict) ===
+    TOKENIZER: str = os.getenv("AUTOSURVEY_TOKENIZER", "okt")
+    NOUN_DICT: Path = Path("./rag/vector_store/nouns.txt").resolve()
+    IDF_DB: Path = Path("./rag/vector_store/idf").resolve()
+    STOPWORD_PATH: Path = Path("./user_input/stopword.txt").resolve()
+
+    # === 추측 검색 (요구사항 분석 중 원문으로 미리 검색: on / off) ===
+    SPECULATIVE_RETRIEVAL: str = os.getenv("AUTOSURVEY_SPECULATIVE_RETRIEVAL", "on")
+    SPECULATIVE_MIN_OVERLAP: float = 0.5   # 재검색한 설문지 중 추측 후보에 포함된 비율이 이 이상이면 추측 후보 사용
+    SPECULATIVE_WORKERS: int = 4           # 추측 검색 스레드 수
+
+    # === 참조 설문지 요약 (인덱스 구축 시 설문지별 1회 생성) ===
+    SUMMARY_DB: Path = Path("./rag/vector_store/summaries").resolve()
+    SUMMARY_MODEL: str = "gpt-5-mini"
+    SUMMARY_CONCURRENCY: int = int(os.getenv("AUTOSURVEY_SUMMARY_CONCURRENCY", 4))   # 동시 요약 요청 수
+    SUMMARY_MAX_CHARS: int = 30000      # 요약 입력 원문 길이 상한
+    RAG_CONTEXT: str = os.getenv("AUTOSURVEY_RAG_CONTEXT", "digest")   # digest: 저장된 요약으로 구성 / llm: 요청마다 LLM 요약
+
+    # === 요구사항 일괄 분석 ===
+    BATCH_CONCURRENCY: int = int(os.getenv("AUTOSURVEY_BATCH_CONCURRENCY", 8))   # 동시 LLM 추출 요청 수
+    BATCH_WORKERS: int = int(os.getenv("AUTOSURVEY_BATCH_WORKERS", 2))           # 토큰화 프로세스 수 (1이면 프로세스 내 처리)
+    BATCH_CHUNK_SIZE: int = 16      # 토큰화 작업 단위 (텍스트 수)
+
+    # === 설문 초안 일괄 생성 (단계별 동시 실행 수) ===
+    BATCH_STAGE_CONCURRENCY: dict = {
+        "analysis": 8,
+        "retrieval": 8,
+        "classification": 8,
+        "generation": 4,
+    }
@@ -7,7 +7,9 @@ from typing import List
 from langchain_core.documents import Document
 from langchain_community.vectorstores import FAISS
 from langchain_community.retrievers import BM25Retriever
-from langchain_openai import OpenAIEmbeddings
+from utils.tokenizer import get_tokenizer
+from rag.embedding_index import index_meta, load_index_meta, save_index_meta, make_embeddings, quantize, index_bytes
+from rag.chunk_store import ChunkStore, open_chunk_store, attach_to_faiss, attach_to_bm25
 
 
 class SurveyEmbedder:
@@ -15,16 +17,27 @@ class SurveyEmbedder:
     PDF 문서를 임베딩하여 FAISS 및 BM25 인덱스를 구축하고 저장하는 클래스
     """
 
-    def __init__(self, model_name: str, db_path: str, bm_path: str):
-        # === 임베딩 모델 설정 ===
-        self.embed_model = OpenAIEmbeddings(model=model_name)
+    def __init__(self, model_name: str, db_path: str, bm_path: str, chunk_path: str = None,
+                 dimensions: int = None, precision: str = None):
+        # === 임베딩 모델 설정 (차원 · 저장 정밀도 기본값: Config) ===
+        self.meta = index_meta(model_name, dimensions, precision)
+        self.embed_model = make_embeddings(self.meta)
 
         # === 저장 경로 설정 ===
         self.db_path = Path(db_path)
         self.bm_path = Path(bm_path)
+        self.chunk_path = Path(chunk_path) if chunk_path else self.db_path.parent / "chunks"
+
+    # === 청크 원문 저장소 구축 (FAISS · BM25 공용) ===
+    def build_chunk_store(self, docs: List[Document]) -> ChunkStore:
+        store = ChunkStore.build(docs)
+        store.save(self.chunk_path)
+        report = store.size_report()
+        print(f"청크 저장소 저장 완료: {self.chunk_path} (청크 {report['chunks']}개, 원문 {report['text_bytes'] / 1e6:.1f}MB)")
+        return open_chunk_store(str(store.path))
 
     # === FAISS 벡터DB 구축 및 저장 ===
-    def build_vector_db(self, docs: List[Document], batch_size: int = 50):
+    def build_vector_db(self, docs: List[Document], batch_size: int = 50, chunk_store: ChunkStore = None):
         if not docs:
             raise ValueError("문서 리스트(docs)가 비어 있습니다.")
 
@@ -41,8 +54,17 @@ class SurveyEmbedder:
             else:
                 vector_store.merge_from(batch_store)  # 나머지 배치
 
+        # 청크별 Document 대신 청크 저장소 참조만 저장
+        if chunk_store is not None:
+            attach_to_faiss(vector_store, chunk_store)
+
+        quantize(vector_store, self.meta["precision"])
         vector_store.save_local(str(self.db_path))
-        print(f"FAISS 벡터DB 저장 완료: {self.db_path}")
+        save_index_meta(self.db_path, self.meta)
+        print(
+            f"FAISS 벡터DB 저장 완료: {self.db_path} "
+            f"({self.meta['dimensions']}차원 {self.meta['precision']}, {index_bytes(vector_store.index) / 1e6:.1f}MB)"
+        )
 
         return vector_store
 
@@ -53,16 +75,20 @@ class SurveyEmbedder:
 
         vector_store = FAISS.load_local(
             str(self.db_path),
-            embeddings=self.embed_model,
+            embeddings=make_embeddings(load_index_meta(self.db_path)),
             allow_dangerous_deserialization=True
         )
         return vector_store
 
     # === BM25 인덱스 구축 및 저장===
-    def build_bm25_index(self, docs: List[Document], k: int = 3):
-        print(f"\n BM25 인덱스 생성 중... ({len(docs)}개 문서)")
-        bm25_retriever = BM25Retriever.from_documents(docs)
+    def build_bm25_index(self, docs: List[Document], k: int = 3, tokenizer: str = None, chunk_store: ChunkStore = None):
+        tokenizer = get_tokenizer(tokenizer)
+        print(f"\n BM25 인덱스 생성 중... ({len(docs)}개 문서, 토크나이저: {tokenizer.name})")
+        # 토크나이저는 인덱스와 함께 저장되어 검색 시에도 동일하게 적용됨
+        bm25_retriever = BM25Retriever.from_documents(docs, preprocess_func=tokenizer)
         bm25_retriever.k = k
+        if chunk_store is not None:
+            bm25_retriever = attach_to_bm25(bm25_retriever, chunk_store)
 
         bm25_file = self.bm_path / "bm25.pkl"
         with open(bm25_file, "wb") as f:
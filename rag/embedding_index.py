@@ -0,0 +1,172 @@
+# rag/embedding_index.py
+"""
+임베딩 차원 · 저장 정밀도 설정과 인덱스 메타데이터
+
+- 차원: text-embedding-3 계열의 dimensions 파라미터 (전체 벡터의 앞부분을 잘라 재정규화한 것과 같음)
+- 정밀도: float32(IndexFlatL2) / float16 · int8 (FAISS 스칼라 양자화, IndexScalarQuantizer)
+- 구축 시 FAISS 디렉토리의 embedding_meta.json에 모델 · 차원 · 정밀도를 기록하고,
+  검색 · 도메인 분류의 질의 임베딩은 설정값이 아니라 이 기록을 따라 인덱스와 맞춤
+
+    python -m rag.embedding_index --dimensions 512 --precision int8     # 기존 인덱스를 API 호출 없이 변환
+"""
+import json
+import argparse
+from pathlib import Path
+import numpy as np
+import faiss
+from langchain_openai import OpenAIEmbeddings
+from rag.config import Config
+from utils.llm_call import CachedEmbeddings
+from utils.rate_limiter import RateLimitedEmbeddings
+
+
+META_FILE = "embedding_meta.json"
+
+# 저장 정밀도 → FAISS 스칼라 양자화 방식 (float32는 양자화 없음)
+PRECISIONS = {
+    "float32": None,
+    "float16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+NATIVE_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+
+def index_meta(model: str = None, dimensions: int = None, precision: str = None) -> dict:
+    """설정값(기본값: Config)으로 인덱스 메타데이터 구성"""
+    model = model or Config.EMBEDDING_MODEL
+    precision = precision or Config.EMBEDDING_PRECISION
+    if precision not in PRECISIONS:
+        raise ValueError(f"지원하지 않는 저장 정밀도입니다: {precision} ({', '.join(PRECISIONS)})")
+    dimensions = dimensions or Config.EMBEDDING_DIMENSIONS or NATIVE_DIMENSIONS.get(model)
+    native = NATIVE_DIMENSIONS.get(model)
+    if native and dimensions > native:
+        raise ValueError(f"{model}의 최대 차원은 {native}입니다: {dimensions}")
+    return {"model": model, "dimensions": dimensions, "precision": precision}
+
+
+def save_index_meta(db_path, meta: dict) -> Path:
+    path = Path(db_path) / META_FILE
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_index_meta(db_path, index=None) -> dict:
+    """
+    인덱스 메타데이터 (메타데이터 파일이 없는 기존 인덱스는 전체 차원 float32로 간주,
+    FAISS 인덱스가 주어지면 실제 차원 · 양자화 방식에서 추정)
+    """
+    path = Path(db_path) / META_FILE
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    model = Config.EMBEDDING_MODEL
+    if index is None:
+        return {"model": model, "dimensions": NATIVE_DIMENSIONS.get(model), "precision": "float32"}
+    precision = "float32"
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        precision = next((name for name, qtype in PRECISIONS.items() if qtype == index.sq.qtype), "float32")
+    return {"model": model, "dimensions": index.d, "precision": precision}
+
+
+def make_embeddings(meta: dict) -> RateLimitedEmbeddings:
+    """메타데이터의 모델 · 차원으로 임베딩 생성 (기본 차원이면 dimensions 생략)"""
+    kwargs = {}
+    if meta["dimensions"] and meta["dimensions"] != NATIVE_DIMENSIONS.get(meta["model"]):
+        kwargs["dimensions"] = meta["dimensions"]
+    return RateLimitedEmbeddings(OpenAIEmbeddings(model=meta["model"], max_retries=0, **kwargs))
+
+
+def query_embeddings(meta: dict, stage: str) -> CachedEmbeddings:
+    return CachedEmbeddings(make_embeddings(meta), stage=stage)
+
+
+def check_index(vector_store, meta: dict):
+    """인덱스 벡터 차원이 메타데이터와 다르면 질의 임베딩과 맞지 않으므로 로드 중단"""
+    if vector_store.index.d != meta["dimensions"]:
+        raise ValueError(
+            f"FAISS 인덱스 차원({vector_store.index.d})이 메타데이터({meta['dimensions']})와 다릅니다. "
+            "인덱스를 다시 구축하세요."
+        )
+    requested = (Config.EMBEDDING_DIMENSIONS, Config.EMBEDDING_PRECISION)
+    if requested != (meta["dimensions"], meta["precision"]):
+        print(
+            f"⚠️ 인덱스는 {meta['dimensions']}차원 {meta['precision']}로 구축되어 있어 "
+            f"설정({requested[0]}차원 {requested[1]}) 대신 인덱스 설정으로 검색합니다."
+        )
+
+
+def truncate(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """앞 dimensions개 성분만 남기고 재정규화 (text-embedding-3의 dimensions 파라미터와 동일한 결과)"""
+    vectors = np.ascontiguousarray(vectors[:, :dimensions], dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def build_index(vectors: np.ndarray, precision: str):
+    """저장 정밀도에 맞는 L2 인덱스 구축 (LangChain FAISS 기본 거리와 동일)"""
+    dimensions = vectors.shape[1]
+    if PRECISIONS[precision] is None:
+        index = faiss.IndexFlatL2(dimensions)
+    else:
+        index = faiss.IndexScalarQuantizer(dimensions, PRECISIONS[precision], faiss.METRIC_L2)
+        index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def quantize(vector_store, precision: str):
+    """FAISS 저장소의 인덱스를 저장 정밀도에 맞게 교체 (벡터 순서 유지)"""
+    if PRECISIONS[precision] is None:
+        return vector_store
+    vectors = vector_store.index.reconstruct_n(0, vector_store.index.ntotal)
+    vector_store.index = build_index(vectors, precision)
+    return vector_store
+
+
+def index_bytes(index) -> int:
+    """직렬화한 인덱스 크기 (메모리 상주 크기와 거의 같음)"""
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def main():
+    """기존 인덱스를 차원 축소 · 양자화 (저장된 벡터를 잘라 쓰므로 API 호출 없음)"""
+    from rag.retriever import load_indexes
+
+    parser = argparse.ArgumentParser(description="FAISS 인덱스 차원 · 저장 정밀도 변환")
+    parser.add_argument("--dimensions", type=int, default=Config.EMBEDDING_DIMENSIONS)
+    parser.add_argument("--precision", choices=list(PRECISIONS), default=Config.EMBEDDING_PRECISION)
+    args = parser.parse_args()
+
+    vector_store, _ = load_indexes()
+    current = load_index_meta(Config.FAISS_DB, vector_store.index)
+    if current["precision"] != "float32" and args.dimensions != current["dimensions"]:
+        raise ValueError("양자화된 인덱스의 차원은 바꿀 수 없습니다. float32 인덱스에서 변환하거나 다시 구축하세요.")
+    if args.dimensions > current["dimensions"]:
+        raise ValueError(f"현재 인덱스({current['dimensions']}차원)보다 큰 차원으로는 변환할 수 없습니다.")
+
+    meta = index_meta(current["model"], args.dimensions, args.precision)
+    before = index_bytes(vector_store.index)
+    vectors = vector_store.index.reconstruct_n(0, vector_store.index.ntotal)
+    vector_store.index = build_index(truncate(vectors, meta["dimensions"]), meta["precision"])
+    vector_store.save_local(str(Config.FAISS_DB))
+    save_index_meta(Config.FAISS_DB, meta)
+
+    # 도메인 중심 벡터도 같은 차원으로 다시 계산
+    from system_orchestration.centroid_classifier import CentroidDomainClassifier
+    CentroidDomainClassifier.fit_from_vector_store(vector_store).save(Config.FAISS_DB)
+
+    print(
+        f"✅ {current['dimensions']}차원 {current['precision']} → {meta['dimensions']}차원 {meta['precision']} "
+        f"({before / 1e6:.1f}MB → {index_bytes(vector_store.index) / 1e6:.1f}MB)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+# rag/eval_retrieval.py
+"""
+하이브리드 검색 평가 · 파라미터 탐색 (k, 가중치, 결합 방식)
+
+    python -m rag.eval_retrieval --queries 300                          # 기존 인덱스 사용
+    python -m rag.eval_retrieval --synthetic 200 --fake-embeddings      # 합성 코퍼스 · 대역 임베딩 (API 호출 없음)
+
+평가 세트 (정답: 원래 설문지 file_name)
+- title   : 설문지 제목(파일명)
+- question: 설문 문항 한 줄 (평가 인덱스에서는 해당 줄을 제거한 held-out 질의)
+- multi   : 같은 설문지의 문항 여러 줄을 이은 질의 (측정 변수가 많은 요청에 대응, 역시 held-out)
+문항 줄을 제거한 청크만 다시 임베딩하고, 나머지는 기존 FAISS 벡터를 그대로 사용
+
+설정별로 recall(정답 설문지가 컨텍스트에 포함), MRR, 검색 지연 p50/p95, 컨텍스트 토큰 수를 측정하고
+최고 재현율 - tolerance 이상인 설정 중 컨텍스트 토큰 · 지연이 가장 적은 설정을 골라
+검색 파라미터 표(Config.RAG_PARAMS_PATH)로 저장 → SurveyOrchestration.adjust_rag_params 가 로드
+"""
+import re
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+from collections import defaultdict
+from functools import lru_cache
+import numpy as np
+from langchain_core.documents import Document
+from langchain_community.vectorstores import FAISS
+from langchain_community.retrievers import BM25Retriever
+from rag.config import Config
+from rag.rag_module import SurveyRAG
+from rag.retriever import load_indexes, FUSION_METHODS
+from rag.embedding_index import load_index_meta, query_embeddings
+from utils.rate_limiter import count_tokens
+from utils.tokenizer import get_tokenizer
+
+
+QUESTION_LINE = re.compile(r"^\s*(?:SQ|Q|문)?\s*\d{1,2}\s*[.)]\s*(\S.{10,})$", re.MULTILINE)
+
+RRF_C = 60                  # EnsembleRetriever 기본 상수
+MULTI_LINES = 6             # multi 질의에 이어 붙이는 문항 수 (측정 변수 6개 이상 규칙과 대응)
+MAX_HELD_OUT = 8            # 설문지당 제거하는 문항 줄 수 상한
+QUESTION_TIERS = (30, 50, 70, 100)
+QUESTION_COVERAGE = 0.5     # 요청 문항 수 대비 컨텍스트에 포함되길 기대하는 참조 문항 비율
+
+
+# === 평가 세트 ===
+def build_eval_set(docs: list[Document], n_questions: int, n_multi: int, seed: int = 0):
+    """
+    (평가용 청크 목록, 질의 목록, 내용이 바뀐 청크 인덱스) 반환
+    질의: {"query", "relevant", "kind"}
+    """
+    rng = random.Random(seed)
+    lines_by_file = defaultdict(list)
+    for doc in docs:
+        for match in QUESTION_LINE.finditer(doc.page_content):
+            line = match.group(1).strip()
+            if line not in lines_by_file[doc.metadata["file_name"]]:
+                lines_by_file[doc.metadata["file_name"]].append(line)
+
+    files = sorted(lines_by_file)
+    queries = [
+        {"query": file_name.replace("_", " "), "relevant": file_name, "kind": "title"}
+        for file_name in sorted({doc.metadata["file_name"] for doc in docs})
+    ]
+
+    held_out = defaultdict(set)
+    budget = {file_name: MAX_HELD_OUT for file_name in files}
+
+    multi_files = [f for f in files if len(lines_by_file[f]) >= MULTI_LINES * 2]
+    for file_name in rng.sample(multi_files, min(n_multi, len(multi_files))):
+        lines = rng.sample(lines_by_file[file_name], MULTI_LINES)
+        held_out[file_name].update(lines)
+        budget[file_name] -= MULTI_LINES
+        queries.append({"query": " ".join(lines), "relevant": file_name, "kind": "multi"})
+
+    candidates = [(line, f) for f in files for line in lines_by_file[f] if line not in held_out[f]]
+    rng.shuffle(candidates)
+    for line, file_name in candidates:
+        if sum(q["kind"] == "question" for q in queries) >= n_questions:
+            break
+        if budget[file_name] <= 0:
+            continue
+        budget[file_name] -= 1
+        held_out[file_name].add(line)
+        queries.append({"query": line, "relevant": file_name, "kind": "question"})
+
+    eval_docs, changed = [], []
+    for i, doc in enumerate(docs):
+        text = doc.page_content
+        for line in held_out.get(doc.metadata["file_name"], ()):
+            text = text.replace(line, "")
+        if text != doc.page_content:
+            changed.append(i)
+        eval_docs.append(Document(page_content=text, metadata={**doc.metadata, "chunk_id": i}))
+    return eval_docs, queries, changed
+
+
+def build_eval_indexes(docs: list[Document], vectors, changed: list[int], embeddings, tokenizer: str = None):
+    """평가용 FAISS · BM25 (vectors가 없으면 전체 임베딩, 있으면 바뀐 청크만 다시 임베딩)"""
+    texts = [doc.page_content for doc in docs]
+    if vectors is None:
+        vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    elif changed:
+        vectors = np.array(vectors, dtype=np.float32)
+        vectors[changed] = embeddings.embed_documents([texts[i] for i in changed])
+
+    store = FAISS.from_embeddings(
+        list(zip(texts, vectors.tolist())), embeddings, metadatas=[doc.metadata for doc in docs]
+    )
+    bm25 = BM25Retriever.from_documents(docs, preprocess_func=get_tokenizer(tokenizer))
+    return store, bm25
+
+
+def load_source():
+    """기존 인덱스의 청크와 벡터 (FAISS 저장 순서)"""
+    store, _ = load_indexes()
+    vectors = store.index.reconstruct_n(0, store.index.ntotal)
+    docs = [store.docstore.search(store.index_to_docstore_id[i]) for i in range(store.index.ntotal)]
+    return docs, vectors
+
+
+# === 검색 · 결합 ===
+def retrieve_candidates(store, bm25, queries: list[dict], depth: int) -> list[dict]:
+    """질의마다 BM25 · FAISS 상위 depth개 청크 id와 각 검색 시간(초)"""
+    bm25 = bm25.model_copy(update={"k": depth})
+    runs = []
+    for q in queries:
+        start = time.perf_counter()
+        sparse = [doc.metadata["chunk_id"] for doc in bm25.invoke(q["query"])]
+        sparse_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        dense = [doc.metadata["chunk_id"] for doc in store.similarity_search(q["query"], k=depth)]
+        dense_time = time.perf_counter() - start
+        runs.append({"sparse": sparse, "dense": dense, "sparse_time": sparse_time, "dense_time": dense_time})
+    return runs
+
+
+def fuse(run: dict, fusion: str, sparse_weight: float, k: int) -> list[int]:
+    """SurveyRetriever와 같은 방식으로 결합한 청크 id 목록 (rrf는 EnsembleRetriever의 가중 RRF와 동일)"""
+    if fusion == "sparse":
+        return run["sparse"][:k]
+    if fusion == "dense":
+        return run["dense"][:k]
+
+    lists = [(run["sparse"][:k], sparse_weight), (run["dense"][:k], 1 - sparse_weight)]
+    scores = defaultdict(float)
+    for ids, weight in lists:
+        for rank, chunk_id in enumerate(ids, start=1):
+            scores[chunk_id] += weight / (rank + RRF_C)
+    ordered = list(dict.fromkeys(run["sparse"][:k] + run["dense"][:k]))
+    return sorted(ordered, key=lambda chunk_id: scores[chunk_id], reverse=True)
+
+
+def search_time(run: dict, fusion: str) -> float:
+    """설정의 검색 지연 (앙상블은 두 검색기를 순서대로 호출)"""
+    if fusion == "sparse":
+        return run["sparse_time"]
+    if fusion == "dense":
+        return run["dense_time"]
+    return run["sparse_time"] + run["dense_time"]
+
+
+# === 평가 ===
+def sweep_configs(ks, weights) -> list[dict]:
+    configs = []
+    for fusion in FUSION_METHODS:
+        for k in ks:
+            if fusion == "rrf":
+                configs += [{"fusion": "rrf", "sparse_weight": w, "dense_weight": round(1 - w, 3), "k": k} for w in weights]
+            else:
+                sparse = 1.0 if fusion == "sparse" else 0.0
+                configs.append({"fusion": fusion, "sparse_weight": sparse, "dense_weight": 1 - sparse, "k": k})
+    return configs
+
+
+class Evaluator:
+    def __init__(self, docs: list[Document], queries: list[dict], runs: list[dict]):
+        self.docs = docs
+        self.queries = queries
+        self.runs = runs
+        self.question_counts = [len(QUESTION_LINE.findall(doc.page_content)) for doc in docs]
+        self.context_tokens = lru_cache(maxsize=None)(self._context_tokens)
+
+    def _context_tokens(self, chunk_ids: tuple) -> int:
+        context = SurveyRAG.format_docs([self.docs[i] for i in chunk_ids])
+        return count_tokens(Config.MODEL_NAME, context)
+
+    def evaluate(self, config: dict, kinds=None) -> dict:
+        hits, reciprocal_ranks, times, tokens, num_docs, questions = [], [], [], [], [], []
+        for q, run in zip(self.queries, self.runs):
+            if kinds and q["kind"] not in kinds:
+                continue
+            ids = fuse(run, config["fusion"], config["sparse_weight"], config["k"])
+            files = [self.docs[i].metadata["file_name"] for i in ids]
+            rank = files.index(q["relevant"]) + 1 if q["relevant"] in files else None
+
+            hits.append(rank is not None)
+            reciprocal_ranks.append(1 / rank if rank else 0.0)
+            times.append(search_time(run, config["fusion"]) * 1000)
+            tokens.append(self.context_tokens(tuple(ids)))
+            num_docs.append(len(ids))
+            questions.append(sum(self.question_counts[i] for i in ids))
+
+        if not hits:
+            return {**config, "queries": 0}
+        return {
+            **config,
+            "queries": len(hits),
+            "recall": float(np.mean(hits)),
+            "mrr": float(np.mean(reciprocal_ranks)),
+            "latency_p50_ms": float(np.percentile(times, 50)),
+            "latency_p95_ms": float(np.percentile(times, 95)),
+            "context_tokens": float(np.mean(tokens)),
+            "docs": float(np.mean(num_docs)),
+            "reference_questions": float(np.mean(questions)),
+        }
+
+
+def select(results: list[dict], tolerance: float) -> dict:
+    """최고 재현율 - tolerance 이상인 설정 중 컨텍스트 토큰 → 지연 → MRR 순으로 가장 저렴한 설정"""
+    results = [r for r in results if r["queries"]]
+    best = max(r["recall"] for r in results)
+    eligible = [r for r in results if r["recall"] >= best - tolerance]
+    return min(eligible, key=lambda r: (r["context_tokens"], r["latency_p50_ms"], -r["mrr"]))
+
+
+PARAM_KEYS = ("fusion", "sparse_weight", "dense_weight", "k")
+
+
+def build_param_table(evaluator: Evaluator, configs: list[dict], ks, tolerance: float) -> tuple[dict, dict]:
+    """(검색 파라미터 표, 평가 결과) 반환"""
+    results = {kind: [evaluator.evaluate(c, kinds) for c in configs]
+               for kind, kinds in (("all", None), ("multi", {"multi"}))}
+
+    chosen = select(results["all"], tolerance)
+    default = {key: chosen[key] for key in PARAM_KEYS}
+    rules = []
+
+    # 측정 변수가 많은 요청 (multi 질의) → 결합 방식 · 가중치만 조정
+    if any(r["queries"] for r in results["multi"]):
+        multi = select(results["multi"], tolerance)
+        update = {key: multi[key] for key in ("fusion", "sparse_weight", "dense_weight") if multi[key] != default[key]}
+        if update:
+            rules.append({"min_variables": MULTI_LINES, **update})
+
+    # 요청 문항 수가 많으면 참조 문항이 충분히 들어오도록 k 확대
+    last_k = default["k"]
+    for tier in QUESTION_TIERS:
+        for k in sorted(ks):
+            if k <= last_k:
+                continue
+            current = evaluator.evaluate({**default, "k": last_k})
+            if current["reference_questions"] >= tier * QUESTION_COVERAGE:
+                break
+            candidate = evaluator.evaluate({**default, "k": k})
+            if candidate["reference_questions"] >= tier * QUESTION_COVERAGE or k == max(ks):
+                rules.append({"min_questions": tier, "k": k})
+                last_k = k
+                break
+
+    table = {"default": default, "rules": rules}
+    return table, {"selected": chosen, "results": results}
+
+
+def format_row(r: dict) -> str:
+    weights = f"{r['sparse_weight']:.1f}/{r['dense_weight']:.1f}" if r["fusion"] == "rrf" else "-"
+    return (
+        f"  {r['fusion']:>6} {weights:>7} k={r['k']:<2} | recall {r['recall']:.3f} | MRR {r['mrr']:.3f} | "
+        f"p50 {r['latency_p50_ms']:7.1f}ms p95 {r['latency_p95_ms']:7.1f}ms | "
+        f"컨텍스트 {r['context_tokens']:7.0f} 토큰 (문서 {r['docs']:.1f}개)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="하이브리드 검색 평가 · 파라미터 탐색")
+    parser.add_argument("--queries", type=int, default=300, help="문항 질의 수")
+    parser.add_argument("--multi", type=int, default=100, help="여러 문항을 이은 질의 수")
+    parser.add_argument("--ks", nargs="+", type=int, default=[1, 2, 3, 5])
+    parser.add_argument("--weights", nargs="+", type=float, default=[0.1, 0.2, 0.3, 0.4, 0.5], help="rrf의 BM25 가중치")
+    parser.add_argument("--tolerance", type=float, default=0.02, help="최고 재현율 대비 허용 감소폭")
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 코퍼스 설문 수 (0이면 기존 인덱스 사용)")
+    parser.add_argument("--fake-embeddings", action="store_true", help="해시 기반 대역 임베딩 사용 (전체 재임베딩)")
+    parser.add_argument("--tokenizer", default=None, help="BM25 토크나이저 (기본값: Config.TOKENIZER)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=str(Config.RAG_PARAMS_PATH), help="검색 파라미터 표 저장 경로")
+    parser.add_argument("--report", default=None, help="설정별 전체 결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        from benchmark.corpus import synthetic_documents
+        docs, vectors = synthetic_documents(args.synthetic, seed=args.seed), None
+    else:
+        docs, vectors = load_source()
+
+    if args.fake_embeddings:
+        from benchmark.fakes import FakeEmbeddings
+        embeddings = FakeEmbeddings()
+        vectors = None
+    else:
+        # 기존 벡터와 섞이므로 인덱스와 같은 모델 · 차원으로 다시 임베딩
+        embeddings = query_embeddings(load_index_meta(Config.FAISS_DB), stage="eval_retrieval")
+
+    eval_docs, queries, changed = build_eval_set(docs, args.queries, args.multi, args.seed)
+    kinds = defaultdict(int)
+    for q in queries:
+        kinds[q["kind"]] += 1
+    print(f"청크 {len(eval_docs)}개 (재임베딩 {len(changed) if vectors is not None else len(eval_docs)}개), "
+          f"질의 {len(queries)}개 ({', '.join(f'{k} {n}' for k, n in kinds.items())})")
+
+    store, bm25 = build_eval_indexes(eval_docs, vectors, changed, embeddings, args.tokenizer)
+    runs = retrieve_candidates(store, bm25, queries, max(args.ks))
+    evaluator = Evaluator(eval_docs, queries, runs)
+
+    configs = sweep_configs(args.ks, args.weights)
+    table, report = build_param_table(evaluator, configs, args.ks, args.tolerance)
+
+    print("\n설정별 결과 (전체 질의, 재현율 순)")
+    for r in sorted(report["results"]["all"], key=lambda r: (-r["recall"], r["context_tokens"])):
+        print(format_row(r))
+    print("\n선택된 기본 설정")
+    print(format_row(report["selected"]))
+    for rule in table["rules"]:
+        print(f"  규칙: {rule}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    table["evaluation"] = {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "chunks": len(eval_docs),
+        "queries": dict(kinds),
+        "tolerance": args.tolerance,
+        "selected": report["selected"],
+    }
+    output.write_text(json.dumps(table, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n검색 파라미터 표 저장: {output}")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
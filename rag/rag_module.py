@@ -1,9 +1,10 @@
 # rag/rag_module.py
 from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain_core.runnables import RunnablePassthrough
-from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from utils.llm_call import invoke_chat
+from utils.tracing import span
 from rag.retriever import SurveyRetriever
+from rag.summarizer import load_summary_store
 from rag.config import Config
 
 
@@ -11,17 +12,24 @@ from rag.config import Config
 class SurveyRAG:
     """RAG 기반 설문 검색 및 응답 생성 엔진"""
 
-    def __init__(self, model_name, sparse_weight=0.3, dense_weight=0.7, k=1):
+    def __init__(self, model_name, sparse_weight=0.3, dense_weight=0.7, k=1, fusion="rrf"):
         
         
-        self.model = ChatOpenAI(model = model_name)
+        self.model = ChatOpenAI(model = model_name, max_retries=0)
         
-        self.retriever = SurveyRetriever(sparse_weight=sparse_weight, dense_weight=dense_weight, k=k).get_retriever()
+        self.retriever = SurveyRetriever(
+            sparse_weight=sparse_weight, dense_weight=dense_weight, k=k, fusion=fusion
+        ).get_retriever()
+
+        # 인덱스 구축 시 생성한 설문지별 요약 (있으면 요청마다 LLM으로 요약하지 않음)
+        self.summaries = load_summary_store()
 
         # RAG Prompt Template
-        self.prompt = PromptTemplate.from_template("""
+        # 프롬프트 캐싱을 위해 고정 지침/예시(system)를 앞에, 검색 결과/질문(human)을 뒤에 배치
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", """
         너는 전문 설문조사 기획자야.  
-        아래에는 검색된 설문 문서와 그 메타데이터가 주어져 있어.  
+        검색된 설문 문서와 그 메타데이터가 주어질 거야.  
         각 문서는 설문 도메인의 정보를 포함하며, 내용에는 문항, 보기, 조사 개요 등이 포함되어 있어.
         검색된 설문 문서를 참고하여 사용자의 요청과 관련된
         실제 설문 문항(인구통계학적 특성 : SQ1 ~ SQn(다른 이름 일 수도 있음), 본 문항 : Q1~Qn) 을 중심으로 정리해줘.
@@ -51,18 +59,21 @@ class SurveyRAG:
         ③ 보통이다
         ④ 만족
         ⑤ 매우만족
+        """),
+            ("human", """
+        # 검색된 문서 및 메타데이터:
+        {context}
 
         # 질문:
         {question}
 
-        # 검색된 문서 및 메타데이터:
-        {context}
-
         # 답변:
-        """)
+        """),
+        ])
 
 
-    def format_docs(self, docs):
+    @staticmethod
+    def format_docs(docs):
         """검색된 문서를 텍스트로 결합 (메타데이터 포함)"""
         formatted = []
         for doc in docs:
@@ -73,15 +84,29 @@ class SurveyRAG:
             )
         return "\n---\n".join(formatted)
 
-    def __call__(self, query: str) -> str:
-        """RAG 파이프라인 실행"""
-        chain = (
-            {"context": self.retriever | self.format_docs, "question": RunnablePassthrough()}
-            | self.prompt
-            | self.model
-            | StrOutputParser()
-        )
-        return chain.invoke(query)
+    def __call__(self, query: str, docs: list = None) -> str:
+        """
+        RAG 파이프라인 실행 (검색 → 저장된 설문지 요약으로 컨텍스트 구성, 요약이 없으면 프롬프트 구성 → LLM 요약)
+        docs: 이미 검색된 문서 (추측 검색 결과를 쓰는 경우 검색 생략)
+        """
+        with span("rag") as s:
+            with span("retrieval", speculative=docs is not None) as r:
+                if docs is None:
+                    docs = self.retriever.invoke(query)
+                r.set(
+                    doc_ids=[doc.metadata.get("file_name") for doc in docs],
+                    doc_chars=[len(doc.page_content) for doc in docs],
+                )
+
+            if self.summaries is not None:
+                context = self.summaries.build_context(docs, self.format_docs)
+                s.set(context_mode="digest", context_chars=len(context))
+                return context
+
+            context = self.format_docs(docs)
+            s.set(context_mode="llm", context_chars=len(context))
+            messages = self.prompt.format_messages(question=query, context=context)
+            return invoke_chat("rag", self.model, messages)
 
 
 
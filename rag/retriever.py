@@ -1,40 +1,120 @@
 # rag/retriever.py
 import os, pickle
+import json
+import threading
+from functools import lru_cache
 from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
 from langchain_community.retrievers import BM25Retriever
 from langchain.retrievers.ensemble import EnsembleRetriever
 from rag.config import Config
+from rag.embedding_index import load_index_meta, check_index, query_embeddings
+
+
+_load_lock = threading.Lock()
+
+# 검색 결과 결합 방식: rrf(가중 reciprocal rank, 앙상블) / dense(FAISS만) / sparse(BM25만, 임베딩 호출 없음)
+FUSION_METHODS = ("rrf", "dense", "sparse")
+
+RRF_C = 60      # EnsembleRetriever 기본 상수
+
+
+@lru_cache(maxsize=None)
+def _load_faiss_store() -> FAISS:
+    # 질의 임베딩은 인덱스 구축 시 기록된 모델 · 차원을 따름
+    meta = load_index_meta(Config.FAISS_DB)
+    store = FAISS.load_local(
+        folder_path=Config.FAISS_DB,
+        embeddings=query_embeddings(meta, stage="retriever"),
+        allow_dangerous_deserialization=True,
+    )
+    check_index(store, meta)
+    return store
+
+
+@lru_cache(maxsize=None)
+def _load_bm25() -> BM25Retriever:
+    bm25_path = os.path.join(Config.BM_DB, "bm25.pkl")
+    with open(bm25_path, "rb") as f:
+        return pickle.load(f)
+
+
+def load_indexes() -> tuple[FAISS, BM25Retriever]:
+    """FAISS · BM25 인덱스를 프로세스당 1회만 로드해 공유 (검색은 읽기 전용)"""
+    with _load_lock:
+        return _load_faiss_store(), _load_bm25()
+
+
+@lru_cache(maxsize=None)
+def load_rag_params() -> dict:
+    """검색 파라미터 표 (rag.eval_retrieval 결과 파일, 없으면 Config.DEFAULT_RAG_PARAMS)"""
+    if Config.RAG_PARAMS_PATH.exists():
+        with open(Config.RAG_PARAMS_PATH, encoding="utf-8") as f:
+            table = json.load(f)
+        return {"default": table["default"], "rules": table.get("rules", [])}
+    return Config.DEFAULT_RAG_PARAMS
+
+
+def max_rag_k() -> int:
+    """검색 파라미터 표에서 쓰일 수 있는 가장 큰 k (추측 검색 후보 깊이)"""
+    table = load_rag_params()
+    return max([table["default"]["k"]] + [rule["k"] for rule in table["rules"] if "k" in rule])
+
+
+def ranked_candidates(query: str, k: int, fusion: str = "rrf") -> tuple[list, list]:
+    """결합 전 BM25 · FAISS 상위 k개 문서 (결합 방식에서 쓰지 않는 쪽은 빈 목록)"""
+    faiss_store, bm25 = load_indexes()
+    sparse = bm25.model_copy(update={"k": k}).invoke(query) if fusion != "dense" else []
+    dense = faiss_store.similarity_search(query, k=k) if fusion != "sparse" else []
+    return sparse, dense
+
+
+def fuse_ranked(sparse: list, dense: list, fusion: str, sparse_weight: float, dense_weight: float, k: int) -> list:
+    """
+    더 깊게 검색해 둔 BM25 · FAISS 순위 목록을 SurveyRetriever(k)와 같은 결과로 결합
+    (각 목록 상위 k개만 사용, rrf는 EnsembleRetriever와 같이 page_content 기준 가중 RRF)
+    """
+    if fusion == "sparse":
+        return sparse[:k]
+    if fusion == "dense":
+        return dense[:k]
+
+    scores, docs = {}, {}
+    for ranked, weight in ((sparse[:k], sparse_weight), (dense[:k], dense_weight)):
+        for rank, doc in enumerate(ranked, start=1):
+            scores[doc.page_content] = scores.get(doc.page_content, 0.0) + weight / (rank + RRF_C)
+            docs.setdefault(doc.page_content, doc)
+    return sorted(docs.values(), key=lambda doc: scores[doc.page_content], reverse=True)
+
 
 class SurveyRetriever:
     """FAISS + BM25 앙상블 검색기"""
 
-    def __init__(self, sparse_weight=0.3, dense_weight=0.7, k=1):
-        self.embeddings = OpenAIEmbeddings(model=Config.EMBEDDING_MODEL)
+    def __init__(self, sparse_weight=0.3, dense_weight=0.7, k=1, fusion="rrf"):
+        if fusion not in FUSION_METHODS:
+            raise ValueError(f"지원하지 않는 결합 방식입니다: {fusion} ({', '.join(FUSION_METHODS)})")
 
-        # === FAISS ===
+        # === FAISS / BM25 (공유 인덱스) ===
         try:
-            self.faiss_store = FAISS.load_local(
-                folder_path=Config.FAISS_DB,
-                embeddings=self.embeddings,
-                allow_dangerous_deserialization=True,
-            )
+            self.faiss_store, bm25_base = load_indexes()
             faiss_retriever = self.faiss_store.as_retriever(search_kwargs={"k": k})
             
         except Exception as e:
-            raise RuntimeError(f"FAISS 로드 실패: {e}")
-        
-        # === BM25 ===
-        bm25_path = os.path.join(Config.BM_DB, "bm25.pkl")
-        with open(bm25_path, "rb") as f:
-            bm25_retriever: BM25Retriever = pickle.load(f)
-        bm25_retriever.k = k
+            raise RuntimeError(f"검색 인덱스 로드 실패: {e}")
+        self.embeddings = self.faiss_store.embedding_function
+
+        # 공유 인덱스는 그대로 두고 k만 다른 얕은 복사본 사용
+        bm25_retriever = bm25_base.model_copy(update={"k": k})
 
         # === Ensemble ===
-        self.retriever = EnsembleRetriever(
-            retrievers=[bm25_retriever, faiss_retriever],
-            weights=[sparse_weight, dense_weight],
-        )
+        if fusion == "dense":
+            self.retriever = faiss_retriever
+        elif fusion == "sparse":
+            self.retriever = bm25_retriever
+        else:
+            self.retriever = EnsembleRetriever(
+                retrievers=[bm25_retriever, faiss_retriever],
+                weights=[sparse_weight, dense_weight],
+            )
 
     def get_retriever(self):
         """앙상블 검색기 반환"""
@@ -0,0 +1,100 @@
+# rag/speculative.py
+"""
+추측 검색 (요구사항 분석과 참조 설문 검색을 겹쳐 실행)
+
+- 키워드 추출 직후, LLM 구조화가 진행되는 동안 요구사항 원문 + TF-IDF 키워드로
+  BM25 · FAISS 후보를 검색 파라미터 표의 최대 k까지 미리 검색 (백그라운드 스레드)
+- 구조화가 끝나면 구조화된 질의로 BM25만 다시 검색(임베딩 호출 없음)해
+  추측 후보와 겹치는 설문지 비율이 Config.SPECULATIVE_MIN_OVERLAP 이상이면 추측 후보를 그대로 사용
+- 겹침이 부족하면 구조화된 질의로 FAISS를 검색해 다시 검색한 BM25 결과와 결합 (일반 검색과 같은 결과)
+"""
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from rag.config import Config
+from rag.retriever import load_indexes, max_rag_k, ranked_candidates, fuse_ranked
+from utils.tracing import span
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=Config.SPECULATIVE_WORKERS, thread_name_prefix="autosurvey-speculative")
+        return _executor
+
+
+def file_overlap(candidates: list, reference: list) -> float:
+    """reference의 설문지 중 candidates에도 있는 설문지 비율"""
+    reference_files = {doc.metadata.get("file_name") for doc in reference}
+    if not reference_files:
+        return 1.0
+    candidate_files = {doc.metadata.get("file_name") for doc in candidates}
+    return len(reference_files & candidate_files) / len(reference_files)
+
+
+class SpeculativeRetrieval:
+    """요구사항 원문으로 시작한 추측 검색 (생성 즉시 백그라운드에서 검색)"""
+
+    def __init__(self, text: str, keywords: list = None, depth: int = None):
+        self.query = " ".join([text.strip(), *(keywords or [])])
+        self.depth = depth or max_rag_k()
+        self.overlap = None     # 마지막 resolve의 겹침 비율
+        self.reused = None      # 마지막 resolve에서 추측 후보를 사용했는지 여부
+        # 요청 트레이스가 먼저 끝날 수 있으므로 별도 트레이스로 기록
+        self.future = _get_executor().submit(contextvars.Context().run, self._search)
+
+    def _search(self) -> tuple[list, list]:
+        with span("speculative_search", depth=self.depth) as s:
+            sparse, dense = ranked_candidates(self.query, self.depth)
+            s.set(doc_ids=list(dict.fromkeys(doc.metadata.get("file_name") for doc in sparse + dense)))
+        return sparse, dense
+
+    def resolve(self, query: str, params: dict) -> list | None:
+        """
+        구조화된 질의 · 검색 파라미터에 맞는 검색 결과
+        추측 검색이 실패했거나 k가 미리 검색한 깊이보다 크면 None (일반 검색 사용)
+        """
+        fusion, k = params.get("fusion", "rrf"), params["k"]
+        if k > self.depth:
+            return None
+        try:
+            spec_sparse, spec_dense = self.future.result()
+        except Exception as e:
+            print(f"⚠️ 추측 검색 실패, 일반 검색으로 진행: {type(e).__name__}: {e}")
+            return None
+
+        with span("speculative_resolve", fusion=fusion, k=k) as s:
+            quick, _ = ranked_candidates(query, k, fusion="sparse")
+            if fusion == "sparse":
+                # BM25만 쓰는 설정은 재검색 결과가 곧 최종 결과
+                self.overlap, self.reused = None, False
+                return quick
+
+            candidates = fuse_ranked(spec_sparse, spec_dense, fusion, params["sparse_weight"], params["dense_weight"], k)
+            self.overlap = file_overlap(candidates, quick)
+            self.reused = self.overlap >= Config.SPECULATIVE_MIN_OVERLAP
+            s.set(overlap=round(self.overlap, 3), reused=self.reused)
+            if self.reused:
+                return candidates
+
+            faiss_store, _ = load_indexes()
+            dense = faiss_store.similarity_search(query, k=k)
+            return fuse_ranked(quick, dense, fusion, params["sparse_weight"], params["dense_weight"], k)
+
+
+def analyze_with_speculation(analyzer, text: str) -> tuple[dict, SpeculativeRetrieval | None]:
+    """
+    요구사항 분석 + 추측 검색 (키워드 추출 직후 검색을 시작해 LLM 구조화와 겹침)
+    비활성화(AUTOSURVEY_SPECULATIVE_RETRIEVAL=off)되었거나 키워드가 없으면 추측 검색은 None
+    """
+    if Config.SPECULATIVE_RETRIEVAL != "on":
+        return analyzer(text), None
+
+    started = []
+    user_input = analyzer(text, on_keywords=lambda keywords: started.append(SpeculativeRetrieval(text, keywords)))
+    return user_input, (started[0] if started else None)
@@ -0,0 +1,278 @@
+# rag/summarizer.py
+"""
+참조 설문지 요약 (인덱스 구축 시 설문지별 1회)
+
+- 설문지마다 조사 개요(목적 · 구조 · 핵심 영역 · 응답 형식)와 대표 문항을 LLM으로 한 번 요약해
+  인덱스 옆(Config.SUMMARY_DB)에 저장, 원문 해시가 같으면 다시 요약하지 않음
+- 검색 시에는 검색된 청크의 설문지 요약을 이어 붙여 컨텍스트 구성 (LLM 호출 없음)
+
+    python -m rag.summarizer                 # 새로 추가되거나 바뀐 설문지만 요약
+    python -m rag.summarizer --force         # 전체 다시 요약
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+import argparse
+from pathlib import Path
+from typing import List
+from collections import Counter
+from pydantic import BaseModel, Field
+from langchain_openai import ChatOpenAI
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.exceptions import OutputParserException
+from rag.config import Config
+from rag.chunk_store import ChunkStore
+from utils.llm_call import ainvoke_chat, usage_report
+
+
+class SurveyDigest(BaseModel):
+    """설문지 한 부의 요약"""
+    purpose: str = Field(description="이 설문이 수행된 목적")
+    structure: str = Field(description="조사 영역 또는 문항 구분 (예: 응답자 특성 SQ1~SQ4, 본 문항 Q1~Q20)")
+    key_domains: List[str] = Field(description="주요 문항 영역")
+    extra_domains: List[str] = Field(default_factory=list, description="추가 영역 (없으면 빈 목록)")
+    response_formats: List[str] = Field(description="응답 형식 (척도형, 객관식, 복수응답 등)")
+    questions: List[str] = Field(
+        description="대표 문항: 문항 번호 · 문항 · 보기를 원문 그대로 (문항 하나당 항목 하나, 보기는 줄바꿈으로 구분)"
+    )
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def surveys_of(chunks) -> list[tuple[dict, str]]:
+    """청크 목록(또는 청크 저장소)을 설문지별 (메타데이터, 원문)으로 묶음"""
+    store = chunks if isinstance(chunks, ChunkStore) else ChunkStore.build(chunks)
+    return list(store.documents())
+
+
+def render_digest(file_name: str, domain: str, digest: dict) -> str:
+    """저장된 요약을 참조 설문 컨텍스트 형식으로 변환"""
+    lines = [
+        f"[도메인: {domain}] 참조 설문지: {file_name}",
+        "조사 개요 요약",
+        f"- 목적: {digest['purpose']}",
+        f"- 구조: {digest['structure']}",
+        f"- 핵심 영역: {', '.join(digest['key_domains'])}",
+    ]
+    if digest.get("extra_domains"):
+        lines.append(f"- 추가 영역: {', '.join(digest['extra_domains'])}")
+    lines += [
+        f"- 응답 형식: {', '.join(digest['response_formats'])}",
+        "",
+        "핵심 문항 및 보기 예시",
+        "\n\n".join(q.strip() for q in digest["questions"]),
+    ]
+    return "\n".join(lines)
+
+
+class SummaryStore:
+    """file_name → {hash, model, domain, digest, created_at} (JSON 파일 하나)"""
+
+    FILE_NAME = "survey_summaries.json"
+
+    def __init__(self, dir_path=None):
+        self.path = Path(dir_path or Config.SUMMARY_DB) / self.FILE_NAME
+        self.entries = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, file_name: str) -> dict | None:
+        return self.entries.get(file_name)
+
+    def put(self, file_name: str, entry: dict):
+        self.entries[file_name] = entry
+
+    def is_current(self, file_name: str, digest_hash: str, model: str) -> bool:
+        entry = self.entries.get(file_name)
+        return entry is not None and entry["hash"] == digest_hash and entry["model"] == model
+
+    def prune(self, file_names: set[str]) -> int:
+        """코퍼스에서 빠진 설문지의 요약 삭제"""
+        removed = [name for name in self.entries if name not in file_names]
+        for name in removed:
+            del self.entries[name]
+        return len(removed)
+
+    def save(self):
+        """임시 파일에 쓴 뒤 교체 (요약 중 중단되어도 기존 파일 보존)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+        reset_summary_store()
+
+    def build_context(self, docs, format_chunks) -> str:
+        """
+        검색된 청크 → 설문지별 요약을 검색 순위대로 결합 (LLM 호출 없음)
+        요약이 없는 설문지(새로 추가된 뒤 아직 요약하지 않은 경우)는 검색된 청크를 format_chunks로 변환
+        """
+        if not docs:
+            return "관련 설문지가 없습니다."
+
+        order, chunks = [], {}
+        for doc in docs:
+            name = doc.metadata.get("file_name")
+            if name not in chunks:
+                order.append(name)
+                chunks[name] = []
+            chunks[name].append(doc)
+
+        parts = []
+        for name in order:
+            entry = self.get(name)
+            if entry is not None:
+                parts.append(render_digest(name, entry["domain"], entry["digest"]))
+            else:
+                parts.append(format_chunks(chunks[name]))
+        return "\n---\n".join(parts)
+
+
+_summary_store = None
+_summary_store_lock = threading.Lock()
+
+
+def load_summary_store() -> SummaryStore | None:
+    """
+    검색 시 사용하는 요약 저장소 (요약이 없거나 llm 모드면 None)
+    요약이 있을 때만 프로세스 공용으로 보관 (없으면 다음 호출에서 다시 확인해 나중에 요약한 내용도 사용)
+    """
+    global _summary_store
+    if Config.RAG_CONTEXT == "llm":
+        return None
+    with _summary_store_lock:
+        if _summary_store is None:
+            store = SummaryStore()
+            _summary_store = store if len(store) else None
+        return _summary_store
+
+
+def reset_summary_store():
+    """요약 저장 후 다음 검색에서 다시 불러오도록 공용 저장소 초기화"""
+    global _summary_store
+    with _summary_store_lock:
+        _summary_store = None
+
+
+class SurveySummarizer:
+    """설문지별 요약 생성 (동시 요청 수 제한)"""
+
+    def __init__(self, model_name: str = None, concurrency: int = None):
+        self.model_name = model_name or Config.SUMMARY_MODEL
+        self.concurrency = concurrency or Config.SUMMARY_CONCURRENCY
+        self.llm = ChatOpenAI(model=self.model_name, temperature=0, max_retries=0)
+        self.parser = JsonOutputParser(pydantic_object=SurveyDigest)
+
+        # 프롬프트 캐싱을 위해 고정 지침/출력 형식(system)을 앞에, 설문지 원문(human)을 뒤에 배치
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", """
+            너는 전문 설문조사 기획자야.
+            설문지 원문 한 부가 주어지면, 다른 설문지를 설계할 때 참고할 수 있도록 조사 개요와 대표 문항을 정리해줘.
+
+            ## [정리 지침]
+            1. 목적 · 구조 · 핵심 영역 · 추가 영역 · 응답 형식을 원문에 근거해 간결하게 작성
+            2. 대표 문항은 인구통계 문항(SQ)과 본 문항(Q)을 모두 포함하되, 중복 문항은 제외하고 영역별로 골고루 10~15개 선택
+            3. 대표 문항은 문항 번호 · 문항 · 보기를 원문 그대로 옮김 (보기는 줄바꿈으로 구분)
+            4. 원문에 없는 내용은 만들지 않음
+
+            {format_instructions}
+            """),
+            ("human", """
+            ## [설문지 정보]
+            파일명: {file_name}
+            도메인: {domain}
+
+            ## [설문지 원문]
+            {text}
+            """),
+        ]).partial(format_instructions=self.parser.get_format_instructions())
+
+    async def asummarize(self, meta: dict, text: str) -> dict:
+        """설문지 한 부 요약 (응답 해석 실패 시 OutputParserException)"""
+        messages = self.prompt.format_messages(
+            file_name=meta.get("file_name", ""),
+            domain=meta.get("domain", ""),
+            text=text[:Config.SUMMARY_MAX_CHARS],
+        )
+        response = await ainvoke_chat("summarizer", self.llm, messages)
+        digest = self.parser.parse(response)
+        return SurveyDigest.model_validate(digest).model_dump()
+
+    async def arun(self, chunks, store: SummaryStore, force: bool = False) -> dict:
+        """새로 추가되거나 원문이 바뀐 설문지만 요약해 저장, 상태별 건수 반환"""
+        surveys = surveys_of(chunks)
+        removed = store.prune({meta["file_name"] for meta, _ in surveys})
+        pending = [
+            (meta, text, text_hash(text)) for meta, text in surveys
+            if force or not store.is_current(meta["file_name"], text_hash(text), self.model_name)
+        ]
+        print(f"설문지 {len(surveys)}개 중 요약 대상 {len(pending)}개 (삭제 {removed}개)")
+
+        stats = Counter(unchanged=len(surveys) - len(pending), removed=removed)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+
+        async def summarize(meta: dict, text: str, digest_hash: str):
+            try:
+                async with semaphore:
+                    digest = await self.asummarize(meta, text)
+            except (OutputParserException, ValueError) as e:
+                print(f"⚠️ {meta['file_name']} 요약 해석 실패: {e}")
+                stats["parse_error"] += 1
+                return
+            except Exception as e:
+                print(f"⚠️ {meta['file_name']} 요약 실패: {type(e).__name__}: {e}")
+                stats["error"] += 1
+                return
+            store.put(meta["file_name"], {
+                "hash": digest_hash,
+                "model": self.model_name,
+                "domain": meta.get("domain", ""),
+                "digest": digest,
+                "created_at": time.time(),
+            })
+            stats["summarized"] += 1
+            store.save()    # 완료될 때마다 저장 (중단 후 다시 실행하면 남은 설문지만 요약)
+
+        await asyncio.gather(*(summarize(*item) for item in pending))
+        store.save()
+
+        if pending:
+            elapsed = time.perf_counter() - start
+            print(f"요약 {stats['summarized']}건, {elapsed:.1f}초 | " +
+                  ", ".join(f"{status} {count}" for status, count in sorted(stats.items())))
+        return dict(stats)
+
+    def __call__(self, chunks, store: SummaryStore = None, force: bool = False) -> dict:
+        return asyncio.run(self.arun(chunks, SummaryStore() if store is None else store, force))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="참조 설문지 요약 생성")
+    parser.add_argument("--model", default=Config.SUMMARY_MODEL)
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="원문이 같아도 다시 요약")
+    args = parser.parse_args()
+
+    if (Config.CHUNK_DB / ChunkStore.META_FILE).exists():
+        chunks = ChunkStore.load(Config.CHUNK_DB)
+    else:
+        from rag.loader import SurveyLoader
+        chunks = SurveyLoader(Config.PDF_ROOT).load_all()
+
+    SurveySummarizer(args.model, args.concurrency)(chunks, force=args.force)
+    print(usage_report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# system_orchestration/batch_runner.py
+"""
+설문지 초안 일괄 생성 (비대화형)
+
+    python -m system_orchestration.batch_runner briefs.jsonl -o drafts.jsonl --concurrency generation=4
+
+- 입력: JSONL({"id", "text"} 요구사항 원문 또는 {"id", "user_input": {...}} 구조화된 요구사항), CSV(id, text)
+- 항목마다 요구사항 분석 → RAG 검색 → 도메인 분류 → 설문 생성 순으로 진행하되,
+  단계별 동시 실행 수를 제한 (Config.BATCH_STAGE_CONCURRENCY)
+- 검색 인덱스 · 분석기 · 분류기는 모든 항목이 공유
+- 항목이 끝날 때마다 결과와 단계별 소요 시간을 JSONL에 기록, 재실행 시 완료된 id는 건너뜀
+- 종료 시 단계별 p50/p95 지연과 분당 생성 수를 출력하고 <출력>.summary.json 으로 저장
+"""
+import csv
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from rag.config import Config
+from rag.retriever import load_indexes
+from rag.speculative import analyze_with_speculation
+from user_input.user_input_module import UserInputAnalyzer
+from system_orchestration.orchestration import SurveyOrchestration
+from system_orchestration.domain_classifier import DomainClassifier
+from feedback_output.feedback_analyzer import FeedbackAnalyzer
+from feedback_output.survey_validator import SurveyValidator
+from domain_model.hedged_dispatch import latency_report
+from utils.llm_call import usage_report
+from utils.rate_limiter import get_rate_limiter
+from utils.ollama_manager import get_ollama_manager, preload_local_models, local_models_enabled
+from utils.result_log import ResultLog
+from utils.tracing import span
+
+
+STAGES = ("analysis", "retrieval", "classification", "generation")
+
+# 재실행 시 건너뛰는 상태 (error는 다시 시도)
+DONE_STATUSES = {"ok", "no_keywords", "parse_error"}
+
+
+def load_briefs(path) -> list[dict]:
+    """JSONL/CSV 입력을 [{"id", "text"} 또는 {"id", "user_input"}] 목록으로 로드"""
+    path = Path(path)
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    items, seen = [], set()
+    for i, row in enumerate(rows, 1):
+        item_id = str(row.get("id") or i)
+        if item_id in seen:
+            raise ValueError(f"중복된 id가 있습니다: {item_id}")
+        seen.add(item_id)
+
+        if isinstance(row.get("user_input"), dict):
+            items.append({"id": item_id, "user_input": row["user_input"]})
+        elif (row.get("text") or "").strip():
+            items.append({"id": item_id, "text": row["text"].strip()})
+        else:
+            print(f"⚠️ {i}번째 행에 text/user_input이 없어 건너뜁니다.")
+    return items
+
+
+class BatchSurveyRunner:
+    """여러 요구사항의 설문지 초안을 단계별 동시 실행 제한 하에 생성"""
+
+    def __init__(
+        self,
+        stopword_path: str = None,
+        analysis_model: str = "gpt-5",
+        concurrency: dict = None,
+        verbose: bool = False,
+    ):
+        """
+        Args:
+            analysis_model: 요구사항 분석(LLMExtractor) 모델
+            concurrency: 단계별 동시 실행 수 덮어쓰기 (예: {"generation": 2})
+            verbose: 항목별 중간 출력(검색 결과 등) 여부
+        """
+        self.concurrency = {**Config.BATCH_STAGE_CONCURRENCY, **(concurrency or {})}
+        self.verbose = verbose
+
+        # 모든 항목이 공유하는 구성 요소
+        self.analyzer = UserInputAnalyzer(str(stopword_path or Config.STOPWORD_PATH), model=analysis_model)
+        self.domain_classifier = DomainClassifier()
+        self.feedback_analyzer = FeedbackAnalyzer()
+        self.survey_validator = SurveyValidator()
+
+        self._semaphores = None
+
+    async def _stage(self, stage: str, timings: dict, fn):
+        """단계 동시 실행 수 안에서 fn을 작업 스레드로 실행하고 소요 시간 기록"""
+        async with self._semaphores[stage]:
+            start = time.perf_counter()
+            result = await asyncio.to_thread(fn)
+            timings[stage] = round(time.perf_counter() - start, 3)
+        return result
+
+    async def _run_item(self, item: dict) -> dict:
+        with span("batch_item", id=item["id"]):
+            return await self._run_stages(item)
+
+    async def _run_stages(self, item: dict) -> dict:
+        row = {"id": item["id"]}
+        timings = {}
+        start = time.perf_counter()
+        stage = "analysis"
+        try:
+            user_input, speculative = item.get("user_input"), None
+            if user_input is None:
+                user_input, speculative = await self._stage(
+                    stage, timings, lambda: analyze_with_speculation(self.analyzer, item["text"])
+                )
+            row["user_input"] = user_input
+
+            if not user_input:
+                row["status"] = "no_keywords"
+            elif "raw_output" in user_input:
+                row["status"] = "parse_error"
+            else:
+                orchestration = SurveyOrchestration(
+                    user_input,
+                    domain_classifier=self.domain_classifier,
+                    feedback_analyzer=self.feedback_analyzer,
+                    survey_validator=self.survey_validator,
+                    verbose=self.verbose,
+                    speculative=speculative,
+                )
+                stage = "retrieval"
+                row["context"] = await self._stage(stage, timings, orchestration.retrieve)
+                stage = "classification"
+                row["domain"] = await self._stage(stage, timings, orchestration.classify)
+                stage = "generation"
+                row["survey"] = await self._stage(stage, timings, orchestration.generate)
+                if orchestration.last_validation is not None:
+                    row["validation"] = {
+                        key: orchestration.last_validation[key] for key in ("sq_count", "q_count", "completed")
+                    }
+                    row["validation"]["issues"] = [i["code"] for i in orchestration.last_validation["issues"]]
+                    row["validation"]["remaining"] = [i["message"] for i in orchestration.last_validation["remaining"]]
+                row["status"] = "ok"
+        except Exception as e:
+            row.update(status="error", stage=stage, error=f"{type(e).__name__}: {e}")
+
+        timings["total"] = round(time.perf_counter() - start, 3)
+        row["timings"] = timings
+        return row
+
+    async def arun(self, items: list[dict], output_path) -> dict:
+        """미처리 항목을 생성해 output_path(JSONL)에 이어서 기록하고 요약 반환"""
+        log = ResultLog(output_path, DONE_STATUSES)
+        completed = log.completed()
+        pending = [item for item in items if item["id"] not in completed]
+        print(f"전체 {len(items)}건 중 완료 {len(items) - len(pending)}건, 처리 대상 {len(pending)}건")
+        if not pending:
+            return {}
+
+        # 단계별 동시 실행 수 합만큼 작업 스레드 확보
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=sum(self.concurrency.values())))
+        self._semaphores = {stage: asyncio.Semaphore(self.concurrency[stage]) for stage in STAGES}
+
+        # 첫 항목 전에 공유 인덱스 로드 (실패 시 바로 중단), 도메인 모델은 백그라운드 예열
+        preload_local_models()
+        await asyncio.to_thread(load_indexes)
+
+        rows = []
+        start = time.perf_counter()
+        with log:
+            for future in asyncio.as_completed([self._run_item(item) for item in pending]):
+                row = await future
+                log.write(row)
+                rows.append({"status": row["status"], "timings": row["timings"]})
+                print(f"[{len(rows)}/{len(pending)}] {row['id']}: {row['status']} ({row['timings']['total']:.1f}초)")
+
+        summary = self.summarize(rows, time.perf_counter() - start)
+        summary_path = Path(output_path).with_suffix(".summary.json")
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(self.format_summary(summary))
+        return summary
+
+    def __call__(self, items: list[dict], output_path) -> dict:
+        return asyncio.run(self.arun(items, output_path))
+
+    @staticmethod
+    def summarize(rows: list[dict], elapsed: float) -> dict:
+        """상태별 건수, 단계별 p50/p95 지연(초), 분당 생성 수"""
+        stages = {}
+        for stage in STAGES + ("total",):
+            values = [row["timings"][stage] for row in rows if stage in row["timings"]]
+            if values:
+                stages[stage] = {
+                    "count": len(values),
+                    "p50": float(np.percentile(values, 50)),
+                    "p95": float(np.percentile(values, 95)),
+                }
+
+        statuses = Counter(row["status"] for row in rows)
+        return {
+            "items": len(rows),
+            "statuses": dict(statuses),
+            "elapsed": elapsed,
+            "surveys_per_min": statuses.get("ok", 0) / elapsed * 60 if elapsed else 0.0,
+            "stages": stages,
+        }
+
+    @staticmethod
+    def format_summary(summary: dict) -> str:
+        lines = [
+            f"처리 {summary['items']}건, {summary['elapsed']:.1f}초 "
+            f"(설문 {summary['surveys_per_min']:.2f}건/분) | "
+            + ", ".join(f"{status} {count}" for status, count in sorted(summary["statuses"].items()))
+        ]
+        for stage, s in summary["stages"].items():
+            lines.append(f"  - {stage}: {s['count']}건, p50 {s['p50']:.1f}초 / p95 {s['p95']:.1f}초")
+        return "\n".join(lines)
+
+
+def _parse_concurrency(values: list[str]) -> dict:
+    """['generation=2', ...] → {'generation': 2}"""
+    concurrency = {}
+    for value in values or []:
+        stage, _, n = value.partition("=")
+        if stage not in STAGES or not n.isdigit():
+            raise ValueError(f"동시 실행 수 형식이 올바르지 않습니다: {value} (단계: {', '.join(STAGES)})")
+        concurrency[stage] = int(n)
+    return concurrency
+
+
+def main():
+    parser = argparse.ArgumentParser(description="설문지 초안 일괄 생성")
+    parser.add_argument("input", help="입력 파일 (.jsonl 또는 .csv)")
+    parser.add_argument("-o", "--output", default=None, help="결과 JSONL 경로 (기본값: <입력>.drafts.jsonl)")
+    parser.add_argument("--analysis-model", default="gpt-5")
+    parser.add_argument("--concurrency", nargs="*", default=[], help="단계별 동시 실행 수 (예: generation=2 retrieval=4)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    input_path = Path(args.input)
+    output_path = args.output or input_path.with_suffix(".drafts.jsonl")
+
+    runner = BatchSurveyRunner(
+        analysis_model=args.analysis_model,
+        concurrency=_parse_concurrency(args.concurrency),
+        verbose=args.verbose,
+    )
+    runner(load_briefs(input_path), output_path)
+
+    print(usage_report())
+    print(get_rate_limiter().report())
+    for model, summary in latency_report().items():
+        print(f"  - {model} 지연시간: {summary}")
+    if local_models_enabled():
+        print(get_ollama_manager().report())
+
+
+if __name__ == "__main__":
+    main()
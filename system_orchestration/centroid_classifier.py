@@ -0,0 +1,87 @@
+# system_orchestration/centroid_classifier.py
+from pathlib import Path
+import numpy as np
+
+
+class CentroidDomainClassifier:
+    """
+    임베딩 기반 최근접 중심(centroid) 도메인 분류기
+
+    - 인덱스 구축 시 청크 벡터를 도메인별로 평균 → 정규화된 중심 벡터 저장
+    - 분류 시 질의 벡터와 중심 간 코사인 유사도에 softmax(온도 T) 적용
+    - T는 학습 벡터의 음의 로그우도(NLL)를 최소화하도록 보정 (확률을 신뢰도로 사용)
+    """
+
+    FILE_NAME = "domain_centroids.npz"
+
+    def __init__(self, centroids: np.ndarray, labels: list[str], temperature: float):
+        self.centroids = centroids.astype(np.float32)
+        self.labels = list(labels)
+        self.temperature = float(temperature)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray, labels: list[str]) -> "CentroidDomainClassifier":
+        """청크 벡터와 도메인 라벨로 중심 벡터 및 온도 계산"""
+        vectors = cls._normalize(np.asarray(vectors, dtype=np.float32))
+        label_names = sorted(set(labels))
+        label_idx = np.array([label_names.index(label) for label in labels])
+
+        centroids = np.stack([vectors[label_idx == i].mean(axis=0) for i in range(len(label_names))])
+        centroids = cls._normalize(centroids)
+
+        # 온도 보정: NLL 최소가 되는 T 탐색
+        sims = vectors @ centroids.T
+        best_t, best_nll = 1.0, np.inf
+        for t in np.logspace(-3, 0, 40):
+            probs = cls._softmax(sims / t)
+            nll = -np.log(probs[np.arange(len(label_idx)), label_idx] + 1e-12).mean()
+            if nll < best_nll:
+                best_t, best_nll = t, nll
+
+        return cls(centroids, label_names, best_t)
+
+    @classmethod
+    def fit_from_vector_store(cls, vector_store) -> "CentroidDomainClassifier":
+        """LangChain FAISS 저장소의 벡터와 docstore 메타데이터(domain)로 학습"""
+        index = vector_store.index
+        vectors = index.reconstruct_n(0, index.ntotal)
+        labels = [
+            vector_store.docstore.search(vector_store.index_to_docstore_id[i]).metadata["domain"]
+            for i in range(index.ntotal)
+        ]
+        return cls.fit(vectors, labels)
+
+    def save(self, dir_path) -> Path:
+        path = Path(dir_path) / self.FILE_NAME
+        np.savez(path, centroids=self.centroids, labels=np.array(self.labels), temperature=self.temperature)
+        return path
+
+    @classmethod
+    def load(cls, dir_path) -> "CentroidDomainClassifier":
+        path = Path(dir_path) / cls.FILE_NAME
+        if not path.exists():
+            raise FileNotFoundError(f"도메인 중심 벡터 파일이 없습니다: {path}")
+        data = np.load(path)
+        return cls(data["centroids"], data["labels"].tolist(), float(data["temperature"]))
+
+    def predict_proba(self, vector) -> dict:
+        vector = self._normalize(np.asarray(vector, dtype=np.float32))
+        probs = self._softmax((self.centroids @ vector) / self.temperature)
+        return dict(zip(self.labels, probs.tolist()))
+
+    def __call__(self, vector) -> tuple[str, float]:
+        """(도메인, 신뢰도) 반환"""
+        probs = self.predict_proba(vector)
+        label = max(probs, key=probs.get)
+        return label, probs[label]
@@ -1,40 +1,79 @@
 from langchain_openai import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
+from langchain_core.prompts import ChatPromptTemplate
+from rag.config import Config
+from rag.embedding_index import load_index_meta, query_embeddings
+from utils.llm_call import invoke_chat
+from utils.tracing import span
+from system_orchestration.centroid_classifier import CentroidDomainClassifier
 
 class DomainClassifier:
-    """LLM 기반 도메인 분류기"""
+    """
+    도메인 분류기
+    임베딩 중심 벡터 분류를 먼저 시도하고, 신뢰도가 낮을 때만 LLM으로 판단
+    """
 
-    def __init__(self, model_name="gpt-5-mini"):
-        self.llm = ChatOpenAI(model=model_name)
-        self.prompt = PromptTemplate.from_template("""
+    def __init__(self, model_name="gpt-5-mini", min_confidence=None):
+        self.llm = ChatOpenAI(model=model_name, max_retries=0)
+        self.min_confidence = Config.DOMAIN_MIN_CONFIDENCE if min_confidence is None else min_confidence
+
+        # 인덱스 구축 시 저장된 도메인 중심 벡터 (없으면 LLM 분류만 사용)
+        try:
+            self.centroid_classifier = CentroidDomainClassifier.load(Config.FAISS_DB)
+            # 중심 벡터는 인덱스 벡터로 계산되므로 질의 임베딩도 인덱스와 같은 모델 · 차원 사용
+            self.embeddings = query_embeddings(load_index_meta(Config.FAISS_DB), stage="domain_classifier")
+        except FileNotFoundError:
+            self.centroid_classifier = None
+
+        # 프롬프트 캐싱을 위해 고정 지침(system)을 앞에, 요청별 내용(human)을 뒤에 배치
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", """
         너는 사회조사 분야의 전문가야.
-        아래의 사용자 조사 요구사항과 일부 참조 설문 문서를 참고하여,
+        사용자의 조사 요구사항과 일부 참조 설문 문서를 참고하여,
         이 설문이 속하는 주제 도메인을 판단해줘.
         선택지는 다음 중 하나야:
 
         [공공·사회 / 교육 / 산업·경제 / 의료·보건·복지 / 해당없음]
 
+        ## 출력 형식 
+        결과는 분류된 도메인명만 출력 
+        
+        ex1) 공공·사회
+        ex2) 교육
+        """),
+            ("human", """
         ## 사용자 요구사항
         {user_input}
 
         ## 참조 설문 요약
         {context}
+        """),
+        ])
 
-        ## 출력 형식 
-        결과는 분류된 도메인명만 출력 
-        
-        ex1) 공공·사회
-        ex2) 교육
-        """)
+    def classify_local(self, user_input: dict, context: str) -> tuple[str, float] | None:
+        """중심 벡터 기반 분류 (도메인, 신뢰도)"""
+        if self.centroid_classifier is None:
+            return None
+        query = f"{user_input}\n{context[:1000]}"
+        return self.centroid_classifier(self.embeddings.embed_query(query))
 
     def __call__(self, user_input: dict, context: str) -> str:
-        formatted_input = self.prompt.format(
-            user_input=str(user_input),
-            context=context[:1000]  # 일부분만 LLM에 입력
-        )
-
-        response = self.llm.invoke(formatted_input).content
+        with span("domain_classifier") as s:
+            local = self.classify_local(user_input, context)
+            if local is not None:
+                domain, confidence = local
+                s.set(local_domain=domain, confidence=round(confidence, 4))
+                if confidence >= self.min_confidence:
+                    print(f"임베딩 기반 도메인 분류: {domain} (신뢰도 {confidence:.2f})")
+                    s.set(method="centroid")
+                    return domain
+                print(f"임베딩 분류 신뢰도 낮음 ({domain}, {confidence:.2f}) → LLM 분류")
 
-        return response
+            formatted_input = self.prompt.format_messages(
+                user_input=str(user_input),
+                context=context[:1000]  # 일부분만 LLM에 입력
+            )
 
+            response = invoke_chat("domain_classifier", self.llm, formatted_input)
+            s.set(method="llm")
 
+            return response
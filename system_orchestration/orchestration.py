@@ -1,10 +1,15 @@
 # orchestration.py 
+import re
 from rag.config import Config
 from rag.rag_module import SurveyRAG
+from rag.retriever import load_rag_params
 from system_orchestration.domain_classifier import DomainClassifier
 from domain_model.survey_generator import SurveyGenerator
 from domain_model.survey_regenerator import SurveyRegenerator
 from feedback_output.feedback_analyzer import FeedbackAnalyzer
+from feedback_output.survey_validator import SurveyValidator
+from utils.tracing import span
+from utils.ollama_manager import get_ollama_manager, local_models_enabled
 
 
 class SurveyOrchestration:
@@ -16,69 +21,133 @@ class SurveyOrchestration:
         "의료·보건·복지": "AutoSurvey-Health",
     }
 
-    def __init__(self, user_input):
+    def __init__(self, user_input, domain_classifier=None, feedback_analyzer=None, verbose=True, speculative=None,
+                 survey_validator=None):
         """_summary_
         Args:
             user_input (str): 사용자 요구사항 
+            domain_classifier, feedback_analyzer, survey_validator: 일괄 실행 시 여러 요청이 공유할 인스턴스 (없으면 새로 생성)
+            verbose: 검색 결과 등 중간 출력 여부
+            speculative: 요구사항 분석 중 시작한 추측 검색 (rag.speculative.analyze_with_speculation, 없으면 일반 검색)
         """
         self.user_input = user_input
+        self.verbose = verbose
+        self.speculative = speculative
 
         # 도메인 분류기 
-        self.domain_classifier = DomainClassifier()
+        self.domain_classifier = domain_classifier or DomainClassifier()
 
         # 피드백 분석기 
-        self.feedback_analyzer = FeedbackAnalyzer()
+        self.feedback_analyzer = feedback_analyzer or FeedbackAnalyzer()
+
+        # 생성 결과 검증기
+        self.survey_validator = survey_validator or SurveyValidator()
         
 
         # 상태 저장 변수
         self.selected_domain = None      
         self.model_name = None          
         self.context = None              
+        self.last_trace = None           # 마지막 요청의 단계별 스팬 (트레이싱 활성화 시)
+        self.last_validation = None      # 마지막 생성 · 재생성 결과의 검증 보고서
+
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
         
     # 설문지 초안 생성
     def __call__(self):
-        
-        # 1. RAG 파라미터 동적 조정 및 쿼리 생성
-        rag_params = self.adjust_rag_params()
+        with span("survey_generation") as root:
+            self.last_trace = root
+            self.retrieve()
+            self.classify()
+            return self.generate()
+
+    def retrieve(self, overrides: dict = None) -> str:
+        """1~2. RAG 파라미터 동적 조정 및 참조 설문 검색 (overrides: k / sparse_weight / dense_weight / fusion 직접 지정)"""
+        rag_params = {**self.adjust_rag_params(), **(overrides or {})}
         rag_input = self.build_rag_query()
         
-        # 2. RAG 실행
-        survey_rag = SurveyRAG(model_name=Config.MODEL_NAME, 
-                               sparse_weight=rag_params['sparse_weight'], 
-                               dense_weight=rag_params['dense_weight'], 
-                               k=rag_params['k'])
-        
-        print('RAG 진행 중...')
-        print(f'RAG 입력 Query:\n{rag_input}')
-        self.context = survey_rag(rag_input)
-        print('=======================')
-        print('검색된 참조 설문지')
-        print('=======================')
-        
-        print(f'RAG 결과:\n{self.context}')
-        print('=======================')
+        with span("retrieve", **rag_params):
+            survey_rag = SurveyRAG(model_name=Config.MODEL_NAME, 
+                                   sparse_weight=rag_params['sparse_weight'], 
+                                   dense_weight=rag_params['dense_weight'], 
+                                   k=rag_params['k'],
+                                   fusion=rag_params.get('fusion', 'rrf'))
             
-        # 3. 도메인 모델 선택
-        self.selected_domain = self.domain_classifier(self.user_input, self.context)
-        self.model_name = self.DOMAIN_MODEL_MAP.get(self.selected_domain, "gpt-5")
-        print(f'선택된 도메인 모델: {self.model_name}')
+            self._log('RAG 진행 중...')
+            self._log(f'RAG 입력 Query:\n{rag_input}')
+            docs = self.speculative.resolve(rag_input, rag_params) if self.speculative is not None else None
+            if docs is not None and self.speculative.reused:
+                self._log(f'추측 검색 결과 사용 (설문지 겹침 {self.speculative.overlap:.0%})')
+            self.context = survey_rag(rag_input, docs=docs)
+        self._log('=======================')
+        self._log('검색된 참조 설문지')
+        self._log('=======================')
+        
+        self._log(f'RAG 결과:\n{self.context}')
+        self._log('=======================')
+        return self.context
+
+    def classify(self) -> str:
+        """3. 도메인 분류 및 도메인 모델 선택"""
+        with span("classify") as s:
+            self.selected_domain = self.domain_classifier(self.user_input, self.context)
+            self.model_name = self.DOMAIN_MODEL_MAP.get(self.selected_domain, "gpt-5")
+            s.set(domain=self.selected_domain)
+        # 생성 단계에서 보조 모델로 쓸 도메인 모델을 미리 예열 (생성 프롬프트를 만드는 동안 로드)
+        if local_models_enabled():
+            get_ollama_manager().warm(self.model_name)
+        self._log(f'선택된 도메인 모델: {self.model_name}')
+        return self.selected_domain
+
+    def generate(self, on_text=None) -> str:
+        """4. 설문지 생성 (on_text: 부분 출력 스트리밍 콜백)"""
+        self._log('설문지 생성 진행 중...')
+        with span("generate", dispatch=Config.GENERATION_DISPATCH):
+            generator = self.build_generator()
+            survey = generator(self.user_input, self.context, on_text=on_text)
+        return self.validate(survey, check_count=True, on_text=on_text)
 
-        # 4. 설문지 생성
-        # generator = SurveyGenerator(model_name=model_name)
-        print('설문지 생성 진행 중...')
-        generator = SurveyGenerator(model_name='gpt-5')
-        result = generator(self.user_input, self.context)
+    def validate(self, survey: str, check_count: bool = True, on_text=None) -> str:
+        """
+        생성 결과 검증 · 수정 (Config.SURVEY_VALIDATION)
+        번호 · 형식은 로컬에서 고치고, 부족한 문항 · 보기만 LLM으로 보완 (전체 재생성 없음)
+        check_count: 요청 문항 수 확인 여부 (피드백으로 문항 수를 바꾼 재생성 결과는 확인하지 않음)
+        """
+        if Config.SURVEY_VALIDATION == "off":
+            return survey
+        with span("validate", mode=Config.SURVEY_VALIDATION) as s:
+            repaired, report = self.survey_validator(
+                survey,
+                self.user_input if check_count else None,
+                complete=Config.SURVEY_VALIDATION == "repair",
+            )
+            s.set(issues=len(report["issues"]), remaining=len(report["remaining"]), completed=report["completed"])
+        self.last_validation = report
 
-        return result
+        if report["issues"]:
+            self._log(f"설문지 검증: 문제 {len(report['issues'])}건, 보완 문항 {report['completed']}개, 남은 문제 {len(report['remaining'])}건")
+            for issue in report["remaining"]:
+                self._log(f"  ⚠️ {issue['message']}")
+        if Config.SURVEY_VALIDATION != "repair":
+            return survey
+        if report["changed"] and on_text is not None:
+            on_text(repaired)
+        return repaired
 
 
-    def process_feedback(self, current_survey: str, user_feedback: str) -> str:
+    def process_feedback(self, current_survey: str, user_feedback: str | list[str], on_text=None, on_progress=None) -> str:
         """
         피드백 처리 및 재생성
         
         Args:
             current_survey: 현재 설문지
             user_feedback: 사용자 피드백 (자연어)
+                대기열에 모아둔 여러 건의 피드백은 리스트로 전달하면
+                한 번의 분석 + 한 번의 재생성으로 모두 반영
+            on_text: 재생성 중인 부분 출력 스트리밍 콜백
+            on_progress: 진행 단계 설명을 받을 콜백 (백그라운드 작업 진행 표시용)
         
         Returns:
             수정된 설문지
@@ -91,56 +160,80 @@ class SurveyOrchestration:
         #         "__call__() 메서드를 먼저 호출하세요."
         #     )
             
-        # 1. 피드백 구조화
-        print(" 피드백 분석 중...")
-        structured_feedback = self.feedback_analyzer(current_survey, user_feedback)
+        with span("feedback") as root:
+            self.last_trace = root
+            # 1. 피드백 구조화 (수정 요청 목록)
+            print(" 피드백 분석 중...")
+            if on_progress:
+                on_progress("피드백 분석 중")
+            with span("feedback_analysis") as s:
+                edits = self.feedback_analyzer(current_survey, user_feedback)
+                s.set(edits=len(edits))
         
-        print(f"✅ 분석 완료:")
-        print(f"  - 유형: {structured_feedback['feedback_type']}")
-        print(f"  - 대상: {structured_feedback['target_question']}")
-        print(f"  - 내용: {structured_feedback['modification']}")
+            print(f"✅ 분석 완료: 수정 요청 {len(edits)}건")
+            for i, edit in enumerate(edits, 1):
+                print(f"  [{i}] 유형: {edit['feedback_type']}")
+                print(f"      대상: {edit['target_question']}")
+                print(f"      내용: {edit['modification']}")
         
-        # 2. 재생성
-        print("\n 설문지 재생성 중...")
+            # 2. 재생성 (모든 수정 요청을 한 번에 반영)
+            print("\n 설문지 재생성 중...")
+            if on_progress:
+                on_progress(f"수정 요청 {len(edits)}건 반영하여 재생성 중")
         
-        regenerator = SurveyRegenerator(model_name='gpt-5')
-        # regenerator = SurveyRegenerator(model_name=self.model_name)
+            regenerator = self.build_regenerator()
+            # regenerator = SurveyRegenerator(model_name=self.model_name)
         
-        modified_survey = regenerator(
-            previous_survey=current_survey,
-            structured_feedback=structured_feedback
-        )
+            with span("regenerate", dispatch=Config.GENERATION_DISPATCH):
+                modified_survey = regenerator(
+                    previous_survey=current_survey,
+                    structured_feedback=edits,
+                    on_text=on_text
+                )
         
-        return modified_survey
+            return self.validate(modified_survey, check_count=False, on_text=on_text)
         
 
-    def adjust_rag_params(self):
-        """사용자 입력에 따라 RAG 검색 파라미터를 동적으로 조정"""
-        params = {
-            "sparse_weight": 0.3,
-            "dense_weight": 0.7,
-            "k": 1,
+    def _dispatch_options(self, stage: str) -> dict:
+        """
+        생성 단계 디스패치 설정
+        주 모델은 gpt-5, 분류된 도메인의 파인튜닝 모델을 보조(fallback/hedge) 모델로 사용
+        """
+        return {
+            "dispatch": Config.GENERATION_DISPATCH,
+            "fallback_model": self.DOMAIN_MODEL_MAP.get(self.selected_domain),
+            "deadline": Config.STAGE_DEADLINES.get(stage),
         }
 
-        values = list(self.user_input.values())
+    def build_generator(self) -> SurveyGenerator:
+        return SurveyGenerator(model_name='gpt-5', **self._dispatch_options("generator"))
 
-        variables = values[2]
-        num_q = values[3]
+    def build_regenerator(self) -> SurveyRegenerator:
+        return SurveyRegenerator(model_name='gpt-5', **self._dispatch_options("regenerator"))
 
-        # 문항수가 많으면 검색 범위 확장
-        if "50" in num_q or "이상" in num_q:
-            params["k"] = 2
-            print("문항 수가 50이상 검색 범위 확장 (k=2)")
-            
-        if "70" in num_q or "이상" in num_q:
-            params["k"] = 3
-            print("문항 수가 70이상 검색 범위 확장 (k=3)")
-
-        # 주요 측정 변수가 많으면 의미기반 검색 비중 강화
-        if len(variables) > 5:
-            params["dense_weight"] = 0.8
-            params["sparse_weight"] = 0.2
-            print("주요 변수 많음 → 의미기반 검색 강화")
+    @staticmethod
+    def parse_num_questions(num_q) -> int:
+        """요청 문항 수 문자열에서 숫자 추출 ('10~15문항' → 15, 언급 없으면 0)"""
+        numbers = [int(n) for n in re.findall(r"\d+", str(num_q or ""))]
+        return max(numbers, default=0)
+
+    def adjust_rag_params(self):
+        """
+        사용자 입력에 따라 RAG 검색 파라미터를 동적으로 조정
+        검색 파라미터 표(rag.eval_retrieval 평가 결과 또는 기본 규칙)의 규칙을 순서대로 적용
+        """
+        table = load_rag_params()
+        params = dict(table["default"])
+
+        values = list(self.user_input.values())
+        num_variables = len(values[2])
+        num_questions = self.parse_num_questions(values[3])
+
+        for rule in table["rules"]:
+            if num_questions >= rule.get("min_questions", 0) and num_variables >= rule.get("min_variables", 0):
+                update = {key: value for key, value in rule.items() if not key.startswith("min_")}
+                params.update(update)
+                print(f"검색 파라미터 조정 (문항 {num_questions}, 측정 변수 {num_variables}개): {update}")
 
         return params
 
@@ -0,0 +1,178 @@
+# user_input/batch_analyzer.py
+"""
+요구사항/RFP 텍스트 일괄 분석
+
+    python -m user_input.batch_analyzer requests.jsonl -o analyzed.jsonl --concurrency 8 --workers 2
+
+- 입력: JSONL({"id": ..., "text": ...}) 또는 CSV(id, text 컬럼), id가 없으면 행 번호 사용
+- 키워드 추출(형태소 분석)은 작업 프로세스 풀에서, LLM 추출은 비동기 클라이언트로 동시 실행
+  (동시 요청 수는 세마포어로 제한, 실제 처리량은 공용 속도 제한기의 API 한도에 맞춰짐)
+- 결과는 항목마다 JSONL로 즉시 기록되며, 다시 실행하면 이미 처리된 id는 건너뜀
+"""
+import csv
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from rag.config import Config
+from user_input.text_mining import get_text_mining_processor
+from user_input.llm_extractor import LLMExtractor
+from utils.llm_call import usage_report
+from utils.rate_limiter import get_rate_limiter
+from utils.result_log import ResultLog
+
+
+# 재실행 시 건너뛰는 상태 (error는 다시 시도)
+DONE_STATUSES = {"ok", "parse_error", "no_keywords"}
+
+
+def load_requests(path) -> list[dict]:
+    """JSONL/CSV 입력을 [{"id", "text"}] 목록으로 로드"""
+    path = Path(path)
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    items, seen = [], set()
+    for i, row in enumerate(rows, 1):
+        text = (row.get("text") or "").strip()
+        if not text:
+            print(f"⚠️ {i}번째 행에 text가 없어 건너뜁니다.")
+            continue
+
+        item_id = str(row.get("id") or i)
+        if item_id in seen:
+            raise ValueError(f"중복된 id가 있습니다: {item_id}")
+        seen.add(item_id)
+        items.append({"id": item_id, "text": text})
+    return items
+
+
+def _extract_keywords(texts: list[str], stopword_path: str, tokenizer: str) -> list[list]:
+    """작업 프로세스에서 실행 (프로세스별 공용 처리기를 최초 1회만 예열)"""
+    return get_text_mining_processor(tokenizer).extract_keywords_many(texts, stopword_path)
+
+
+class BatchUserInputAnalyzer:
+    """UserInputAnalyzer의 일괄 처리 버전 (키워드 추출 → LLM 구조화)"""
+
+    def __init__(
+        self,
+        stopword_path: str = None,
+        model: str = Config.MODEL_NAME,
+        concurrency: int = None,
+        workers: int = None,
+        tokenizer: str = None,
+    ):
+        """
+        Args:
+            concurrency: 동시 LLM 추출 요청 수 (기본값: Config.BATCH_CONCURRENCY)
+            workers: 토큰화 프로세스 수, 1이면 프로세스 내 별도 스레드에서 처리 (기본값: Config.BATCH_WORKERS)
+            tokenizer: 'okt' | 'ngram' | 'dict' (기본값: Config.TOKENIZER)
+        """
+        self.stopword_path = str(stopword_path or Config.STOPWORD_PATH)
+        self.llm_extractor = LLMExtractor(model=model)
+        self.concurrency = concurrency or Config.BATCH_CONCURRENCY
+        self.workers = workers or Config.BATCH_WORKERS
+        self.tokenizer = tokenizer
+
+    def _executor(self):
+        if self.workers > 1:
+            return ProcessPoolExecutor(self.workers)
+        return ThreadPoolExecutor(1)    # 형태소 분석이 이벤트 루프를 막지 않도록 분리
+
+    async def arun(self, items: list[dict], output_path) -> dict:
+        """미처리 항목을 분석해 output_path(JSONL)에 이어서 기록, 상태별 건수 반환"""
+        log = ResultLog(output_path, DONE_STATUSES)
+        completed = log.completed()
+        pending = [item for item in items if item["id"] not in completed]
+        print(f"전체 {len(items)}건 중 완료 {len(items) - len(pending)}건, 처리 대상 {len(pending)}건")
+
+        stats = Counter()
+        if not pending:
+            return dict(stats)
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+
+        with self._executor() as pool, log:
+
+            def write(row: dict):
+                log.write(row)
+                stats[row["status"]] += 1
+
+            async def analyze(item: dict, keywords_future, index: int):
+                row = {"id": item["id"]}
+                try:
+                    keywords = (await keywords_future)[index]
+                    row["keywords"] = keywords
+                    llm_start = time.perf_counter()
+                    if not keywords:
+                        row.update(status="no_keywords", result={})
+                    else:
+                        async with semaphore:
+                            result = await self.llm_extractor.aextract_info(item["text"], keywords)
+                        row.update(status="parse_error" if "raw_output" in result else "ok", result=result)
+                    row["elapsed"] = round(time.perf_counter() - llm_start, 3)
+                except Exception as e:
+                    row.update(status="error", error=f"{type(e).__name__}: {e}")
+                write(row)
+
+            # 청크 단위로 토큰화를 맡기고, 끝난 청크부터 바로 LLM 추출 시작
+            tasks = []
+            size = Config.BATCH_CHUNK_SIZE
+            for i in range(0, len(pending), size):
+                chunk = pending[i:i + size]
+                future = loop.run_in_executor(
+                    pool, _extract_keywords, [item["text"] for item in chunk], self.stopword_path, self.tokenizer,
+                )
+                tasks.extend(analyze(item, future, j) for j, item in enumerate(chunk))
+
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                await self.llm_extractor.aclose()
+
+        elapsed = time.perf_counter() - start
+        done = sum(stats.values())
+        print(f"처리 {done}건, {elapsed:.1f}초 ({done / elapsed * 60:.1f}건/분) | " +
+              ", ".join(f"{status} {count}" for status, count in sorted(stats.items())))
+        return dict(stats)
+
+    def __call__(self, items: list[dict], output_path) -> dict:
+        return asyncio.run(self.arun(items, output_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="요구사항 텍스트 일괄 분석")
+    parser.add_argument("input", help="입력 파일 (.jsonl 또는 .csv, id/text 컬럼)")
+    parser.add_argument("-o", "--output", default=None, help="결과 JSONL 경로 (기본값: <입력>.analyzed.jsonl)")
+    parser.add_argument("--model", default=Config.MODEL_NAME)
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--tokenizer", default=None)
+    args = parser.parse_args()
+
+    input_path = Path(args.input)
+    output_path = args.output or input_path.with_suffix(".analyzed.jsonl")
+
+    analyzer = BatchUserInputAnalyzer(
+        model=args.model,
+        concurrency=args.concurrency,
+        workers=args.workers,
+        tokenizer=args.tokenizer,
+    )
+    analyzer(load_requests(input_path), output_path)
+
+    print(usage_report())
+    print(get_rate_limiter().report())
+
+
+if __name__ == "__main__":
+    main()
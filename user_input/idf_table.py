@@ -0,0 +1,108 @@
+# user_input/idf_table.py
+import json
+from pathlib import Path
+from collections import defaultdict
+import numpy as np
+
+
+class IDFTable:
+    """
+    설문 코퍼스 전체 기준 명사 IDF 테이블
+
+    - 정렬된 용어 배열(고정폭 유니코드) + float32 IDF 배열로 저장
+    - 로드 시 np.load(mmap_mode='r')로 메모리 매핑 → 프로세스 간 페이지 공유
+    - 조회는 np.searchsorted 기반 벡터화 (요청마다 모델 학습 없음)
+    """
+
+    TERMS_FILE = "idf_terms.npy"
+    VALUES_FILE = "idf_values.npy"
+    META_FILE = "idf_meta.json"
+
+    def __init__(self, terms: np.ndarray, idf: np.ndarray, num_docs: int):
+        self.terms = terms
+        self.idf = idf
+        self.num_docs = num_docs
+        # 코퍼스에 없는 용어는 df=0으로 간주 (가장 드문 용어로 취급)
+        self.default_idf = float(np.log((1 + num_docs) / 1) + 1)
+
+    @classmethod
+    def build(cls, documents: list[list[str]]) -> "IDFTable":
+        """
+        문서별 명사 목록으로 문서 빈도(df) 계산
+        idf = ln((1 + N) / (1 + df)) + 1  (scikit-learn smooth_idf와 동일)
+        """
+        df = defaultdict(int)
+        for nouns in documents:
+            for term in set(nouns):
+                df[term] += 1
+
+        num_docs = len(documents)
+        terms = np.array(sorted(df)) if df else np.array([], dtype="<U1")
+        counts = np.array([df[t] for t in terms], dtype=np.float32)
+        idf = (np.log((1 + num_docs) / (1 + counts)) + 1).astype(np.float32)
+        return cls(terms, idf, num_docs)
+
+    def save(self, dir_path) -> Path:
+        dir_path = Path(dir_path)
+        dir_path.mkdir(parents=True, exist_ok=True)
+        np.save(dir_path / self.TERMS_FILE, self.terms)
+        np.save(dir_path / self.VALUES_FILE, self.idf)
+        with open(dir_path / self.META_FILE, "w", encoding="utf-8") as f:
+            json.dump({"num_docs": self.num_docs, "num_terms": len(self.terms)}, f)
+        return dir_path
+
+    @classmethod
+    def load(cls, dir_path) -> "IDFTable":
+        dir_path = Path(dir_path)
+        if not (dir_path / cls.META_FILE).exists():
+            raise FileNotFoundError(f"IDF 테이블이 없습니다: {dir_path}")
+        with open(dir_path / cls.META_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+        terms = np.load(dir_path / cls.TERMS_FILE, mmap_mode="r")
+        idf = np.load(dir_path / cls.VALUES_FILE, mmap_mode="r")
+        return cls(terms, idf, meta["num_docs"])
+
+    def lookup(self, terms: np.ndarray) -> np.ndarray:
+        """용어 배열의 IDF 값 (없는 용어는 default_idf)"""
+        if len(self.terms) == 0:
+            return np.full(len(terms), self.default_idf, dtype=np.float32)
+
+        idx = np.searchsorted(self.terms, terms)
+        idx = np.minimum(idx, len(self.terms) - 1)
+        found = self.terms[idx] == terms
+        return np.where(found, self.idf[idx], self.default_idf).astype(np.float32)
+
+    def rank(self, nouns: list[str], top_k: int = None) -> list[tuple[str, float]]:
+        """한 문서의 명사 목록을 TF-IDF 점수 내림차순으로 정렬"""
+        if not nouns:
+            return []
+
+        terms, counts = np.unique(np.array(nouns), return_counts=True)
+        scores = (counts / counts.sum()) * self.lookup(terms)
+
+        # 점수 내림차순, 동점은 용어 사전순
+        order = np.lexsort((terms, -scores))
+        if top_k is not None:
+            order = order[:top_k]
+        return [(str(terms[i]), float(scores[i])) for i in order]
+
+
+def build_idf_table(docs, processor, stopword_path: str, out_dir) -> IDFTable:
+    """
+    SurveyLoader 청크를 설문지(file_name) 단위 문서로 묶어 IDF 테이블 구축 (오프라인 1회)
+    키워드 추출과 동일한 정제/토큰화/불용어 처리를 사용
+    """
+    texts = defaultdict(list)
+    for doc in docs:
+        texts[doc.metadata["file_name"]].append(doc.page_content)
+
+    stopwords = processor.stopwords(stopword_path)
+    documents = []
+    for chunks in texts.values():
+        nouns = processor.tokenizer.nouns(processor.clean_text(" ".join(chunks)))
+        documents.append(processor.filter_nouns(nouns, stopwords))
+
+    table = IDFTable.build(documents)
+    table.save(out_dir)
+    print(f"IDF 테이블 저장 완료: {out_dir} (문서 {table.num_docs}개, 용어 {len(table.terms)}개)")
+    return table
@@ -1,7 +1,9 @@
 # user_input/llm_extractor.py
 
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 import json
+from utils.llm_call import call_cached, acall_cached, record_usage
+from utils.rate_limiter import rate_limited, arate_limited
 
 class LLMExtractor:
     """
@@ -9,20 +11,35 @@ class LLMExtractor:
     조사 목적, 대상, 도메인, 주요 변수 등을 구조화된 JSON으로 추출하는 모듈
     """
     def __init__(self, model: str = "gpt-5"):
-        self.client = OpenAI()
+        self.client = OpenAI(max_retries=0)   # 재시도는 공용 제한기에서 처리
+        self._async_client = None             # 일괄 분석 시에만 생성
         self.model = model
-
-    def extract_info(self, text: str, keywords: list[str]) -> dict:
-        """
-        LLM을 이용한 구조화된 정보 추출
-        """
-        
-        system_prompt = """
+        # 생성 설정 (API 요청과 캐시 키에 함께 사용)
+        self.params = {"reasoning": {"effort": "low"}, "max_output_tokens": 1024}  # GPT-5 reasoning 모드
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(max_retries=0)
+        return self._async_client
+
+    async def aclose(self):
+        """비동기 클라이언트 정리 (이벤트 루프가 끝나기 전에 호출)"""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    # 고정 지침은 system 메시지에 모아 프롬프트 캐싱(prefix) 대상이 되도록 함
+    SYSTEM_PROMPT = """
         너는 전문 조사기획자이자 설문 설계 전문가이다. 
         너의 역할은 사용자가 작성한 요구사항 문서나 RFP(Request for Proposal)를 분석하여, 
         설문조사 설계에 필요한 정보를 구조화된 JSON 형태로 추출하는 것이다. 
         출력은 반드시 유효한 JSON 형식으로 반환해야 하며, 키와 값은 모두 한국어로 작성함. 
 
+        입력으로는 사용자가 작성한 조사 요청 문서와, 
+        이 문서에서 텍스트 마이닝 과정을 통해 추출된 핵심 키워드가 주어진다.
+        문서와 키워드를 참고하여 조사의 구조적 정보를 도출해야 한다.
+
         분석 시 다음 항목을 반드시 포함하라:
         - 조사 목적: 조사의 전체적인 목표와 취지
         - 조사 대상: 응답자가 속하는 주요 집단 (예: 대학생, 직장인, 고객 등)
@@ -41,44 +58,97 @@ class LLMExtractor:
         }
         """
 
+    def _build_messages(self, text: str, keywords: list[str]) -> list[dict]:
+        """고정 지침(system) + 요청별 입력(user) 메시지 구성"""
         user_prompt = f"""
-        
-        다음은 사용자가 작성한 조사 요청 내용임.
-        이 문서는 설문 설계에 필요한 요구사항을 설명하고 있으며, 
-        너는 이 문장을 기반으로 조사의 구조적 정보를 도출해야함.
-
         [사용자 입력 문서]
         {text}
 
-        이 문서의 주요 내용에서 다음과 같은 핵심 키워드들이 텍스트 마이닝 과정을 통해 추출됨:
+        [핵심 키워드]
         {', '.join(keywords)}
-
-        위 텍스트와 키워드를 참고하여, 
-        조사 목적, 대상, 주요 측정 변수, 요청 문항 수, 설문 요구사항을 JSON 객체로 작성해야함.
-        
         """
 
-        response = self.client.responses.create(
-            model=self.model,
-            reasoning={"effort": "low"},   # GPT-5 reasoning 모드
-            max_output_tokens=1024,
-            input=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-        )
+        return [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ]
 
-        # 모델 출력 파싱
-        output_text = response.output_text.strip()
+    def extract_info(self, text: str, keywords: list[str]) -> dict:
+        """
+        LLM을 이용한 구조화된 정보 추출
+        """
+        messages = self._build_messages(text, keywords)
+
+        output_text = call_cached(
+            "extractor",
+            self.model,
+            self.params,
+            messages,
+            lambda: self._create(messages),
+        )
 
-        # JSON 파싱 처리
-        try:
-            structured_data = json.loads(output_text)
-        except json.JSONDecodeError:
-            structured_data = {"error": "JSON parsing failed", "raw_output": output_text}
+        return self._parse(output_text)
 
-        return structured_data
-    
+    async def aextract_info(self, text: str, keywords: list[str]) -> dict:
+        """extract_info의 비동기 버전 (일괄 분석용)"""
+        messages = self._build_messages(text, keywords)
 
+        output_text = await acall_cached(
+            "extractor",
+            self.model,
+            self.params,
+            messages,
+            lambda: self._acreate(messages),
+        )
+        return self._parse(output_text)
 
+    @staticmethod
+    def _parse(output_text: str) -> dict:
+        """모델 출력 JSON 파싱 (실패 시 원문 보존)"""
+        output_text = output_text.strip()
+        try:
+            return json.loads(output_text)
+        except json.JSONDecodeError:
+            return {"error": "JSON parsing failed", "raw_output": output_text}
+
+    def _create(self, messages: list[dict]) -> str:
+        """Responses API 호출 (속도 제한/재시도 + 사용량 기록)"""
+        response = rate_limited(
+            self.model,
+            messages,
+            lambda: self.client.responses.create(
+                model=self.model,
+                input=messages,
+                **self.params,
+            ),
+            usage_of=lambda r: r.usage.total_tokens if r.usage else None,
+        )
 
+        self._record_usage(response)
+        return response.output_text
+
+    async def _acreate(self, messages: list[dict]) -> str:
+        response = await arate_limited(
+            self.model,
+            messages,
+            lambda: self.async_client.responses.create(
+                model=self.model,
+                input=messages,
+                **self.params,
+            ),
+            usage_of=lambda r: r.usage.total_tokens if r.usage else None,
+        )
+        self._record_usage(response)
+        return response.output_text
+
+    @staticmethod
+    def _record_usage(response):
+        usage = response.usage
+        if usage is not None:
+            details = getattr(usage, "input_tokens_details", None)
+            record_usage(
+                "extractor",
+                usage.input_tokens,
+                getattr(details, "cached_tokens", 0) or 0,
+                usage.output_tokens,
+            )
@@ -1,23 +1,49 @@
 # user_input/text_mining.py
 
 import re
-from konlpy.tag import Okt
-from sklearn.feature_extraction.text import TfidfVectorizer
+import threading
+from pathlib import Path
+from functools import lru_cache
+from rag.config import Config
+from utils.tokenizer import get_tokenizer
+from user_input.idf_table import IDFTable
+
+
+@lru_cache(maxsize=None)
+def load_stopwords(path: str) -> frozenset:
+    """불용어 사전 로드 (경로별 1회만 읽고 frozenset으로 캐시)"""
+    stopwords = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            word = line.strip()
+            if word:
+                stopwords.add(word)
+    return frozenset(stopwords)
+
 
 class TextMiningProcessor:
-    def __init__(self):
-        self.okt = Okt()
-        self.vectorizer = TfidfVectorizer(max_features=30)
+    def __init__(self, tokenizer: str = None):
+        """
+        Args:
+            tokenizer: 'okt' | 'ngram' | 'dict' (기본값: Config.TOKENIZER)
+                okt 이외의 백엔드는 JVM을 기동하지 않음
+        """
+        self.tokenizer = get_tokenizer(tokenizer)
+
+        # 코퍼스 IDF 테이블 (없으면 단어 빈도만으로 순위 결정)
+        try:
+            self.idf_table = IDFTable.load(Config.IDF_DB)
+        except FileNotFoundError:
+            print(f"⚠️ IDF 테이블이 없습니다 ({Config.IDF_DB}), 단어 빈도 기준으로 키워드 추출")
+            self.idf_table = IDFTable.build([])
+
+    def warmup(self):
+        """형태소 분석기 초기 로딩(Okt의 경우 JVM 기동)을 미리 수행"""
+        self.tokenizer.warmup()
 
-    def stopwords(self, path: str) -> list:
+    def stopwords(self, path: str) -> frozenset:
         """불용어 사전 로드"""
-        stopwords = []
-        with open(path, 'r', encoding='utf-8') as f:
-            for line in f:
-                word = line.strip()
-                if word:
-                    stopwords.append(word)
-        return stopwords
+        return load_stopwords(str(Path(path).resolve()))
 
     def clean_text(self, text: str) -> str:
         """특수문자, 공백 제거"""
@@ -25,43 +51,41 @@ class TextMiningProcessor:
         text = re.sub(r"\s+", " ", text).strip()
         return text
 
+    def filter_nouns(self, nouns: list, stopwords: frozenset) -> list:
+        """불용어 및 단일 음절 제거"""
+        return [word for word in nouns if len(word) > 1 and word not in stopwords]
+
+    def _rank(self, nouns: list, top_k: int) -> list:
+        """명사 목록을 코퍼스 IDF 기준 TF-IDF 점수 순으로 정렬해 상위 top_k 반환"""
+        return [word for word, _ in self.idf_table.rank(nouns, top_k)]
+
     def extract_keywords(self, text: str, path: str, top_k: int = 10) -> list:
         """
         형태소 분석 + TF-IDF 기반 핵심 키워드 추출
         - 명사 중심 추출
         - 불용어 및 단일 음절 제거
-        - TF-IDF 가중치 기준 상위 top_k 반환
+        - 요청 문서의 TF × 설문 코퍼스 IDF 기준 상위 top_k 반환
         """
-        
         stopwords = self.stopwords(path)
-        
-        cleaned = self.clean_text(text)
-        words = self.okt.pos(cleaned, norm=True, stem=True)
-
-        nouns = [
-            word for word, pos in words
-            if pos == "Noun" and len(word) > 1 and word not in stopwords
-]
+        nouns = self.tokenizer.nouns(self.clean_text(text))
+        return self._rank(self.filter_nouns(nouns, stopwords), top_k)
 
-        if not nouns:
-            return []
-
-        joined = " ".join(nouns)
-        tfidf_matrix = self.vectorizer.fit_transform([joined])
-
-        # TF-IDF 벡터에서 (단어, 가중치) 튜플 추출
-        feature_names = self.vectorizer.get_feature_names_out()
-        scores = tfidf_matrix.toarray()[0]
+    def extract_keywords_many(self, texts: list[str], path: str, top_k: int = 10) -> list[list]:
+        """여러 텍스트를 형태소 분석기에 한 번에 통과시켜 키워드 추출"""
+        stopwords = self.stopwords(path)
+        batches = self.tokenizer.nouns_many([self.clean_text(t) for t in texts])
+        return [self._rank(self.filter_nouns(nouns, stopwords), top_k) for nouns in batches]
 
-        # 점수 높은 순으로 정렬
-        sorted_keywords = sorted(
-            zip(feature_names, scores),
-            key=lambda x: x[1],
-            reverse=True
-        )
 
-        # 상위 top_k 키워드 반환
-        return [word for word, _ in sorted_keywords[:
-                                                    ]]
+_processors = {}
+_processors_lock = threading.Lock()
 
 
+def get_text_mining_processor(tokenizer: str = None) -> TextMiningProcessor:
+    """토크나이저별 프로세스 공용 처리기 (최초 1회만 예열)"""
+    with _processors_lock:
+        if tokenizer not in _processors:
+            processor = TextMiningProcessor(tokenizer)
+            processor.warmup()
+            _processors[tokenizer] = processor
+    return _processors[tokenizer]
@@ -1,28 +1,37 @@
 # user_input/analyzer.py
-from user_input.text_mining import TextMiningProcessor
+from user_input.text_mining import get_text_mining_processor
 from user_input.llm_extractor import LLMExtractor
+from utils.tracing import span
 
 class UserInputAnalyzer:
     """사용자 입력 분석 전체 프로세스 (Text Mining + LLM 추출)"""
     
     def __init__(self, stopword_path: str, model: str = "gpt-5-mini"):
         self.stopword_path = stopword_path
-        self.text_mining = TextMiningProcessor()
+        self.text_mining = get_text_mining_processor()   # 프로세스 공용 (JVM 1회 기동)
         self.llm_extractor = LLMExtractor(model=model)
 
-    def __call__(self, text: str) -> dict:
-        """사용자 입력 텍스트를 구조화된 정보로 변환"""
+    def __call__(self, text: str, on_keywords=None) -> dict:
+        """
+        사용자 입력 텍스트를 구조화된 정보로 변환
+        on_keywords: 키워드 추출 직후(LLM 구조화 전) 키워드를 받을 콜백 (추측 검색 시작용)
+        """
         
-        # 키워드 추출
-        keywords = self.text_mining.extract_keywords(text, self.stopword_path)
-        if not keywords:
-            print("키워드가 추출되지 않았습니다. 입력 텍스트를 확인하세요.")
-            return {}
+        with span("user_input_analysis", chars=len(text)) as s:
+            # 키워드 추출
+            with span("keywords"):
+                keywords = self.text_mining.extract_keywords(text, self.stopword_path)
+            s.set(keywords=len(keywords))
+            if not keywords:
+                print("키워드가 추출되지 않았습니다. 입력 텍스트를 확인하세요.")
+                return {}
+            if on_keywords:
+                on_keywords(keywords)
 
-        # LLM 기반 구조화
-        structured_info = self.llm_extractor.extract_info(text, keywords)
+            # LLM 기반 구조화
+            structured_info = self.llm_extractor.extract_info(text, keywords)
 
-        return structured_info
+            return structured_info
 
 
 if __name__ == "__main__":
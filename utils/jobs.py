@@ -0,0 +1,164 @@
+# utils/jobs.py
+"""
+오래 걸리는 파이프라인 단계(검색 · 생성 · 피드백 재생성)를 위한 백그라운드 작업 실행기
+
+    job = get_job_manager().submit("generation", lambda job: orchestrator.generate(on_text=job.stream))
+    job.status / job.progress / job.partial / job.result
+
+- 프로세스 공용 작업 스레드 풀 (Config.JOB_WORKERS), 작업은 id로 조회
+- 작업 함수는 job을 인자로 받아 진행 상황(report)과 부분 출력(stream)을 기록
+- 취소는 협조적: 대기 중이면 바로 취소, 실행 중이면 다음 report/stream 시점에 JobCancelled 발생
+- 끝난 작업은 Config.JOB_TTL(초) 이후 정리
+"""
+import time
+import uuid
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from rag.config import Config
+
+
+JOB_STATUSES = ("queued", "running", "done", "failed", "cancelled")
+
+
+class JobCancelled(BaseException):
+    """
+    실행 중인 작업이 취소 요청을 확인한 경우
+    (asyncio.CancelledError처럼 BaseException을 상속해 단계별 except Exception 처리에 가로채이지 않음)
+    """
+
+
+class Job:
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.status = "queued"
+        self.progress = ""          # 현재 진행 단계 설명
+        self.partial = ""           # 스트리밍 중인 부분 출력
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._future = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+
+    def report(self, progress: str):
+        """진행 단계 갱신 (취소 확인 지점)"""
+        self.check_cancelled()
+        self.progress = progress
+
+    def stream(self, text: str):
+        """지금까지 생성된 출력 전체로 부분 출력 갱신 (취소 확인 지점)"""
+        self.check_cancelled()
+        self.partial = text
+
+    def cancel(self) -> bool:
+        """취소 요청 (이미 끝난 작업이면 False)"""
+        if self.done:
+            return False
+        self._cancel.set()
+        if self._future is not None and self._future.cancel():
+            self.finished_at = time.time()
+            self.status = "cancelled"
+        return True
+
+    def wait(self, timeout: float = None):
+        """작업 종료까지 대기 후 결과 반환 (실패 시 예외 재발생)"""
+        self._future.exception(timeout)
+        if self.status == "failed":
+            raise self.error
+        return self.result
+
+
+class JobManager:
+    """작업 스레드 풀 + id별 작업 목록"""
+
+    def __init__(self, max_workers: int, ttl: float):
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="autosurvey-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn) -> Job:
+        """fn(job)을 백그라운드에서 실행하고 Job 반환"""
+        self._prune()
+        job = Job(kind)
+        # 제출 시점의 contextvars(트레이싱 스팬 등)를 작업 스레드에 전달
+        context = contextvars.copy_context()
+        with self._lock:
+            self._jobs[job.id] = job
+        job._future = self._executor.submit(context.run, self._run, job, fn)
+        return job
+
+    @staticmethod
+    def _run(job: Job, fn):
+        if job._cancel.is_set():
+            job.finished_at = time.time()
+            job.status = "cancelled"
+            return
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = fn(job)
+            status = "done"
+        except JobCancelled:
+            status = "cancelled"
+        except Exception as e:
+            job.error = e
+            status = "failed"
+        job.finished_at = time.time()
+        job.status = status
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        return job.cancel() if job else False
+
+    def _prune(self):
+        now = time.time()
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.done and now - job.finished_at > self.ttl
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def stats(self) -> dict:
+        """상태별 작업 수"""
+        with self._lock:
+            counts = {status: 0 for status in JOB_STATUSES}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """프로세스 공용 작업 실행기 반환"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(Config.JOB_WORKERS, Config.JOB_TTL)
+    return _manager
@@ -0,0 +1,203 @@
+# utils/llm_cache.py
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from collections import defaultdict
+from rag.config import Config
+
+
+CACHE_MODES = ("off", "on", "record", "replay")
+
+
+class CacheMissError(RuntimeError):
+    """replay 모드에서 캐시에 없는 프롬프트가 호출된 경우"""
+
+
+class LLMCache:
+    """
+    SQLite 기반 LLM 응답 캐시
+
+    - 키: (모델명, temperature, 렌더링된 전체 프롬프트, 그 외 생성 설정) 해시
+    - mode
+        on     : 캐시 우선 조회, 없거나 만료되면 API 호출 후 저장
+        record : 항상 API 호출 후 결과를 저장 (기존 항목 덮어쓰기)
+        replay : 캐시만 사용 (TTL 무시), 없으면 CacheMissError
+    - TTL(초)과 최대 항목 수 제한, 초과 시 오래 사용되지 않은 항목부터 삭제
+    """
+
+    def __init__(self, path: str, mode: str = "on", ttl: int = 0, max_entries: int = 5000):
+        if mode not in CACHE_MODES or mode == "off":
+            raise ValueError(f"지원하지 않는 캐시 모드입니다: {mode}")
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                stage TEXT,
+                model TEXT,
+                response TEXT,
+                created_at REAL,
+                accessed_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+
+        # 단계별 적중 통계
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0, "writes": 0})
+
+    @staticmethod
+    def render_prompt(prompt) -> str:
+        """문자열 / 메시지 리스트 프롬프트를 키 생성용 문자열로 변환"""
+        if isinstance(prompt, str):
+            return prompt
+
+        rendered = []
+        for message in prompt:
+            if isinstance(message, dict):
+                rendered.append([message.get("role"), message.get("content")])
+            elif isinstance(message, (tuple, list)):
+                rendered.append(list(message))
+            else:
+                rendered.append([message.type, message.content])
+        return json.dumps(rendered, ensure_ascii=False)
+
+    @classmethod
+    def make_key(cls, model: str, params, prompt) -> str:
+        """
+        params: 생성 설정 dict (temperature, reasoning effort, 최대 토큰 등, 값이 None인 항목은 무시)
+        temperature 외 설정이 없으면 기존 키(모델명, temperature, 프롬프트)와 같음
+        """
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        parts = [model, params.pop("temperature", None), cls.render_prompt(prompt)]
+        if params:
+            parts.append(params)
+        raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, stage: str):
+        """캐시 조회 (없거나 만료되면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            expired = (
+                row is not None
+                and self.mode != "replay"
+                and self.ttl > 0
+                and time.time() - row[1] > self.ttl
+            )
+            if row is None or expired:
+                self._stats[stage]["misses"] += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self._stats[stage]["hits"] += 1
+            return row[0]
+
+    def put(self, key: str, stage: str, model: str, response: str):
+        """응답 저장 후 최대 항목 수 초과분 정리"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, stage, model, response, now, now),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+            self._stats[stage]["writes"] += 1
+
+    def lookup(self, key: str, stage: str, model: str):
+        """모드에 따라 캐시 조회 (replay 모드에서 없으면 CacheMissError)"""
+        if self.mode == "record":
+            with self._lock:
+                self._stats[stage]["misses"] += 1
+            return None
+
+        cached = self.get(key, stage)
+        if cached is None and self.mode == "replay":
+            raise CacheMissError(f"[{stage}] 캐시에 없는 요청입니다 (model={model}).")
+        return cached
+
+    def get_or_call(self, stage: str, model: str, params, prompt, fn) -> str:
+        """캐시를 거쳐 fn()(실제 API 호출)을 실행"""
+        key = self.make_key(model, params, prompt)
+        cached = self.lookup(key, stage, model)
+        if cached is not None:
+            return cached
+
+        response = fn()
+        self.put(key, stage, model, response)
+        return response
+
+    async def aget_or_call(self, stage: str, model: str, params, prompt, afn) -> str:
+        """get_or_call의 비동기 버전 (afn은 코루틴 함수)"""
+        key = self.make_key(model, params, prompt)
+        cached = self.lookup(key, stage, model)
+        if cached is not None:
+            return cached
+
+        response = await afn()
+        self.put(key, stage, model, response)
+        return response
+
+    def stats(self) -> dict:
+        """단계별 hit / miss / write 및 적중률"""
+        result = {}
+        for stage, s in self._stats.items():
+            total = s["hits"] + s["misses"]
+            result[stage] = {**s, "hit_rate": s["hits"] / total if total else 0.0}
+        return result
+
+    def report(self) -> str:
+        lines = [f"LLM 캐시 ({self.mode}) 단계별 적중 현황"]
+        for stage, s in self.stats().items():
+            lines.append(
+                f"  - {stage}: hit {s['hits']} / miss {s['misses']} "
+                f"(적중률 {s['hit_rate']:.0%})"
+            )
+        return "\n".join(lines)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """
+    프로세스 공용 캐시 반환 (Config.LLM_CACHE_MODE == "off"이면 None)
+    """
+    global _cache
+    if Config.LLM_CACHE_MODE == "off":
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache(
+                Config.LLM_CACHE_PATH,
+                mode=Config.LLM_CACHE_MODE,
+                ttl=Config.LLM_CACHE_TTL,
+                max_entries=Config.LLM_CACHE_MAX_ENTRIES,
+            )
+    return _cache
@@ -0,0 +1,251 @@
+# utils/llm_call.py
+import json
+import threading
+from collections import defaultdict
+from langchain_core.embeddings import Embeddings
+from langchain_core.output_parsers import StrOutputParser
+from utils.llm_cache import get_llm_cache
+from utils.rate_limiter import rate_limited, arate_limited
+from utils.ollama_manager import local_slot, alocal_slot
+from utils.tracing import span, current_span
+
+
+_str_parser = StrOutputParser()
+
+# 단계별 토큰 사용량 (cached_tokens: 제공자 측 프롬프트 캐시 적중 토큰)
+_usage = defaultdict(lambda: {"calls": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0})
+_usage_lock = threading.Lock()
+
+
+def record_usage(stage: str, input_tokens: int, cached_tokens: int, output_tokens: int):
+    with _usage_lock:
+        usage = _usage[stage]
+        usage["calls"] += 1
+        usage["input_tokens"] += input_tokens
+        usage["cached_tokens"] += cached_tokens
+        usage["output_tokens"] += output_tokens
+
+    current_span().add(input_tokens=input_tokens, cached_tokens=cached_tokens, output_tokens=output_tokens)
+
+
+def usage_stats() -> dict:
+    """단계별 토큰 사용량 및 프롬프트 캐시 적중률"""
+    with _usage_lock:
+        return {
+            stage: {
+                **u,
+                "cache_ratio": u["cached_tokens"] / u["input_tokens"] if u["input_tokens"] else 0.0,
+            }
+            for stage, u in _usage.items()
+        }
+
+
+def usage_report() -> str:
+    lines = ["단계별 토큰 사용량 (프롬프트 캐시 적중)"]
+    for stage, u in usage_stats().items():
+        lines.append(
+            f"  - {stage}: 호출 {u['calls']}회, 입력 {u['input_tokens']} "
+            f"(캐시 {u['cached_tokens']}, {u['cache_ratio']:.0%}), 출력 {u['output_tokens']}"
+        )
+    return "\n".join(lines)
+
+
+def _record_chat_usage(stage: str, message):
+    """AIMessage.usage_metadata에서 입력/캐시/출력 토큰 기록"""
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return
+    details = usage.get("input_token_details") or {}
+    record_usage(
+        stage,
+        usage.get("input_tokens", 0),
+        details.get("cache_read", 0) or 0,
+        usage.get("output_tokens", 0),
+    )
+
+
+def model_name_of(llm) -> str:
+    """ChatOpenAI(model_name) / ChatOllama(model) 공통 모델명 조회"""
+    return getattr(llm, "model_name", None) or getattr(llm, "model", "")
+
+
+# 응답에 영향을 주는 생성 설정 (ChatOpenAI / ChatOllama 필드명)
+GENERATION_PARAMS = (
+    "temperature", "top_p", "top_k", "seed", "stop",
+    "max_tokens", "max_completion_tokens", "num_predict", "num_ctx",
+    "reasoning_effort", "reasoning", "frequency_penalty", "presence_penalty", "repeat_penalty",
+    "format", "model_kwargs",
+)
+
+
+def generation_params(llm) -> dict:
+    """채팅 모델의 생성 설정 (캐시 키용, 설정하지 않은 항목은 제외)"""
+    params = {name: getattr(llm, name, None) for name in GENERATION_PARAMS}
+    return {name: value for name, value in params.items() if value not in (None, {}, [])}
+
+
+def call_cached(stage: str, model: str, params, prompt, fn) -> str:
+    """
+    모든 LLM 호출의 공통 진입점
+    캐시가 켜져 있으면 (model, 생성 설정, prompt) 기준으로 응답을 재사용
+
+    Args:
+        stage: 파이프라인 단계 이름 (통계 집계용)
+        model: 모델명
+        params: 생성 설정 dict (temperature, reasoning effort 등, 없으면 None)
+        prompt: 렌더링된 프롬프트 (문자열 또는 메시지 리스트)
+        fn: 실제 API 호출 함수 (응답 문자열 반환)
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return fn()
+    return cache.get_or_call(stage, model, params, prompt, fn)
+
+
+def chat_usage(message) -> int | None:
+    """AIMessage의 실제 사용 토큰 수"""
+    usage = getattr(message, "usage_metadata", None)
+    return usage.get("total_tokens") if usage else None
+
+
+def invoke_chat(stage: str, llm, prompt) -> str:
+    """LangChain 채팅 모델 호출 후 응답 텍스트 반환 (캐시 → 속도 제한/재시도 → API)"""
+    model = model_name_of(llm)
+
+    def call():
+        s.set(cache_hit=False)
+        with local_slot(model):
+            message = rate_limited(model, prompt, lambda: llm.invoke(prompt), usage_of=chat_usage)
+        _record_chat_usage(stage, message)
+        return _str_parser.invoke(message)
+
+    with span("llm", stage=stage, model=model, cache_hit=True) as s:
+        return call_cached(stage, model, generation_params(llm), prompt, call)
+
+
+def _stream_kwargs(llm) -> dict:
+    """OpenAI는 스트리밍 응답에 사용량을 포함하도록 요청"""
+    return {"stream_usage": True} if hasattr(llm, "stream_usage") else {}
+
+
+def stream_chat(stage: str, llm, prompt, on_text) -> str:
+    """
+    invoke_chat의 스트리밍 버전
+    조각이 도착할 때마다 지금까지의 전체 텍스트로 on_text 호출 (재시도 시 처음부터 다시 전달,
+    캐시 적중 시 전체 응답으로 한 번 호출). on_text에서 발생한 예외는 스트림을 중단함
+    """
+    model = model_name_of(llm)
+    streamed = []
+
+    def stream():
+        message = None
+        for chunk in llm.stream(prompt, **_stream_kwargs(llm)):
+            message = chunk if message is None else message + chunk
+            on_text(_str_parser.invoke(message))
+        return message
+
+    def call():
+        streamed.append(True)
+        s.set(cache_hit=False, streamed=True)
+        with local_slot(model):
+            message = rate_limited(model, prompt, stream, usage_of=chat_usage)
+        if message is None:
+            return ""
+        _record_chat_usage(stage, message)
+        return _str_parser.invoke(message)
+
+    with span("llm", stage=stage, model=model, cache_hit=True) as s:
+        text = call_cached(stage, model, generation_params(llm), prompt, call)
+        if not streamed:
+            on_text(text)
+        return text
+
+
+async def acall_cached(stage: str, model: str, params, prompt, afn) -> str:
+    """call_cached의 비동기 버전 (afn은 코루틴 함수)"""
+    cache = get_llm_cache()
+    if cache is None:
+        return await afn()
+    return await cache.aget_or_call(stage, model, params, prompt, afn)
+
+
+async def ainvoke_chat(stage: str, llm, prompt, on_call=None) -> str:
+    """
+    invoke_chat의 비동기 버전 (태스크 취소 시 진행 중인 요청도 함께 취소됨)
+    on_call: 캐시 적중 없이 실제 API를 호출할 때 호출 (지연 시간 표본 기록용)
+    """
+    model = model_name_of(llm)
+
+    async def acall():
+        s.set(cache_hit=False)
+        if on_call:
+            on_call()
+        async with alocal_slot(model):
+            message = await arate_limited(model, prompt, lambda: llm.ainvoke(prompt), usage_of=chat_usage)
+        _record_chat_usage(stage, message)
+        return _str_parser.invoke(message)
+
+    with span("llm", stage=stage, model=model, cache_hit=True) as s:
+        return await acall_cached(stage, model, generation_params(llm), prompt, acall)
+
+
+async def astream_chat(stage: str, llm, prompt, on_text, on_call=None) -> str:
+    """stream_chat의 비동기 버전 (on_call은 ainvoke_chat과 같음)"""
+    model = model_name_of(llm)
+    streamed = []
+
+    async def stream():
+        message = None
+        async for chunk in llm.astream(prompt, **_stream_kwargs(llm)):
+            message = chunk if message is None else message + chunk
+            on_text(_str_parser.invoke(message))
+        return message
+
+    async def acall():
+        streamed.append(True)
+        s.set(cache_hit=False, streamed=True)
+        if on_call:
+            on_call()
+        async with alocal_slot(model):
+            message = await arate_limited(model, prompt, stream, usage_of=chat_usage)
+        if message is None:
+            return ""
+        _record_chat_usage(stage, message)
+        return _str_parser.invoke(message)
+
+    with span("llm", stage=stage, model=model, cache_hit=True) as s:
+        text = await acall_cached(stage, model, generation_params(llm), prompt, acall)
+        if not streamed:
+            on_text(text)
+        return text
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    쿼리 임베딩을 LLM 캐시에 함께 저장하는 임베딩 래퍼
+    (replay 모드에서 검색 단계까지 오프라인으로 재현하기 위함)
+    """
+
+    def __init__(self, embeddings: Embeddings, stage: str = "embedding"):
+        self.embeddings = embeddings
+        self.stage = stage
+        # 차원을 줄인 임베딩이 전체 차원 캐시 항목을 재사용하지 않도록 모델명에 차원 포함
+        dimensions = getattr(embeddings, "dimensions", None)
+        self.model = f"{model_name_of(embeddings)}@{dimensions}" if dimensions else model_name_of(embeddings)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        with span("embedding", stage=self.stage, model=self.model, chars=len(text)):
+            if get_llm_cache() is None:
+                return self.embeddings.embed_query(text)
+
+            response = call_cached(
+                self.stage,
+                self.model,
+                None,
+                text,
+                lambda: json.dumps(self.embeddings.embed_query(text)),
+            )
+            return json.loads(response)
@@ -0,0 +1,255 @@
+# utils/ollama_manager.py
+"""
+Ollama 도메인 모델 관리 (로컬 서버)
+
+- 예열: 빈 프롬프트 /api/generate 요청으로 모델을 미리 메모리에 올림 (시작 시 preload, 도메인 분류 직후 warm)
+- keep_alive: 모델별 유지 시간을 예열 · 생성 요청에 함께 전달 (Config.OLLAMA_MODELS, 기본 Config.OLLAMA_KEEP_ALIVE)
+- 동시 요청 제한: 모델별 요청 수를 서버 병렬 처리 수(OLLAMA_NUM_PARALLEL)에 맞춰 제한하고 대기 시간 기록
+- 로드 · 해제 이벤트: /api/ps 조회 결과를 직전 조회와 비교해 기록
+"""
+import time
+import asyncio
+import threading
+from datetime import datetime
+from contextlib import contextmanager, asynccontextmanager, nullcontext
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from ollama import Client
+from rag.config import Config
+from utils.tracing import span, current_span
+
+
+class OllamaModelManager:
+    """프로세스 공용 Ollama 모델 관리자 (설정된 모델만 관리, 그 외 모델은 그대로 통과)"""
+
+    def __init__(self, base_url: str = None, models: dict = None):
+        self.base_url = base_url or Config.OLLAMA_BASE_URL
+        self.models = Config.OLLAMA_MODELS if models is None else models
+        self.client = Client(host=self.base_url, timeout=Config.OLLAMA_LOAD_TIMEOUT)
+
+        self._lock = threading.Lock()
+        self._semaphores = {model: threading.BoundedSemaphore(self.parallel(model)) for model in self.models}
+        self._loading = {}          # 모델 → 진행 중인 예열 Future
+        self._loaded = {}           # 모델 → 만료 시각(epoch 초), 마지막 /api/ps 조회 기준
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.models)), thread_name_prefix="autosurvey-ollama")
+        self.events = deque(maxlen=200)     # (시각, 모델, 이벤트, 상세)
+        self._metrics = defaultdict(lambda: {
+            "requests": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0,
+            "loads": 0,
+            "load_seconds_total": 0.0,
+            "evictions": 0,
+            "warm_hits": 0,
+        })
+
+    # === 설정 ===
+    def is_managed(self, model: str) -> bool:
+        return model in self.models
+
+    def keep_alive(self, model: str):
+        return (self.models.get(model) or {}).get("keep_alive", Config.OLLAMA_KEEP_ALIVE)
+
+    def parallel(self, model: str) -> int:
+        return int((self.models.get(model) or {}).get("parallel", Config.OLLAMA_PARALLEL))
+
+    def _event(self, model: str, event: str, **detail):
+        self.events.append((time.time(), model, event, detail))
+        if event in ("load", "evict", "load_error"):
+            print(f"[ollama] {model} {event} {detail if detail else ''}".rstrip())
+
+    # === 로드 상태 ===
+    def refresh(self) -> dict:
+        """/api/ps 조회 → {모델: 만료 시각}, 직전 조회 이후 사라진 모델은 evict 이벤트로 기록"""
+        response = self.client.ps()
+        loaded = {}
+        for item in response.models:
+            expires_at = item.expires_at.timestamp() if isinstance(item.expires_at, datetime) else float("inf")
+            name = item.model or item.name
+            loaded[name] = expires_at
+            # 설정에는 태그 없이 적은 모델명 ("AutoSurvey-Edu" = "AutoSurvey-Edu:latest")
+            if name.endswith(":latest"):
+                loaded[name.removesuffix(":latest")] = expires_at
+
+        with self._lock:
+            previous = self._loaded
+            self._loaded = loaded
+            for model in self.models:
+                if model in previous and model not in loaded:
+                    self._metrics[model]["evictions"] += 1
+                    self._event(model, "evict", expired=previous[model] <= time.time())
+        return dict(loaded)
+
+    def is_loaded(self, model: str) -> bool:
+        """마지막 조회 기준 로드 상태 (만료 시각이 지났으면 해제된 것으로 간주)"""
+        with self._lock:
+            return self._loaded.get(model, 0) > time.time()
+
+    def load(self, model: str) -> float:
+        """모델을 메모리에 올리고 keep_alive 적용, 로드 소요 시간(초) 반환 (이미 로드되어 있으면 유지 시간만 갱신)"""
+        start = time.perf_counter()
+        with span("ollama_load", model=model) as s:
+            response = self.client.generate(model=model, keep_alive=self.keep_alive(model))
+            elapsed = time.perf_counter() - start
+            # 서버가 보고한 모델 로드 시간 (이미 로드되어 있었으면 거의 0)
+            load_seconds = (response.load_duration or 0) / 1e9
+            s.set(load_seconds=round(load_seconds, 3))
+
+        with self._lock:
+            metrics = self._metrics[model]
+            metrics["loads"] += 1
+            metrics["load_seconds_total"] += load_seconds
+        self._event(model, "load", seconds=round(load_seconds, 2), request_seconds=round(elapsed, 2))
+        self.refresh()
+        return load_seconds
+
+    def _warm(self, model: str) -> float | None:
+        """로드 상태를 다시 조회해 로드되어 있지 않을 때만 로드 (오류는 이벤트로만 기록)"""
+        try:
+            self.refresh()
+            if self.is_loaded(model):
+                with self._lock:
+                    self._metrics[model]["warm_hits"] += 1
+                return None
+            return self.load(model)
+        except Exception as e:
+            self._event(model, "load_error", error=f"{type(e).__name__}: {e}")
+        finally:
+            with self._lock:
+                self._loading.pop(model, None)
+
+    def warm(self, model: str):
+        """
+        백그라운드 예열 (관리 대상이 아니면 None, 이미 로드되어 있으면 로드하지 않음)
+        같은 모델의 예열이 진행 중이면 그 Future 반환
+        """
+        if not self.is_managed(model):
+            return None
+        with self._lock:
+            future = self._loading.get(model)
+            if future is None:
+                future = self._executor.submit(self._warm, model)
+                self._loading[model] = future
+        return future
+
+    def preload(self, wait: bool = False) -> list:
+        """설정된 모델 중 preload가 꺼져 있지 않은 모델을 모두 예열 (서버에 연결할 수 없으면 경고만 출력)"""
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"⚠️ Ollama 서버({self.base_url})에 연결할 수 없어 예열을 건너뜁니다: {type(e).__name__}: {e}")
+            return []
+        futures = [
+            self.warm(model) for model, options in self.models.items()
+            if (options or {}).get("preload", True)
+        ]
+        if wait:
+            for future in futures:
+                future.result()
+        return futures
+
+    # === 동시 요청 제한 ===
+    def _record_wait(self, model: str, wait: float):
+        with self._lock:
+            metrics = self._metrics[model]
+            metrics["requests"] += 1
+            metrics["queue_wait_total"] += wait
+            metrics["queue_wait_max"] = max(metrics["queue_wait_max"], wait)
+        if wait > 0.001:
+            current_span().add(local_queue_wait=wait)
+
+    @contextmanager
+    def slot(self, model: str):
+        """모델별 동시 요청 수 제한 (관리 대상이 아니면 제한 없음)"""
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            yield
+            return
+        start = time.monotonic()
+        semaphore.acquire()
+        self._record_wait(model, time.monotonic() - start)
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    @asynccontextmanager
+    async def aslot(self, model: str):
+        """
+        slot의 비동기 버전
+        스레드 세마포어를 이벤트 루프를 막지 않고 짧은 간격으로 확인 (취소되어도 슬롯이 새지 않음)
+        """
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            yield
+            return
+        start = time.monotonic()
+        while not semaphore.acquire(blocking=False):
+            await asyncio.sleep(Config.OLLAMA_SLOT_POLL)
+        self._record_wait(model, time.monotonic() - start)
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    # === 지표 ===
+    def metrics(self) -> dict:
+        with self._lock:
+            loaded = dict(self._loaded)
+            return {
+                model: {
+                    **self._metrics[model],
+                    "parallel": self.parallel(model),
+                    "keep_alive": self.keep_alive(model),
+                    "loaded": loaded.get(model, 0) > time.time(),
+                }
+                for model in self.models
+            }
+
+    def report(self) -> str:
+        lines = [f"Ollama 도메인 모델 현황 ({self.base_url})"]
+        for model, m in self.metrics().items():
+            state = "로드됨" if m["loaded"] else "미로드"
+            lines.append(
+                f"  - {model} [{state}, 병렬 {m['parallel']}, keep_alive {m['keep_alive']}]: "
+                f"요청 {m['requests']}건, 대기 합계 {m['queue_wait_total']:.1f}초 / 최대 {m['queue_wait_max']:.1f}초, "
+                f"로드 {m['loads']}회 ({m['load_seconds_total']:.1f}초), 해제 {m['evictions']}회, 예열 생략 {m['warm_hits']}회"
+            )
+        return "\n".join(lines)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_ollama_manager() -> OllamaModelManager:
+    """프로세스 공용 관리자 반환"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = OllamaModelManager()
+    return _manager
+
+
+def local_models_enabled() -> bool:
+    """도메인 모델을 실제로 호출하는 설정인지 (static 디스패치는 gpt-5만 사용)"""
+    return Config.GENERATION_DISPATCH != "static"
+
+
+def preload_local_models() -> list:
+    """시작 시 예열 (Config.OLLAMA_PRELOAD: on / off / auto=도메인 모델을 호출하는 디스패치일 때만)"""
+    mode = Config.OLLAMA_PRELOAD
+    if mode == "on" or (mode == "auto" and local_models_enabled()):
+        return get_ollama_manager().preload()
+    return []
+
+
+def local_slot(model: str):
+    """llm_call 공통 진입점용 동시 요청 제한 (관리 대상 모델만)"""
+    manager = get_ollama_manager()
+    return manager.slot(model) if manager.is_managed(model) else nullcontext()
+
+
+def alocal_slot(model: str):
+    manager = get_ollama_manager()
+    return manager.aslot(model) if manager.is_managed(model) else nullcontext()
@@ -0,0 +1,306 @@
+# utils/rate_limiter.py
+import math
+import time
+import asyncio
+import random
+import threading
+from functools import lru_cache
+from collections import defaultdict
+import openai
+import tiktoken
+from langchain_core.embeddings import Embeddings
+from utils.llm_cache import LLMCache
+from rag.config import Config
+from utils.tracing import span, current_span
+
+
+# 재시도 대상 오류 (429, 5xx, 연결/타임아웃)
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+@lru_cache(maxsize=None)
+def _default_encoding():
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # 인코딩 파일을 받을 수 없는 오프라인 환경 (벤치마크 등)
+        print("⚠️ tiktoken 인코딩을 불러올 수 없어 글자 수로 토큰 수를 추정합니다.")
+        return None
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        return _default_encoding()
+
+
+def count_tokens(model: str, text: str) -> int:
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text)    # 한글 기준 과대 추정 (한도 초과 방지)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def estimate_tokens(model: str, prompt, output_tokens: int = None) -> int:
+    """tiktoken으로 입력 토큰 수를 추정하고 예상 출력 토큰을 더함"""
+    if output_tokens is None:
+        output_tokens = Config.RATE_LIMIT_OUTPUT_TOKENS
+    text = LLMCache.render_prompt(prompt)
+    return count_tokens(model, text) + output_tokens
+
+
+class TokenBucket:
+    """
+    분당 한도를 초당 보충량으로 환산한 토큰 버킷
+    잔량이 부족해도 먼저 차감(예약)하고, 부족분이 채워질 때까지의 대기 시간을 반환
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.refill_rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.refill_rate)
+        self.updated = now
+        self.level -= amount
+        return max(0.0, -self.level / self.refill_rate)
+
+    def refund(self, amount: float):
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """
+    모델별 requests/min · tokens/min 공용 제한기 (프로세스 단위)
+    한도가 설정되지 않은 모델(Ollama 로컬 모델 등)은 제한하지 않음
+    """
+
+    def __init__(self, limits: dict):
+        self._lock = threading.Lock()
+        self._buckets = {
+            model: (TokenBucket(limit["rpm"]), TokenBucket(limit["tpm"]))
+            for model, limit in limits.items()
+        }
+        self._metrics = defaultdict(lambda: {
+            "requests": 0,
+            "retries": 0,
+            "throttled": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0,
+        })
+
+    def reserve(self, model: str, tokens: int, requests: int = 1) -> float:
+        """요청 슬롯을 예약하고 필요한 대기 시간(초)을 반환"""
+        with self._lock:
+            metrics = self._metrics[model]
+            metrics["requests"] += requests
+
+            buckets = self._buckets.get(model)
+            if buckets is None:
+                return 0.0
+
+            now = time.monotonic()
+            request_bucket, token_bucket = buckets
+            wait = max(request_bucket.reserve(requests, now), token_bucket.reserve(tokens, now))
+
+            metrics["queue_wait_total"] += wait
+            metrics["queue_wait_max"] = max(metrics["queue_wait_max"], wait)
+            return wait
+
+    def acquire(self, model: str, tokens: int, requests: int = 1) -> float:
+        wait = self.reserve(model, tokens, requests)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, model: str, tokens: int, requests: int = 1) -> float:
+        wait = self.reserve(model, tokens, requests)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def reconcile(self, model: str, estimated: int, actual: int):
+        """실제 사용 토큰이 추정보다 적으면 차이만큼 반환"""
+        with self._lock:
+            buckets = self._buckets.get(model)
+            if buckets is not None and actual < estimated:
+                buckets[1].refund(estimated - actual)
+
+    def record_retry(self, model: str, throttled: bool):
+        with self._lock:
+            self._metrics[model]["retries"] += 1
+            if not throttled:
+                return
+            self._metrics[model]["throttled"] += 1
+
+            # 서버 측 한도에 걸렸다면 잔량을 비워 이후 요청 속도를 늦춤
+            buckets = self._buckets.get(model)
+            if buckets is not None:
+                for bucket in buckets:
+                    bucket.level = min(bucket.level, 0.0)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {model: dict(m) for model, m in self._metrics.items()}
+
+    def report(self) -> str:
+        lines = ["OpenAI 호출 제한 현황"]
+        for model, m in self.metrics().items():
+            lines.append(
+                f"  - {model}: 요청 {m['requests']}건, 재시도 {m['retries']}건 (429 {m['throttled']}건), "
+                f"대기 합계 {m['queue_wait_total']:.1f}초 / 최대 {m['queue_wait_max']:.1f}초"
+            )
+        return "\n".join(lines)
+
+
+def _retry_after(error) -> float | None:
+    """응답 헤더의 retry-after-ms / retry-after 값(초)"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+def backoff_delay(attempt: int, error=None) -> float:
+    """Retry-After가 있으면 우선 사용, 없으면 full jitter 지수 백오프"""
+    retry_after = _retry_after(error) if error is not None else None
+    if retry_after is not None:
+        return retry_after + random.uniform(0, 0.1 * retry_after + 0.05)
+
+    cap = min(Config.RETRY_MAX_DELAY, Config.RETRY_BASE_DELAY * 2 ** attempt)
+    return random.uniform(0, cap)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """프로세스 공용 제한기 반환"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(Config.RATE_LIMITS)
+    return _limiter
+
+
+def rate_limited(model: str, prompt, fn, usage_of=None, tokens: int = None, requests: int = 1):
+    """
+    제한기 대기 → fn() 호출 → 재시도 가능한 오류 시 백오프 후 재호출
+
+    Args:
+        model: 모델명 (한도 조회 키)
+        prompt: 토큰 추정용 프롬프트
+        fn: 실제 API 호출 함수
+        usage_of: 응답에서 실제 사용 토큰 수를 꺼내는 함수 (추정치 보정용)
+        tokens: 토큰 수를 직접 지정할 경우
+        requests: 실제 API 요청 수 (배치 임베딩 등)
+    """
+    limiter = get_rate_limiter()
+    if tokens is None:
+        tokens = estimate_tokens(model, prompt)
+
+    for attempt in range(Config.RETRY_MAX_ATTEMPTS + 1):
+        wait = limiter.acquire(model, tokens, requests)
+        if wait > 0:
+            current_span().add(queue_wait=wait)
+        try:
+            result = fn()
+        except RETRYABLE_ERRORS as e:
+            # 실패한 시도의 토큰 예약은 반환 (요청 수는 실제로 보냈으므로 그대로 차감)
+            limiter.reconcile(model, tokens, 0)
+            if attempt == Config.RETRY_MAX_ATTEMPTS:
+                raise
+            limiter.record_retry(model, throttled=isinstance(e, openai.RateLimitError))
+            current_span().add(retries=1)
+            delay = backoff_delay(attempt, e)
+            print(f"⚠️ {model} 호출 실패 ({type(e).__name__}), {delay:.1f}초 후 재시도 ({attempt + 1}/{Config.RETRY_MAX_ATTEMPTS})")
+            time.sleep(delay)
+            continue
+        except Exception:
+            # 재시도하지 않는 오류도 예약 반환 (취소된 요청은 이미 토큰을 사용했을 수 있어 그대로 둠)
+            limiter.reconcile(model, tokens, 0)
+            raise
+
+        if usage_of is not None:
+            actual = usage_of(result)
+            if actual:
+                limiter.reconcile(model, tokens, actual)
+        return result
+
+
+async def arate_limited(model: str, prompt, afn, usage_of=None, tokens: int = None, requests: int = 1):
+    """rate_limited의 비동기 버전 (afn은 코루틴 함수)"""
+    limiter = get_rate_limiter()
+    if tokens is None:
+        tokens = estimate_tokens(model, prompt)
+
+    for attempt in range(Config.RETRY_MAX_ATTEMPTS + 1):
+        wait = await limiter.aacquire(model, tokens, requests)
+        if wait > 0:
+            current_span().add(queue_wait=wait)
+        try:
+            result = await afn()
+        except RETRYABLE_ERRORS as e:
+            # 실패한 시도의 토큰 예약은 반환 (요청 수는 실제로 보냈으므로 그대로 차감)
+            limiter.reconcile(model, tokens, 0)
+            if attempt == Config.RETRY_MAX_ATTEMPTS:
+                raise
+            limiter.record_retry(model, throttled=isinstance(e, openai.RateLimitError))
+            current_span().add(retries=1)
+            delay = backoff_delay(attempt, e)
+            print(f"⚠️ {model} 호출 실패 ({type(e).__name__}), {delay:.1f}초 후 재시도 ({attempt + 1}/{Config.RETRY_MAX_ATTEMPTS})")
+            await asyncio.sleep(delay)
+            continue
+        except Exception:
+            # 재시도하지 않는 오류도 예약 반환 (취소된 요청은 이미 토큰을 사용했을 수 있어 그대로 둠)
+            limiter.reconcile(model, tokens, 0)
+            raise
+
+        if usage_of is not None:
+            actual = usage_of(result)
+            if actual:
+                limiter.reconcile(model, tokens, actual)
+        return result
+
+
+class RateLimitedEmbeddings(Embeddings):
+    """OpenAI 임베딩 호출을 공용 제한기에 통과시키는 래퍼"""
+
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+        self.model = embeddings.model
+        self.dimensions = getattr(embeddings, "dimensions", None)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        tokens = sum(count_tokens(self.model, t) for t in texts)
+        requests = max(1, math.ceil(len(texts) / getattr(self.embeddings, "chunk_size", 1000)))
+        with span("embedding", stage="index", model=self.model, texts=len(texts), input_tokens=tokens):
+            return rate_limited(
+                self.model, None, lambda: self.embeddings.embed_documents(texts),
+                tokens=tokens, requests=requests,
+            )
+
+    def embed_query(self, text: str) -> list[float]:
+        return rate_limited(
+            self.model, None, lambda: self.embeddings.embed_query(text),
+            tokens=estimate_tokens(self.model, text, output_tokens=0),
+        )
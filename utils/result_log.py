@@ -0,0 +1,57 @@
+# utils/result_log.py
+import os
+import json
+from pathlib import Path
+
+
+class ResultLog:
+    """
+    일괄 처리 결과를 항목마다 JSONL에 이어 쓰는 기록기
+    - 행마다 flush 하므로 중단되어도 이미 처리된 결과는 보존
+    - 재실행 시 completed()로 완료된 id를 건너뜀 (같은 id는 마지막 기록 기준)
+    """
+
+    def __init__(self, path, done_statuses):
+        self.path = Path(path)
+        self.done_statuses = set(done_statuses)
+        self._file = None
+
+    def completed(self) -> set:
+        completed = set()
+        if not self.path.exists():
+            return completed
+
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue    # 중단 시 잘린 마지막 줄
+                if row.get("status") in self.done_statuses:
+                    completed.add(row["id"])
+                else:
+                    completed.discard(row["id"])
+        return completed
+
+    def _ends_with_newline(self) -> bool:
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return True
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        truncated = not self._ends_with_newline()
+        self._file = open(self.path, "a", encoding="utf-8")
+        if truncated:
+            self._file.write("\n")
+        return self
+
+    def write(self, row: dict):
+        self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def __exit__(self, *exc):
+        self._file.close()
+        self._file = None
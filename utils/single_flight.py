@@ -0,0 +1,80 @@
+# utils/single_flight.py
+"""
+동일 요청 병합 (single-flight)
+
+같은 키의 요청이 진행 중이면 새로 계산하지 않고 진행 중인 계산의 결과(또는 예외)를 함께 받음
+계산이 끝나면 키를 비우므로 결과를 보관하는 캐시와는 다름 (응답 재사용은 utils/llm_cache 담당)
+"""
+import json
+import hashlib
+import threading
+from collections import Counter
+from concurrent.futures import Future
+
+
+def make_key(*parts) -> str:
+    """JSON 직렬화 가능한 값들로 요청 키 생성 (dict 키 순서 무관)"""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def normalize(value):
+    """문자열 공백을 정리해 표기만 다른 같은 요청이 같은 키를 갖도록 함"""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {key: normalize(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    return value
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}            # 키 → 진행 중인 계산의 Future
+        self._stats = Counter()     # 작업별 leader(실제 계산) / shared(병합) 수
+
+    def do(self, key: str, fn, name: str = "default") -> tuple:
+        """
+        (결과, 병합 여부) 반환
+
+        Args:
+            key: 요청 키 (make_key 참고)
+            fn: 실제 계산 함수
+            name: 통계 집계용 작업 이름
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            self._stats[(name, "leader" if leader else "shared")] += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict:
+        """작업별 실제 계산 수와 병합된 요청 수"""
+        with self._lock:
+            names = {name for name, _ in self._stats}
+            return {
+                name: {"leader": self._stats[(name, "leader")], "shared": self._stats[(name, "shared")]}
+                for name in sorted(names)
+            }
@@ -0,0 +1,223 @@
+# utils/tokenizer.py
+import re
+import threading
+from pathlib import Path
+from collections import Counter
+from functools import lru_cache
+from rag.config import Config
+
+
+_HANGUL = re.compile(r"[가-힣]+")
+_WORD = re.compile(r"[가-힣]+|[A-Za-z]+|[0-9]+")
+
+# 어절 끝에서 떼어낼 조사/어미 (긴 것부터 검사)
+JOSA_SUFFIXES = sorted([
+    "으로써", "으로서", "에서는", "에게서", "이라는", "이라고", "입니다", "습니다", "했습니다",
+    "하였다", "합니다", "에서", "에게", "으로", "로서", "로써", "부터", "까지", "처럼", "보다",
+    "이나", "이며", "이고", "라는", "라고", "하는", "하고", "하여", "해서", "했다", "한다",
+    "은", "는", "이", "가", "을", "를", "의", "에", "와", "과", "도", "로", "만", "들", "한", "할",
+], key=len, reverse=True)
+
+
+def strip_josa(word: str) -> str:
+    """어절 끝의 조사/어미를 한 번 제거 (남는 길이가 2자 이상일 때만)"""
+    for suffix in JOSA_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+            return word[: -len(suffix)]
+    return word
+
+
+class BaseTokenizer:
+    """
+    키워드 추출(nouns)과 BM25 색인(tokenize)이 공유하는 토크나이저 인터페이스
+    인스턴스는 BM25 인덱스와 함께 pickle 되므로 무거운 자원은 지연 로딩
+    """
+
+    name = "base"
+
+    def tokenize(self, text: str) -> list[str]:
+        raise NotImplementedError
+
+    def nouns(self, text: str) -> list[str]:
+        raise NotImplementedError
+
+    def nouns_many(self, texts: list[str]) -> list[list[str]]:
+        return [self.nouns(t) for t in texts]
+
+    def warmup(self):
+        pass
+
+    def __call__(self, text: str) -> list[str]:
+        return self.tokenize(text)
+
+
+class OktTokenizer(BaseTokenizer):
+    """konlpy Okt 형태소 분석 (JVM 필요, 정확도 우선)"""
+
+    name = "okt"
+
+    # 배치 분석 시 문서 경계를 표시하는 토큰 (Okt가 Alpha로 태깅)
+    DOC_SEPARATOR = "QQDOCSEPQQ"
+    CONTENT_POS = {"Noun", "Verb", "Adjective", "Alpha", "Number"}
+
+    def __init__(self):
+        self._okt = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def _pos(self, text: str) -> list:
+        # Okt(JVM) 호출은 스레드 안전하지 않으므로 직렬화
+        with self._lock:
+            if self._okt is None:
+                from konlpy.tag import Okt
+                self._okt = Okt()
+            return self._okt.pos(text, norm=True, stem=True)
+
+    def warmup(self):
+        """JVM 기동 및 형태소 분석기 초기 로딩을 미리 수행"""
+        self._pos("설문조사 형태소 분석기 초기화")
+
+    def tokenize(self, text: str) -> list[str]:
+        return [word for word, pos in self._pos(text) if pos in self.CONTENT_POS]
+
+    def nouns(self, text: str) -> list[str]:
+        return [word for word, pos in self._pos(text) if pos == "Noun"]
+
+    def nouns_many(self, texts: list[str]) -> list[list[str]]:
+        """
+        여러 텍스트를 형태소 분석기에 한 번에 통과시켜 명사 추출
+        (텍스트 사이에 구분 토큰을 넣어 결합한 뒤 분석 결과를 다시 분할)
+        """
+        if not texts:
+            return []
+
+        joined = f" {self.DOC_SEPARATOR} ".join(texts)
+        groups = [[]]
+        for word, pos in self._pos(joined):
+            if word == self.DOC_SEPARATOR:
+                groups.append([])
+            elif pos == "Noun":
+                groups[-1].append(word)
+
+        # 구분 토큰이 변형된 경우 개별 분석으로 대체
+        if len(groups) != len(texts):
+            return [self.nouns(t) for t in texts]
+        return groups
+
+
+class NgramTokenizer(BaseTokenizer):
+    """
+    순수 Python 정규식 + 문자 n-gram 토크나이저 (JVM 불필요)
+    한글 어절은 문자 bigram으로, 영문/숫자는 단어 단위로 분리
+    """
+
+    name = "ngram"
+
+    def __init__(self, n: int = 2):
+        self.n = n
+
+    def tokenize(self, text: str) -> list[str]:
+        tokens = []
+        for word in _WORD.findall(text.lower()):
+            if not _HANGUL.fullmatch(word) or len(word) <= self.n:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + self.n] for i in range(len(word) - self.n + 1))
+        return tokens
+
+    def nouns(self, text: str) -> list[str]:
+        # 품사 정보가 없으므로 조사/어미를 떼어낸 어절을 명사 후보로 사용
+        return [strip_josa(word) for word in _HANGUL.findall(text)]
+
+
+class DictionaryNounTokenizer(BaseTokenizer):
+    """
+    명사 사전 기반 추출기 (JVM 불필요)
+    어절마다 사전에 있는 가장 긴 접두 명사를 찾고, 없으면 조사/어미를 제거
+    어절 단위 결과는 캐시되므로 반복되는 어휘일수록 빠름
+    """
+
+    name = "dict"
+
+    def __init__(self, dict_path=None):
+        self.dict_path = str(dict_path or Config.NOUN_DICT)
+        self._vocab = None
+
+    def __getstate__(self):
+        return {"dict_path": self.dict_path}
+
+    def __setstate__(self, state):
+        self.__init__(state["dict_path"])
+
+    @property
+    def vocab(self) -> frozenset:
+        if self._vocab is None:
+            path = Path(self.dict_path)
+            if path.exists():
+                self._vocab = frozenset(w for w in path.read_text(encoding="utf-8").split() if w)
+            else:
+                print(f"⚠️ 명사 사전이 없습니다 ({path}), 조사 제거 규칙만 사용")
+                self._vocab = frozenset()
+            self._max_len = max((len(w) for w in self._vocab), default=0)
+        return self._vocab
+
+    @lru_cache(maxsize=100_000)
+    def _noun_of(self, word: str) -> str:
+        vocab = self.vocab
+        for end in range(min(len(word), self._max_len), 1, -1):
+            if word[:end] in vocab:
+                return word[:end]
+        return strip_josa(word)
+
+    def tokenize(self, text: str) -> list[str]:
+        return [
+            self._noun_of(word) if _HANGUL.fullmatch(word) else word
+            for word in _WORD.findall(text.lower())
+        ]
+
+    def nouns(self, text: str) -> list[str]:
+        return [self._noun_of(word) for word in _HANGUL.findall(text)]
+
+
+TOKENIZERS = {
+    OktTokenizer.name: OktTokenizer,
+    NgramTokenizer.name: NgramTokenizer,
+    DictionaryNounTokenizer.name: DictionaryNounTokenizer,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_tokenizer(name: str = None) -> BaseTokenizer:
+    """이름별 공용 토크나이저 (기본값: Config.TOKENIZER)"""
+    name = name or Config.TOKENIZER
+    if name not in TOKENIZERS:
+        raise ValueError(f"지원하지 않는 토크나이저입니다: {name} ({', '.join(TOKENIZERS)})")
+
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = TOKENIZERS[name]()
+    return _instances[name]
+
+
+def build_noun_dictionary(texts: list[str], path=None, min_count: int = 2) -> Path:
+    """
+    코퍼스를 Okt로 한 번 분석해 명사 사전 파일 생성 (dict 토크나이저용, 오프라인 1회)
+    """
+    okt = OktTokenizer()
+    counts = Counter()
+    for i in range(0, len(texts), 100):
+        for nouns in okt.nouns_many(texts[i:i + 100]):
+            counts.update(n for n in nouns if len(n) > 1)
+
+    path = Path(path or Config.NOUN_DICT)
+    words = sorted(w for w, c in counts.items() if c >= min_count)
+    path.write_text("\n".join(words), encoding="utf-8")
+    print(f"명사 사전 저장 완료: {path} ({len(words)}개)")
+    return path
@@ -0,0 +1,235 @@
+# utils/tracing.py
+"""
+파이프라인 단계별 중첩 타이밍 스팬 + 지표
+
+    with span("retrieve", k=3) as s:
+        ...
+        s.set(doc_ids=[...])          # 속성 기록
+        s.add(input_tokens=120)       # 수치 누적
+
+- 현재 스팬은 contextvars로 전달 (asyncio 태스크 · asyncio.to_thread 에도 이어짐)
+- 최상위 스팬이 끝나면 전체 트리를 JSONL 한 줄로 기록하고 Prometheus 텍스트 지표 갱신
+- 비활성화(AUTOSURVEY_TRACING=off) 시 span()은 공용 no-op 객체만 반환
+"""
+import json
+import time
+import uuid
+import threading
+import contextvars
+from pathlib import Path
+from contextlib import contextmanager
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from rag.config import Config
+
+
+# 스팬 지속 시간 히스토그램 구간(초)
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# 스팬 간 합산되는 토큰 · 재시도 속성
+COUNTER_ATTRS = ("input_tokens", "cached_tokens", "output_tokens", "retries")
+
+
+class Span:
+    def __init__(self, name: str, parent: "Span" = None, **attrs):
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.attrs = attrs
+        self.children = []
+        self.start = time.perf_counter()
+        self.started_at = time.time()
+        self.duration = None
+        if parent is not None:
+            parent.children.append(self)
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, **values):
+        for key, value in values.items():
+            self.attrs[key] = self.attrs.get(key, 0) + value
+
+    def total(self, key: str):
+        """자신과 하위 스팬의 수치 속성 합계"""
+        return self.attrs.get(key, 0) + sum(child.total(key) for child in self.children)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "attrs": self.attrs,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+    def breakdown(self, depth: int = 0) -> list[dict]:
+        """단계별 소요 시간 표 (들여쓰기 깊이 포함)"""
+        rows = [{
+            "depth": depth,
+            "name": self.name,
+            "ms": round((self.duration or 0) * 1000, 1),
+            **{key: self.total(key) for key in COUNTER_ATTRS if self.total(key)},
+        }]
+        for child in self.children:
+            rows.extend(child.breakdown(depth + 1))
+        return rows
+
+
+class _NoopSpan:
+    """비활성화 시 반환되는 공용 스팬 (모든 기록을 무시)"""
+
+    name = None
+    trace_id = None
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, **values):
+        pass
+
+    def breakdown(self, depth: int = 0) -> list:
+        return []
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current = contextvars.ContextVar("autosurvey_span", default=None)
+
+
+class Tracer:
+    """완료된 트레이스를 JSONL로 기록하고 Prometheus 지표를 집계"""
+
+    def __init__(self, trace_path=None, metrics_path=None):
+        self.trace_path = Path(trace_path) if trace_path else None
+        self.metrics_path = Path(metrics_path) if metrics_path else None
+        self._lock = threading.Lock()
+        self._durations = defaultdict(lambda: [0] * (len(DURATION_BUCKETS) + 1))
+        self._duration_sum = defaultdict(float)
+        self._errors = defaultdict(int)
+        self._counters = defaultdict(int)     # (지표명, stage) → 값
+
+    def _observe(self, span: Span):
+        buckets = self._durations[span.name]
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if span.duration <= bound:
+                buckets[i] += 1
+        buckets[-1] += 1
+        self._duration_sum[span.name] += span.duration
+        if "error" in span.attrs:
+            self._errors[span.name] += 1
+
+        stage = span.attrs.get("stage", span.name)
+        for key in COUNTER_ATTRS:
+            if span.attrs.get(key):
+                self._counters[(key, stage)] += span.attrs[key]
+
+        for child in span.children:
+            self._observe(child)
+
+    def export(self, root: Span):
+        with self._lock:
+            self._observe(root)
+            if self.trace_path is not None:
+                self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.trace_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"trace_id": root.trace_id, **root.to_dict()}, ensure_ascii=False, default=str) + "\n")
+            if self.metrics_path is not None:
+                self.metrics_path.parent.mkdir(parents=True, exist_ok=True)
+                self.metrics_path.write_text(self._metrics_text(), encoding="utf-8")
+
+    def _metrics_text(self) -> str:
+        lines = [
+            "# HELP autosurvey_span_duration_seconds Pipeline span duration",
+            "# TYPE autosurvey_span_duration_seconds histogram",
+        ]
+        for name, buckets in sorted(self._durations.items()):
+            for bound, count in zip(DURATION_BUCKETS, buckets):
+                lines.append(f'autosurvey_span_duration_seconds_bucket{{span="{name}",le="{bound}"}} {count}')
+            lines.append(f'autosurvey_span_duration_seconds_bucket{{span="{name}",le="+Inf"}} {buckets[-1]}')
+            lines.append(f'autosurvey_span_duration_seconds_sum{{span="{name}"}} {self._duration_sum[name]:.6f}')
+            lines.append(f'autosurvey_span_duration_seconds_count{{span="{name}"}} {buckets[-1]}')
+
+        lines += ["# HELP autosurvey_span_errors_total Spans ended by an exception",
+                  "# TYPE autosurvey_span_errors_total counter"]
+        for name, count in sorted(self._errors.items()):
+            lines.append(f'autosurvey_span_errors_total{{span="{name}"}} {count}')
+
+        for key in COUNTER_ATTRS:
+            metric = f"autosurvey_llm_{key}_total"
+            lines += [f"# HELP {metric} LLM {key.replace('_', ' ')} per stage", f"# TYPE {metric} counter"]
+            for (counter, stage), value in sorted(self._counters.items()):
+                if counter == key:
+                    lines.append(f'{metric}{{stage="{stage}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def metrics_text(self) -> str:
+        with self._lock:
+            return self._metrics_text()
+
+
+_tracer = Tracer(Config.TRACE_PATH, Config.METRICS_PATH) if Config.TRACING == "on" else None
+
+
+def tracing_enabled() -> bool:
+    return _tracer is not None
+
+
+def current_span():
+    """현재 스팬 (없거나 비활성화면 no-op)"""
+    return _current.get() or NOOP_SPAN
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """중첩 타이밍 스팬 (최상위 스팬 종료 시 내보내기)"""
+    if _tracer is None:
+        yield NOOP_SPAN
+        return
+
+    parent = _current.get()
+    s = Span(name, parent, **attrs)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.set(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        s.duration = time.perf_counter() - s.start
+        _current.reset(token)
+        if parent is None:
+            _tracer.export(s)
+
+
+def format_breakdown(root) -> str:
+    """스팬 트리를 단계별 소요 시간 · 토큰 표로 출력"""
+    lines = []
+    for row in root.breakdown():
+        extras = ", ".join(f"{key} {row[key]}" for key in COUNTER_ATTRS if key in row)
+        label = "  " * row["depth"] + row["name"]
+        lines.append(f"  {label:<40} {row['ms']:>10.1f}ms" + (f"  ({extras})" if extras else ""))
+    return "\n".join(lines)
+
+
+def serve_metrics(port: int) -> ThreadingHTTPServer:
+    """/metrics 에 Prometheus 텍스트를 노출하는 백그라운드 HTTP 서버"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics" or _tracer is None:
+                self.send_error(404)
+                return
+            body = _tracer.metrics_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server